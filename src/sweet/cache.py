@@ -0,0 +1,465 @@
+"""
+On-disk caches for speeding up suite tool launch
+"""
+import os
+import json
+import hashlib
+import logging
+
+from rez.config import config as rezconfig, _load_config_from_filepaths
+from rez.packages import iter_package_families
+from rez.resolved_context import ResolvedContext
+
+log = logging.getLogger("sweet")
+
+
+__all__ = (
+    "ResolveCache",
+    "ConfigCache",
+    "PackageCatalog",
+    "repository_fingerprint",
+    "repository_newest",
+    "context_is_current",
+)
+
+
+def _json_default(obj):
+    # Make un-serializable config values (e.g. functions) hashable in a way
+    # that stays the same between processes, which `repr` doesn't.
+    name = getattr(obj, "__qualname__", None)
+    if name:
+        return "%s.%s" % (getattr(obj, "__module__", ""), name)
+    return str(obj)
+
+
+def _hexdigest(data):
+    blob = json.dumps(data, sort_keys=True, default=_json_default)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+
+def _write_json_atomic(filepath, data):
+    # Write to a temp file and rename it over, so concurrent launches never
+    # read a half-written cache file.
+    dir_path = os.path.dirname(filepath)
+    if not os.path.isdir(dir_path):
+        os.makedirs(dir_path, exist_ok=True)
+    tmp = "%s.%d.tmp" % (filepath, os.getpid())
+    with open(tmp, "w") as f:
+        json.dump(data, f, default=_json_default)
+    os.replace(tmp, filepath)
+
+
+def _stat_families(path):
+    """Stat filesystem repository root and its family directories
+
+    A family directory's mtime changes when any version gets added into or
+    removed from it, so this is way cheaper than loading package definitions.
+
+    :param str path: Filesystem repository root
+    :return: A list of (name, mtime_ns) pairs, repository root included as
+        an empty name.
+    :rtype: list[tuple[str, int]]
+    """
+    stats = [("", os.stat(path).st_mtime_ns)]
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            try:
+                stats.append((entry.name, entry.stat().st_mtime_ns))
+            except OSError:
+                continue  # removed while scanning
+    return sorted(stats)
+
+
+def _iter_package_stamps(path):
+    # For repository types other than filesystem (e.g. 'memory'), list
+    # packages' version and timestamp through rez's repository API.
+    for family in iter_package_families(paths=[path]):
+        for package in family.iter_packages():
+            yield family.name, str(package.version), package.timestamp or 0
+
+
+def _repository_digest(path):
+    """Returns a digest that changes whenever packages in `path` changed
+
+    :param str path: One single package path
+    :return: Digest string
+    :rtype: str
+    """
+    hasher = hashlib.sha1(path.encode("utf-8"))
+
+    if os.path.isdir(path):
+        for name, mtime in _stat_families(path):
+            hasher.update(b"%s:%d;" % (name.encode("utf-8"), mtime))
+    else:
+        for name, version, timestamp in _iter_package_stamps(path):
+            hasher.update(
+                ("%s:%s:%s;" % (name, version, timestamp)).encode("utf-8")
+            )
+
+    return hasher.hexdigest()
+
+
+def repository_fingerprint(package_paths):
+    """Compute a fingerprint of given package repositories
+
+    :param package_paths: Package paths to compute from
+    :type package_paths: list[str]
+    :return: Fingerprint string
+    :rtype: str
+    """
+    return _hexdigest([_repository_digest(p) for p in package_paths])
+
+
+def repository_newest(package_paths):
+    """Returns the latest time that packages in given repositories changed
+
+    For filesystem repository, this is the latest mtime of the repository
+    root and family directories. For other repository types, this is the
+    newest package timestamp.
+
+    :param package_paths: Package paths to look into
+    :type package_paths: list[str]
+    :return: Epoch time, or 0 if no package found.
+    :rtype: float
+    """
+    newest = 0
+    for path in package_paths:
+        if os.path.isdir(path):
+            latest = max(m for _, m in _stat_families(path)) / 1e9
+        else:
+            latest = max((t for _, _, t in _iter_package_stamps(path)),
+                         default=0)
+        newest = max(newest, latest)
+    return newest
+
+
+def context_is_current(context, saved_time=None, newest=None):
+    """Returns True if the context would be resolved the same as of now
+
+    A context is current if nothing changed in its package paths since it
+    was resolved (or saved, if `saved_time` is earlier), or if it was
+    resolved with a timestamp.
+
+    :param context: A resolved context, e.g. loaded from a .rxt file
+    :param saved_time: Time when the context was saved, e.g. .rxt mtime
+    :param newest: `repository_newest` of context's package paths, if it's
+        already computed, e.g. for many contexts with the same paths.
+    :type context: ResolvedContext
+    :type saved_time: float or None
+    :type newest: float or None
+    :return: True if the context is current
+    :rtype: bool
+    """
+    if context.requested_timestamp:
+        return True  # time-locked resolve never changes
+
+    since = context.created
+    if saved_time is not None:
+        since = min(since, saved_time)
+
+    if newest is None:
+        newest = repository_newest(context.package_paths)
+    return newest <= since
+
+
+class ResolveCache(object):
+    """On-disk cache of resolved contexts
+
+    Each entry is keyed by everything that affects a resolve in current
+    config (requests, package paths, filters, orderers and config overrides),
+    and is invalidated by the fingerprint of package repositories.
+
+    """
+
+    def __init__(self, root=None):
+        """
+        :param root: Cache directory. Use `cache_root` in sweet's rezconfig
+            if not given.
+        :type root: str or None
+        """
+        if root is None:
+            sweetconfig = rezconfig.plugins.command.sweet
+            root = os.path.join(sweetconfig.cache_root, "resolves")
+        self._root = root
+
+    @property
+    def root(self):
+        return self._root
+
+    def key(self, package_requests, overrides=None):
+        """Compose cache key for resolving requests in current config
+
+        :param package_requests: List of package request strings
+        :param overrides: Config overrides, e.g. from `.rezconfig.py` files
+        :type package_requests: list[str]
+        :type overrides: dict or None
+        :return: Cache key
+        :rtype: str
+        """
+        return _hexdigest({
+            "requests": [str(r) for r in package_requests],
+            "package_paths": list(rezconfig.packages_path),
+            "package_filter": rezconfig.package_filter,
+            "package_orderers": rezconfig.package_orderers,
+            "implicit_packages": list(rezconfig.implicit_packages),
+            "overrides": overrides or {},
+        })
+
+    def get(self, key, fingerprint):
+        """Get cached context
+
+        :param str key: Cache key
+        :param str fingerprint: Current package repositories fingerprint
+        :return: Cached context or None if not cached or outdated.
+        :rtype: ResolvedContext or None
+        """
+        filepath = self._filepath(key)
+        if not os.path.isfile(filepath):
+            return None
+        try:
+            with open(filepath, "r") as f:
+                data = json.load(f)
+            if data["fingerprint"] != fingerprint:
+                return None
+            return ResolvedContext.from_dict(data["context"], filepath)
+        except Exception as e:
+            log.debug(f"Failed to read resolve cache {filepath!r}: {str(e)}")
+            return None
+
+    def put(self, key, fingerprint, context):
+        """Cache a successfully resolved context
+
+        :param str key: Cache key
+        :param str fingerprint: Current package repositories fingerprint
+        :param ResolvedContext context: The context to cache
+        :return: None
+        """
+        if not context.success:
+            return
+        filepath = self._filepath(key)
+        try:
+            _write_json_atomic(filepath, {
+                "fingerprint": fingerprint,
+                "context": context.to_dict(),
+            })
+        except Exception as e:
+            log.debug(f"Failed to write resolve cache {filepath!r}: {str(e)}")
+
+    def resolve(self, package_requests, overrides=None):
+        """Resolve context in current config, or get it from cache
+
+        :param package_requests: List of package request strings
+        :param overrides: Config overrides, e.g. from `.rezconfig.py` files
+        :type package_requests: list[str]
+        :type overrides: dict or None
+        :return: A resolved context
+        :rtype: ResolvedContext
+        """
+        key = self.key(package_requests, overrides=overrides)
+        fingerprint = repository_fingerprint(rezconfig.packages_path)
+
+        context = self.get(key, fingerprint)
+        if context is None:
+            context = ResolvedContext(package_requests)
+            self.put(key, fingerprint, context)
+
+        return context
+
+    def _filepath(self, key):
+        return os.path.join(self._root, key[:2], "%s.json" % key)
+
+
+class ConfigCache(object):
+    """On-disk cache of parsed `.rezconfig.py` files
+
+    Config files are searched from a directory and all its parents by stat-ing
+    where a config file could be, which is as cheap as rez's own search. Each
+    entry is keyed by the config files found, with their mtime and size, and
+    records their parsed overrides. So an entry is shared by all directories
+    that see the same config files, and a modified, added or removed config
+    file simply leads to another entry.
+
+    The oldest entries are evicted once there are more than `MaxEntries`.
+
+    Overrides that can not be stored as JSON (e.g. functions) are not cached,
+    config files will be re-executed in that case.
+
+    """
+    ConfigName = ".rezconfig.py"
+    MaxEntries = 256
+
+    def __init__(self, root=None):
+        """
+        :param root: Cache directory. Use `cache_root` in sweet's rezconfig
+            if not given.
+        :type root: str or None
+        """
+        if root is None:
+            sweetconfig = rezconfig.plugins.command.sweet
+            root = os.path.join(sweetconfig.cache_root, "configs")
+        self._root = root
+
+    @property
+    def root(self):
+        return self._root
+
+    def load(self, dir_path):
+        """Load config overrides from `dir_path` and all its parents
+
+        :param str dir_path: Directory to start searching config files from
+        :return: Config overrides and the config files they were loaded from
+        :rtype: tuple[dict, list[str]]
+        """
+        files = self._search(os.path.abspath(dir_path))
+        configs = [f for f, _, _ in files]
+        if not files:
+            return {}, configs
+
+        filepath = self._filepath(files)
+        entry = self._read(filepath)
+        if entry is not None:
+            return entry["overrides"], configs
+
+        overrides, _ = _load_config_from_filepaths(configs)
+        storable = self._storable(overrides)
+        if storable is None:
+            return overrides, configs
+
+        try:
+            _write_json_atomic(filepath, {
+                "files": files,
+                "overrides": storable,
+            })
+            self._evict()
+        except Exception as e:
+            log.debug(f"Failed to write config cache {filepath!r}: {str(e)}")
+
+        return overrides, configs
+
+    def _search(self, dir_path):
+        files = []
+        while True:
+            config_file = os.path.join(dir_path, self.ConfigName)
+            try:
+                stat = os.stat(config_file)
+            except OSError:
+                pass
+            else:
+                files.append((config_file, stat.st_mtime_ns, stat.st_size))
+
+            parent_dir = os.path.dirname(dir_path)
+            if parent_dir == dir_path:
+                break  # reach root
+
+            dir_path = parent_dir
+
+        return files
+
+    def _evict(self):
+        entries = []
+        with os.scandir(self._root) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except OSError:
+                    continue  # evicted by another launch
+
+        for _, path in sorted(entries)[:-self.MaxEntries or None]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _storable(overrides):
+        try:
+            blob = json.dumps(overrides)
+        except (TypeError, ValueError):
+            return None
+        # e.g. tuple would be loaded back as list
+        return overrides if json.loads(blob) == overrides else None
+
+    @staticmethod
+    def _read(filepath):
+        if not os.path.isfile(filepath):
+            return None
+        try:
+            with open(filepath, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            log.debug(f"Failed to read config cache {filepath!r}: {str(e)}")
+            return None
+
+    def _filepath(self, files):
+        key = _hexdigest(files)
+        return os.path.join(self._root, "%s.json" % key)
+
+
+class PackageCatalog(object):
+    """On-disk catalog of installed packages, one file per repository
+
+    Each catalog file records the families found in a filesystem repository
+    and their package versions, along with the mtime of the repository root
+    and each family directory. A family only needs to be read again when
+    its directory's mtime changed, i.e. versions were added or removed.
+
+    Package versions are recorded as plain dicts, as `PkgVersion` fields.
+
+    """
+    FormatVersion = 1
+
+    def __init__(self, root=None):
+        """
+        :param root: Catalog directory. Use `cache_root` in sweet's rezconfig
+            if not given.
+        :type root: str or None
+        """
+        if root is None:
+            sweetconfig = rezconfig.plugins.command.sweet
+            root = os.path.join(sweetconfig.cache_root, "packages")
+        self._root = root
+
+    @property
+    def root(self):
+        return self._root
+
+    def load(self, location):
+        """Load catalog of a repository
+
+        :param str location: Repository location, e.g. `filesystem@/path`
+        :return: Catalog data, or an empty one if not exists.
+        :rtype: dict
+        """
+        filepath = self._filepath(location)
+        if os.path.isfile(filepath):
+            try:
+                with open(filepath, "r") as f:
+                    data = json.load(f)
+                if data.get("format") == self.FormatVersion:
+                    return data
+            except Exception as e:
+                log.debug(f"Failed to read package catalog {filepath!r}: "
+                          f"{str(e)}")
+        return {"format": self.FormatVersion, "mtime": None, "families": {}}
+
+    def save(self, location, data):
+        """Save catalog of a repository
+
+        :param str location: Repository location, e.g. `filesystem@/path`
+        :param dict data: Catalog data, as `load` returns
+        :return: None
+        """
+        filepath = self._filepath(location)
+        try:
+            _write_json_atomic(filepath, data)
+        except Exception as e:
+            log.debug(f"Failed to write package catalog {filepath!r}: "
+                      f"{str(e)}")
+
+    def _filepath(self, location):
+        key = hashlib.sha1(location.encode("utf-8")).hexdigest()
+        return os.path.join(self._root, "%s.json" % key)
@@ -1,8 +1,90 @@
+def package_users(request, branch=None, archived=False, refresh=True):
+    """Print saved suite contexts that resolve packages in the request
+
+    :param str request: Package request string, e.g. `foo-1.2`
+    :param branch: Suite storage branch. Search all branches if not given.
+    :param archived: Search archived or not archived suites, or both if
+        None. Default False.
+    :param bool refresh: Bring suite index up to date before searching.
+    :type branch: str or None
+    :type archived: bool or None
+    :return: Exit code
+    :rtype: int
+    """
+    from rez.utils.formatting import columnise
+    from sweet.core import Storage
+
+    try:
+        users = Storage().find_package_users(
+            request, branch=branch, archived=archived, refresh=refresh)
+    except Exception as e:
+        print("Failed to search suites: %s" % str(e))
+        return 1
+
+    if not users:
+        print("No suite uses %r." % request)
+        return 0
+
+    rows = [
+        ["BRANCH", "SUITE", "CONTEXT", "PACKAGE"],
+        ["------", "-----", "-------", "-------"],
+    ]
+    for user in users:
+        suite = user.suite + (" (archived)" if user.archived else "")
+        rows.append([user.branch, suite, user.context, user.variant])
+    print("\n".join(columnise(rows)))
+    return 0
+
+
+def repair_suite(path):
+    """Restore a suite from what an interrupted save left behind
+
+    :param str path: Suite directory path
+    :return: Exit code
+    :rtype: int
+    """
+    from sweet.core import SweetSuite
+
+    try:
+        restored = SweetSuite.recover(path)
+    except Exception as e:
+        print("Failed to repair suite: %s" % str(e))
+        return 1
+
+    if restored:
+        print("Suite %r restored." % path)
+    else:
+        print("Nothing to restore for %r." % path)
+    return 0
+
+
+def prune_contexts(branch=None):
+    """Remove stored contexts that no saved suite references
+
+    :param branch: Suite storage branch. Prune all branches if not given.
+    :type branch: str or None
+    :return: Exit code
+    :rtype: int
+    """
+    import os
+    from sweet.core import Storage
+
+    storage = Storage()
+    for b in [branch] if branch else storage.branches():
+        store = storage.context_store(b)
+        if not os.path.isdir(store.root):
+            continue
+        try:
+            removed = store.prune()
+        except Exception as e:
+            print("Failed to prune context store of %r: %s" % (b, str(e)))
+            return 1
+        print("%d stored contexts removed from %r." % (removed, b))
+    return 0
 
 
 def main():
     # todo:
     #   * list all suites (w/o branch specified)
-    #   * find suites by package
     #   * ..
     raise NotImplementedError
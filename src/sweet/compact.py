@@ -0,0 +1,130 @@
+"""
+Compact (compressed) context file format
+
+A compact context file holds the same content as `.rxt`, but serialized
+as compressed JSON after a format header. It is written next to the
+suite's `.rxt` (with `.rxz` extension) so rez and other tools can still
+read the `.rxt`, while sweet reads the smaller compact one.
+"""
+import os
+import json
+import zlib
+
+Extension = ".rxz"
+Header = b"sweet-rxz:"
+Version = 1
+
+
+__all__ = (
+    "compact_path",
+    "dumps",
+    "encode",
+    "loads",
+    "is_compact",
+    "load",
+)
+
+
+def compact_path(filepath):
+    """Returns the compact context file path next to given .rxt
+
+    :param str filepath: The .rxt file path
+    :return: Compact context file path
+    :rtype: str
+    """
+    return os.path.splitext(filepath)[0] + Extension
+
+
+def dumps(context, level=6):
+    """Serialize context into compact format
+
+    :param context: The context to serialize
+    :param int level: zlib compression level
+    :type context: rez.resolved_context.ResolvedContext
+    :return: Compact context data
+    :rtype: bytes
+    """
+    return encode(context.to_dict(), level=level)
+
+
+def encode(doc, level=6):
+    """Serialize context dict into compact format
+
+    :param dict doc: Context dict, as `ResolvedContext.to_dict()` returns
+    :param int level: zlib compression level
+    :return: Compact context data
+    :rtype: bytes
+    """
+    blob = json.dumps(doc, separators=(",", ":"), sort_keys=True)
+    return b"%s%d\n" % (Header, Version) \
+        + zlib.compress(blob.encode("utf-8"), level)
+
+
+def loads(data):
+    """Deserialize compact context data into context dict
+
+    :param bytes data: Compact context data
+    :return: Context dict, as `ResolvedContext.to_dict()` returns
+    :rtype: dict
+    """
+    header, _, body = data.partition(b"\n")
+    if not header.startswith(Header):
+        raise ValueError("Not a compact context.")
+    version = int(header[len(Header):])
+    if version > Version:
+        raise ValueError("Unsupported compact context version: %d" % version)
+    return json.loads(zlib.decompress(body).decode("utf-8"))
+
+
+def is_compact(filepath):
+    """Returns True if the file is in compact context format
+
+    :param str filepath: Context file path
+    :rtype: bool
+    """
+    try:
+        with open(filepath, "rb") as f:
+            return f.read(len(Header)) == Header
+    except (IOError, OSError):
+        return False
+
+
+def _find_current(filepath):
+    # The compact sibling is used only if it's not older than the .rxt, in
+    # case the .rxt was re-written by something else.
+    sibling = compact_path(filepath)
+    try:
+        if os.stat(sibling).st_mtime_ns >= os.stat(filepath).st_mtime_ns:
+            return sibling
+    except OSError:
+        pass
+    return None
+
+
+def load(cls, filepath):
+    """Load context from compact context file
+
+    If `filepath` is a .rxt, its compact sibling will be loaded if that
+    exists and is up to date.
+
+    :param cls: Context class, e.g. ResolvedContext
+    :param str filepath: Context file path, .rxt or compact one
+    :return: Loaded context with load path set to `filepath`, or None if no
+        compact context found.
+    :rtype: rez.resolved_context.ResolvedContext or None
+    """
+    if filepath.endswith(".rxt"):
+        source = _find_current(filepath)
+    elif is_compact(filepath):
+        source = filepath
+    else:
+        source = None
+
+    if source is None:
+        return None
+
+    with open(source, "rb") as f:
+        doc = loads(f.read())
+    context = cls.from_dict(doc, identifier_str=filepath)
+    context.set_load_path(filepath)
+    return context
@@ -2,29 +2,66 @@
 Main business logic, with event notification
 """
 import os
+import re
 import sys
 import copy
+import errno
+import ctypes
+import json
+import time
+import queue
+import pickle
+import socket
+import shutil
 import logging
+import threading
 import warnings
+import multiprocessing
+import hashlib
+import functools
+from io import StringIO
 from typing import List, Set, Union
 from dataclasses import dataclass
 from contextlib import contextmanager
-from collections import MutableMapping
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    ProcessPoolExecutor,
+    as_completed,
+)
+from collections import MutableMapping, OrderedDict
 
 from rez.vendor import yaml
 from rez.suite import Suite
 from rez.config import config as rezconfig
+from rez.system import system
 from rez.utils.yaml import dump_yaml
 from rez.utils.filesystem import forceful_rmtree
 from rez.utils.execution import create_forwarding_script
 from rez.utils.formatting import PackageRequest
+from rez.utils.platform_ import platform_
 from rez.resolver import ResolverStatus
 from rez.vendor.version.version import Version
 from rez.resolved_context import ResolvedContext
-from rez.packages import iter_package_families, iter_packages, Variant
+from rez.packages import iter_package_families, iter_packages, \
+    get_package, Variant
 from rez.package_repository import package_repository_manager
 
-from . import util
+try:
+    # PyYAML built with libyaml, way faster than rez's vendored pure-Python
+    # yaml when parsing many suites, e.g. listing saved suites.
+    from yaml import CSafeLoader as _CSafeLoader, YAMLError as _CYAMLError
+except ImportError:
+    _CSafeLoader = None
+    _CYAMLError = yaml.YAMLError
+
+from . import util, compact
+from .cache import (
+    PackageCatalog,
+    repository_fingerprint,
+    repository_newest,
+    context_is_current,
+    _stat_families,
+)
 from .exceptions import (
     ResolvedContextError,
     SuiteError,
@@ -46,6 +83,7 @@ sweetconfig = rezconfig.plugins.command.sweet
 __all__ = (
     "SuiteOp",
     "Storage",
+    "StorageMonitor",
     "InstalledPackages",
 
     "SuiteCtx",
@@ -89,6 +127,24 @@ class SuiteCtx:
     # building
 
 
+@dataclass
+class SavedVariant:
+    """Tool variant recorded in saved suite's tool manifest"""
+    __slots__ = "qualified_name", "uri", "location"
+    qualified_name: str
+    uri: str
+    location: str
+
+
+@dataclass
+class SavedCtx:
+    """Context recorded in saved suite's tool manifest"""
+    __slots__ = "name", "priority", "usable"
+    name: str
+    priority: int
+    usable: bool
+
+
 @dataclass
 class SuiteTool:
     __slots__ = "name", "alias", "status", "ctx_name", "variant", "ambiguous"
@@ -96,7 +152,7 @@ class SuiteTool:
     alias: str
     status: int
     ctx_name: str
-    variant: Variant
+    variant: Union[Variant, SavedVariant]
     ambiguous: bool
 
     @property
@@ -105,6 +161,8 @@ class SuiteTool:
 
     @property
     def location(self):
+        if isinstance(self.variant, SavedVariant):
+            return self.variant.location
         return self.variant.resource.location
 
 
@@ -115,20 +173,83 @@ class PkgFamily:
     location: str
 
 
-@dataclass
-class PkgVersion:
-    __slots__ = "name", "version", "qualified", "requires", "variants", \
-                "tools", "uri", "timestamp", "location", "is_nonlocal"
-    name: str
-    version: Version
-    qualified: str
-    requires: List[str]
-    variants: List[List[str]]
-    tools: List[str]
-    uri: str
-    timestamp: int
-    location: str
-    is_nonlocal: bool
+class PkgVersion(object):
+    """An installed package version
+
+    Fields `requires` and `variants` are read from the package on first
+    access and kept, if not given, since most versions are only listed by
+    name and date and never inspected. The package is re-fetched from its
+    repository for that, instead of being kept, so repository caches could
+    be freed. Field `tools` is always given, as it's used for filtering.
+
+    """
+    __slots__ = "name", "version", "qualified", "uri", "timestamp", \
+                "location", "is_nonlocal", "_repository", "_requires", \
+                "_variants", "_tools"
+
+    def __init__(self, name, version, qualified, uri, timestamp, location,
+                 is_nonlocal, tools, repository=None, requires=None,
+                 variants=None):
+        """
+        :param repository: Repository path (e.g. 'filesystem@/packages') to
+            read lazy fields from, if they are not given.
+        :type repository: str or None
+        """
+        self.name = name  # type: str
+        self.version = version  # type: Version
+        self.qualified = qualified  # type: str
+        self.uri = uri  # type: str
+        self.timestamp = timestamp  # type: int
+        self.location = location  # type: str
+        self.is_nonlocal = is_nonlocal  # type: bool
+        self._repository = repository
+        self._requires = requires
+        self._variants = variants
+        self._tools = tools
+
+    def __repr__(self):
+        return "%s(%r, location=%r)" % (
+            self.__class__.__name__, self.qualified, self.location)
+
+    def _read_package(self):
+        package = None
+        if self._repository:
+            package = get_package(self.name, self.version,
+                                  paths=[self._repository])
+        if package is None:
+            log.debug(f"Package {self.qualified!r} not found in "
+                      f"{self._repository!r}.")
+        if self._requires is None:
+            requires = package.requires if package else None
+            self._requires = [str(r) for r in requires or []]
+        if self._variants is None:
+            variants = package.variants if package else None
+            self._variants = [[str(r) for r in var] for var in variants or []]
+
+    @property
+    def requires(self):
+        """
+        :rtype: list[str]
+        """
+        if self._requires is None:
+            self._read_package()
+        return self._requires
+
+    @property
+    def variants(self):
+        """
+        :rtype: list[list[str]]
+        """
+        if self._variants is None:
+            self._read_package()
+        return self._variants
+
+    @property
+    def tools(self):
+        """
+        :rtype: list[str]
+        """
+        return self._tools
 
 
 @dataclass
@@ -150,18 +271,81 @@ class SavedSuite:
     def is_live(self):
         return self._suite.is_live()
 
+    @property
+    def is_frozen(self):
+        return self._suite.is_frozen()
+
     @property
     def description(self):
         return self._suite.description
 
     def iter_saved_tools(self):
-        """
+        """Iterate visible tools in suite
+
+        Tools are read from suite's tool manifest if it's up to date, so no
+        context needs to be loaded.
+
         :return: A SuiteTool object iterator
         :rtype: collections.Iterator[SuiteTool]
         """
-        sop = SuiteOp()
-        sop._working_suite = self._suite
-        return sop.iter_tools(visible_only=True)
+        manifest = self.read_manifest()
+        if manifest is None:
+            sop = SuiteOp()
+            sop._working_suite = self._suite
+            return sop.iter_tools(visible_only=True)
+
+        return (
+            SuiteTool(
+                name=d["name"],
+                alias=d["alias"],
+                status=d["status"],
+                ctx_name=d["context"],
+                variant=SavedVariant(**d["variant"]),
+                ambiguous=d["ambiguous"],
+            )
+            for d in manifest["tools"] if d["status"] == Constants.TOOL_VALID
+        )
+
+    def iter_saved_contexts(self, ascending=False):
+        """Iterate contexts' name, priority and usability in suite
+
+        Like `iter_contexts`, but read from suite's tool manifest if it's up
+        to date, so no context needs to be loaded.
+
+        :param ascending: Iter contexts by priority in ascending order.
+        :type ascending: bool or False
+        :return: A SavedCtx object iterator
+        :rtype: collections.Iterator[SavedCtx]
+        """
+        manifest = self.read_manifest()
+        if manifest is None:
+            for ctx in self.iter_contexts(ascending=ascending):
+                yield SavedCtx(name=ctx.name,
+                               priority=ctx.priority,
+                               usable=ctx.context.usable)
+            return
+
+        contexts = sorted(manifest["contexts"], key=lambda x: x["priority"],
+                          reverse=not ascending)
+        for d in contexts:
+            yield SavedCtx(**d)
+
+    def get_context(self, name):
+        """Load one context from suite
+
+        :param str name: context name
+        :return: The context
+        :rtype: RollingContext
+        """
+        return self._suite.context(name)
+
+    def read_manifest(self):
+        """Read suite's tool manifest
+
+        :return: Manifest data, or None if not exists or outdated.
+        :rtype: dict or None
+        """
+        return SweetSuite.read_manifest(self.path)
 
     def iter_contexts(self, ascending=False):
         """Iterate contexts (from rxt files) in suite in priority ordered
@@ -225,7 +409,8 @@ class SuiteOp(object):
         :param bool as_import: If True, suite could not save over to where it
             was loaded from. Default is False.
         :param bool re_resolve: If True, all loaded contexts (.rxt) will be
-            re-resolved as live contexts. Default is True.
+            re-resolved as live contexts, except those that nothing changed
+            in their package paths since saved. Default is True.
         :return: None
         """
 
@@ -234,9 +419,8 @@ class SuiteOp(object):
             raise SuiteIOError("Not a suite: %r" % path)
 
         try:
-            with open(filepath, "rb") as f:
-                suite_dict = yaml.load(f, Loader=yaml.FullLoader)  # noqa
-        except yaml.YAMLError as e:  # noqa
+            suite_dict = _load_suite_dict(filepath)
+        except (yaml.YAMLError, _CYAMLError) as e:  # noqa
             raise SuiteIOError("Failed loading suite: %s" % str(e))
 
         suite = SweetSuite.from_dict(suite_dict)
@@ -250,11 +434,14 @@ class SuiteOp(object):
             suite.re_resolve_rxt_contexts()
         suite.load_path = None if as_import else os.path.realpath(path)
 
-    def save(self, path, as_archived=False):
+    def save(self, path, as_archived=False, progress=None):
         """Save current working suite
 
         :param str path: Path to save the suite
         :param bool as_archived: Save suite as archived
+        :param progress: Callback that receives the number of done and total
+            write jobs (contexts and tool wrappers) while saving.
+        :type progress: callable or None
         :return: None
         """
         release_root = sweetconfig.suite_roots.get(sweetconfig.release_root)
@@ -263,8 +450,10 @@ class SuiteOp(object):
 
         self.sanity_check(non_local=non_local_required)
         # note: cannot save over if load_path is None
-        self._suite.save(path, as_archived=as_archived)
+        self._suite.save(path, as_archived=as_archived, progress=progress)
         self._suite.load_path = os.path.realpath(path)
+        if sweetconfig.suite_index:
+            _update_index(lambda index: index.update(path, self._suite))
         # run callback
         sweetconfig.on_suite_saved_callback(self._suite, path)
 
@@ -324,6 +513,25 @@ class SuiteOp(object):
         """
         self._suite.set_description(text)
 
+    def is_frozen(self):
+        """Is suite tools running in baked environment ?
+        :return: True if suite is frozen
+        :rtype: bool
+        """
+        return self._suite.is_frozen()
+
+    def set_frozen(self, value):
+        """Set suite tools to run in baked environment or not
+
+        Environment of each context will be computed and saved with the
+        suite, and suite tools will be executed in that environment directly
+        without resolving or loading contexts.
+
+        :param bool value: Freeze suite or not
+        :return: None
+        """
+        self._suite.set_frozen(value)
+
     def set_load_path(self, path):
         """Explicitly set suite's load_path
 
@@ -532,11 +740,18 @@ class SuiteOp(object):
         data = self._suite.contexts[ctx_name]
         return self._ctx_data_to_tuple(data)
 
-    def re_resolve_rxt_contexts(self, package_paths=None):
+    def re_resolve_rxt_contexts(self, package_paths=None, callback=None):
         """Re-resolve all contexts that loaded from .rxt files
-        :return:
+
+        :param package_paths: Package paths to resolve with, default None
+        :param callback: Called with context name and the re-resolved
+            context, as soon as each context is re-resolved.
+        :type package_paths: list[str] or None
+        :type callback: callable or None
+        :return: None
         """
-        self._suite.re_resolve_rxt_contexts(package_paths=package_paths)
+        self._suite.re_resolve_rxt_contexts(package_paths=package_paths,
+                                            callback=callback)
 
     def get_context(self, name):
         """Get a copy of context in suite
@@ -748,7 +963,9 @@ class RollingContext(ResolvedContext):
     @classmethod
     def load(cls, path):
         try:
-            return super(RollingContext, cls).load(path)
+            return ContextStore.load(cls, path) \
+                or compact.load(cls, path) \
+                or super(RollingContext, cls).load(path)
         except Exception as e:
             return cls._get_broken(e, package_requests=[])
 
@@ -847,6 +1064,7 @@ class Storage(object):
             except Exception as e:
                 log.critical(f"Unarchive suite failed: {str(e)}")
             else:
+                cls._index_archived(suite_path, archive)
                 return True
 
         elif archive and not is_archived:
@@ -856,10 +1074,59 @@ class Storage(object):
             except Exception as e:
                 log.critical(f"Archive suite failed: {str(e)}")
             else:
+                cls._index_archived(suite_path, archive)
                 return True
 
         return False
 
+    @staticmethod
+    def _index_archived(suite_path, archive):
+        if sweetconfig.suite_index and not os.path.basename(
+                suite_path).startswith("."):  # not a staging directory
+            _update_index(lambda index: index.set_archived(suite_path, archive))
+
+    def suite_index(self, filepath=None):
+        """Get the SQLite index of suites in this storage
+
+        Call `SuiteIndex.refresh` to bring index up to date before searching,
+        which only reads suites that changed since last indexed.
+
+        :param filepath: Index database file path. Use `suites.db` under
+            `cache_root` in sweet's rezconfig if not given.
+        :type filepath: str or None
+        :return: Suite index of storage roots
+        :rtype: sweet.index.SuiteIndex
+        """
+        return _suite_index(filepath, roots=self._roots)
+
+    def find_package_users(self, request, branch=None, archived=None,
+                           refresh=True):
+        """Find saved suite contexts that resolve packages in the request
+
+        Answered from suite index, so no suite file needs to be read except
+        those changed since last indexed.
+
+        :param str request: Package request string, e.g. `foo-1.2`
+        :param branch: Suite storage branch. Search all branches if not
+            given.
+        :param archived: Search archived or not archived suites, or both
+            if None. Default None.
+        :param bool refresh: Bring suite index up to date before searching.
+            Default True.
+        :type branch: str or None
+        :type archived: bool or None
+        :return: Suite contexts and the variants they resolved
+        :rtype: list[sweet.index.PackageUser]
+        """
+        index = self.suite_index()
+        if refresh:
+            index.refresh(branch)
+        branches = [branch] if branch else self.branches()
+        return [
+            user for user in index.find_users(request, archived=archived)
+            if user.branch in branches
+        ]
+
     def branches(self):
         """Get current suite storage branch names
 
@@ -868,6 +1135,18 @@ class Storage(object):
         """
         return list(self._roots.keys())
 
+    def root(self, branch):
+        """Get storage root path of a branch
+
+        :param str branch: Suite storage branch
+        :return: Storage root path
+        :rtype: str
+        """
+        try:
+            return self._roots[branch]
+        except KeyError:
+            raise SuiteIOError("Unknown storage branch: %r" % branch)
+
     def suite_path(self, branch, name):
         """Compose suite directory path
 
@@ -878,12 +1157,17 @@ class Storage(object):
         :return: Suite directory path
         :rtype: str
         """
-        try:
-            root = self._roots[branch]
-        except KeyError:
-            raise SuiteIOError("Unknown storage branch: %r" % branch)
+        return os.path.join(self.root(branch), name)
+
+    def context_store(self, branch):
+        """Get the content-addressed context store of a branch
 
-        return os.path.join(root, name)
+        :param str branch: Suite storage branch
+        :return: Context store that suites saved in this branch share
+        :rtype: ContextStore
+        """
+        return ContextStore(
+            os.path.join(self.root(branch), ContextStore.DirName))
 
     def iter_saved_suites(self, branch=None, archived=False):
         """Iter existing suites withing given roots
@@ -901,26 +1185,467 @@ class Storage(object):
             if branch and b != branch:
                 continue
 
-            if not os.path.isdir(root):
-                continue
-
-            for name in os.listdir(root):
-                path = os.path.join(root, name)
-                filepath = os.path.join(path, "suite.yaml")
-
-                if os.path.isfile(filepath):
-                    archive_flag = os.path.join(path, self.ArchivedFlag)
-                    is_archived = os.path.isfile(archive_flag)
-                    _keys = dict(
-                        name=name,
+            for entry, is_archived in _iter_suite_entries(root):
+                if is_archived == archived:
+                    yield SavedSuite(
+                        name=entry.name,
                         branch=b,
-                        path=path,
+                        path=entry.path,
+                        archived=is_archived,
                         suite=None,  # lazy load
                     )
-                    if archived and is_archived:
-                        yield SavedSuite(archived=True, **_keys)
-                    elif not archived and not is_archived:
-                        yield SavedSuite(archived=False, **_keys)
+
+    def scan_saved_suites(self, branch=None, archived=False, batch_size=200):
+        """Scan existing suites in batches, all branch roots concurrently
+
+        A batch is yielded once it's full, or when it has been a while since
+        the last one, so the first results come out early on slow roots.
+
+        :param branch: Suite storage branch. Scan all branches if not given.
+        :param bool archived: Scan archived suite. Default False.
+        :param int batch_size: Max number of suites in one batch.
+        :type branch: str or None
+        :return: Batches of SavedSuite objects, in the order of being found
+        :rtype: collections.Iterator[list[SavedSuite]]
+        """
+        roots = [(b, r) for b, r in self._roots.items()
+                 if not branch or b == branch]
+        if not roots:
+            return
+
+        batches = queue.Queue()
+        stopped = threading.Event()
+
+        def scan(b, root):
+            batch = []
+            since = time.monotonic()
+            try:
+                for entry, is_archived in _iter_suite_entries(root):
+                    if stopped.is_set():
+                        return
+                    if is_archived == archived:
+                        batch.append(SavedSuite(
+                            name=entry.name,
+                            branch=b,
+                            path=entry.path,
+                            archived=is_archived,
+                            suite=None,  # lazy load
+                        ))
+                    if batch and (len(batch) >= batch_size or
+                                  time.monotonic() - since > _BatchInterval):
+                        batches.put(batch)
+                        batch = []
+                        since = time.monotonic()
+                if batch:
+                    batches.put(batch)
+            except Exception as e:
+                log.error(f"Failed to scan storage {root!r}: {str(e)}")
+            finally:
+                batches.put(None)  # this root is done
+
+        with ThreadPoolExecutor(max_workers=len(roots)) as pool:
+            for b, root in roots:
+                pool.submit(scan, b, root)
+            remaining = len(roots)
+            try:
+                while remaining:
+                    batch = batches.get()
+                    if batch is None:
+                        remaining -= 1
+                    else:
+                        yield batch
+            finally:
+                stopped.set()  # e.g. consumer stopped early
+
+
+_BatchInterval = 0.2  # seconds
+
+
+def _iter_suite_entries(root):
+    """Iterate suite directories in a storage root
+
+    Each suite directory is listed once, for telling whether it's a suite
+    and it's archived, instead of two separate stat calls.
+
+    :param str root: Storage root path
+    :return: Pairs of suite directory entry and its archive state
+    :rtype: collections.Iterator[tuple[os.DirEntry, bool]]
+    """
+    try:
+        it = os.scandir(root)
+    except OSError:
+        return  # root not exists
+    with it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue  # e.g. staging directory of a suite being saved
+            try:
+                if not entry.is_dir():
+                    continue
+                with os.scandir(entry.path) as suite_it:
+                    names = {e.name for e in suite_it}
+            except OSError:
+                continue  # removed while scanning
+            if "suite.yaml" in names:
+                yield entry, Storage.ArchivedFlag in names
+
+
+class StorageMonitor(object):
+    """Spot saved suites that have been added, removed, archived/unarchived
+    or modified in storage since last check
+
+    A suite is considered modified when its directory is replaced, which is
+    how suites are saved, or when the directory's mtime changed.
+
+    A check could be limited to the directories that have been notified as
+    changed, so only those are rescanned instead of the whole storage.
+
+    """
+    Added = "added"
+    Removed = "removed"
+    Archived = "archived"
+    Modified = "modified"
+
+    def __init__(self, storage):
+        """
+        :param Storage storage: Suite storage to monitor
+        """
+        self._storage = storage
+        self._states = dict()  # path: (SavedSuite, stamp)
+
+    def _roots(self):
+        return {self._storage.root(b): b for b in self._storage.branches()}
+
+    def _snapshot(self):
+        states = dict()
+        for root, branch in self._roots().items():
+            for entry, archived in _iter_suite_entries(root):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue  # removed while scanning
+                states[entry.path] = self._state(entry.path, branch,
+                                                 archived, st)
+        return states
+
+    @staticmethod
+    def _state(path, branch, archived, st):
+        suite = SavedSuite(
+            name=os.path.basename(path),
+            branch=branch,
+            path=path,
+            archived=archived,
+            suite=None,  # lazy load
+        )
+        return suite, (st.st_ino, st.st_mtime_ns)
+
+    def _check_suite(self, path, branch, states):
+        """Update state of one suite directory"""
+        try:
+            st = os.stat(path)
+            with os.scandir(path) as it:
+                names = {e.name for e in it}
+        except OSError:
+            names = ()  # removed
+        if "suite.yaml" in names:
+            archived = Storage.ArchivedFlag in names
+            states[path] = self._state(path, branch, archived, st)
+        else:
+            states.pop(path, None)
+
+    def _check_root(self, root, branch, states):
+        """Update states of suites in one storage root
+
+        Only suites that are new or replaced (by inode) are checked.
+        """
+        inodes = dict()
+        try:
+            with os.scandir(root) as it:
+                for entry in it:
+                    if not entry.name.startswith("."):
+                        inodes[entry.path] = entry.inode()
+        except OSError:
+            pass  # root removed
+
+        for path, (suite, _) in list(states.items()):
+            if suite.branch == branch and path not in inodes:
+                del states[path]
+        for path, inode in inodes.items():
+            state = states.get(path)
+            if state is None or state[1][0] != inode:
+                self._check_suite(path, branch, states)
+
+    def reset(self):
+        """Take current storage state as the baseline of next check
+
+        :return: None
+        """
+        self._states = self._snapshot()
+
+    def poll(self, paths=None):
+        """Compare storage with last check, and return what has changed
+
+        :param paths: Only check these directories, which are storage roots
+            or suite directories (see `watched_paths`), e.g. notified as
+            changed by filesystem watcher. Check whole storage if None.
+        :type paths: list[str] or None
+        :return: A list of (change, SavedSuite) pairs. Change is one of
+            `Added`, `Removed`, `Archived` and `Modified`, and an archived
+            suite has `SavedSuite.archived` set to True when unarchived.
+        :rtype: list[tuple[str, SavedSuite]]
+        """
+        if paths is None:
+            states = self._snapshot()
+        else:
+            states = dict(self._states)
+            roots = self._roots()
+            for path in paths:
+                if path in roots:
+                    self._check_root(path, roots[path], states)
+                elif path in states:
+                    self._check_suite(path, states[path][0].branch, states)
+
+        changes = []
+        for path, (suite, stamp) in states.items():
+            previous = self._states.get(path)
+            if previous is None:
+                changes.append((self.Added, suite))
+            elif previous[0].archived != suite.archived:
+                changes.append((self.Archived, suite))
+            elif previous[1] != stamp:
+                changes.append((self.Modified, suite))
+        for path, (suite, _) in self._states.items():
+            if path not in states:
+                changes.append((self.Removed, suite))
+
+        self._states = states
+        return changes
+
+    def watched_paths(self):
+        """Directories to watch for storage changes, as of last check
+
+        Storage roots are watched for suites being added, removed or saved
+        over, suite directories are watched for being archived.
+
+        :return: Storage root and suite directory paths
+        :rtype: list[str]
+        """
+        roots = [r for r in self._roots() if os.path.isdir(r)]
+        return roots + list(self._states)
+
+
+class ContextStore(object):
+    """Content-addressed context store, shared by suites in a storage root
+
+    Contexts are stored in compact format, keyed by the hash of their content
+    excluding volatile entries (e.g. creation time) and the suite they were
+    saved in. So identical contexts from different suites are stored once,
+    with volatile entries of whichever saved first.
+
+    A suite references its stored context with a '.ref' file next to the
+    context's .rxt, which holds the stored file path relative to it. Loaded
+    contexts are kept in memory and shared (as shallow copies) between
+    suites. Suites still keep their own .rxt for rez, see `prune` for
+    removing stored contexts that are no longer referenced.
+
+    """
+    DirName = ".contexts"  # hidden, so won't be listed as saved suite
+    RefExtension = ".ref"
+    MaxShared = 256
+    PruneAge = 60 * 60  # seconds, recently put contexts are never pruned
+    _shared = OrderedDict()  # (filepath, context class): context
+    _shared_lock = threading.Lock()  # shared by save and loading threads
+
+    def __init__(self, root):
+        """
+        :param str root: Store directory
+        """
+        self._root = root
+
+    @classmethod
+    def of_suite(cls, suite_path):
+        """Get the store of the storage root that suite is saved in
+
+        :param str suite_path: Suite directory path
+        :rtype: ContextStore
+        """
+        return cls(os.path.join(os.path.dirname(suite_path), cls.DirName))
+
+    @property
+    def root(self):
+        return self._root
+
+    @staticmethod
+    def key(doc):
+        """Compute store key of a context dict
+
+        :param dict doc: Context dict, as `ResolvedContext.to_dict()` returns
+        :return: Store key
+        :rtype: str
+        """
+        doc = {k: v for k, v in doc.items()
+               if k not in _VolatileRxtKeys + _SuiteRxtKeys}
+        blob = json.dumps(doc, sort_keys=True)
+        return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+    def filepath(self, key):
+        return os.path.join(self._root, key[:2], key + compact.Extension)
+
+    def put(self, context):
+        """Store context if it's not already stored
+
+        :param ResolvedContext context: The context to store
+        :return: Stored file path
+        :rtype: str
+        """
+        doc = context.to_dict()
+        filepath = self.filepath(self.key(doc))
+        try:
+            # refreshed, so `prune` keeps it until it's referenced
+            os.utime(filepath)
+        except OSError:
+            _dir_path = os.path.dirname(filepath)
+            if not os.path.isdir(_dir_path):
+                os.makedirs(_dir_path, exist_ok=True)
+            # write to temp file and rename, for concurrent saving suites
+            tmp = "%s.%d.%d.tmp" % (filepath, os.getpid(), id(doc))
+            with open(tmp, "wb") as f:
+                f.write(compact.encode(
+                    {k: v for k, v in doc.items() if k not in _SuiteRxtKeys}
+                ))
+            os.replace(tmp, filepath)
+        return filepath
+
+    def prune(self, candidates=None):
+        """Remove stored contexts that no suite references
+
+        References are collected from all suites in the storage root,
+        including archived ones and those being saved. Stored contexts that
+        are put within `PruneAge` are kept, as a save in progress may not
+        yet have written its reference.
+
+        :param candidates: Only prune these stored files, e.g. those a suite
+            no longer references. Prune the whole store if not given.
+        :type candidates: set[str] or None
+        :return: Number of removed files
+        :rtype: int
+        """
+        if candidates is not None and not candidates:
+            return 0
+
+        referenced = set()
+        with os.scandir(os.path.dirname(self._root)) as it:
+            for entry in it:
+                if entry.name != self.DirName and entry.is_dir():
+                    referenced.update(self.references(entry.path))
+
+        if candidates is None:
+            candidates = {os.path.join(dir_path, name)
+                          for dir_path, _, names in os.walk(self._root)
+                          for name in names}
+
+        removed = 0
+        deadline = time.time() - self.PruneAge
+        for filepath in candidates - referenced:
+            try:
+                if os.stat(filepath).st_mtime < deadline:
+                    os.remove(filepath)
+                    removed += 1
+            except OSError:
+                continue  # e.g. removed by another prune
+        return removed
+
+    @classmethod
+    def references(cls, suite_path):
+        """Returns stored context paths that a suite references
+
+        :param str suite_path: Suite directory path
+        :rtype: set[str]
+        """
+        contexts_path = os.path.join(suite_path, "contexts")
+        referenced = set()
+        try:
+            it = os.scandir(contexts_path)
+        except OSError:
+            return referenced  # not a suite
+        with it:
+            for entry in it:
+                if not entry.name.endswith(cls.RefExtension):
+                    continue
+                try:
+                    with open(entry.path, "r") as f:
+                        relpath = f.read().strip()
+                except (IOError, OSError):
+                    continue
+                referenced.add(
+                    os.path.normpath(os.path.join(contexts_path, relpath))
+                )
+        return referenced
+
+    @classmethod
+    def ref_path(cls, rxt_path):
+        """Returns the reference file path next to given .rxt
+
+        :param str rxt_path: Context .rxt file path
+        :rtype: str
+        """
+        return os.path.splitext(rxt_path)[0] + cls.RefExtension
+
+    @classmethod
+    def load(cls, context_cls, rxt_path):
+        """Load suite context from store, if it's referenced and up to date
+
+        :param context_cls: Context class, e.g. ResolvedContext
+        :param str rxt_path: Suite context .rxt file path
+        :return: Loaded context with load path set to `rxt_path`, or None
+            if context is not referenced from store.
+        :rtype: ResolvedContext or None
+        """
+        ref_path = cls.ref_path(rxt_path)
+        try:
+            # reference must not be older than the .rxt
+            if os.stat(ref_path).st_mtime_ns < os.stat(rxt_path).st_mtime_ns:
+                return None
+            with open(ref_path, "r") as f:
+                relpath = f.read().strip()
+        except (IOError, OSError):
+            return None
+
+        filepath = os.path.normpath(
+            os.path.join(os.path.dirname(ref_path), relpath)
+        )
+        try:
+            shared = cls._get_shared(context_cls, filepath)
+        except (IOError, OSError):
+            return None  # e.g. pruned, load the .rxt instead
+
+        context = shared.copy()
+        suite_path = os.path.dirname(os.path.dirname(rxt_path))
+        name = os.path.splitext(os.path.basename(rxt_path))[0]
+        context._set_parent_suite(suite_path, name)  # noqa
+        context.set_load_path(rxt_path)
+        return context
+
+    @classmethod
+    def _get_shared(cls, context_cls, filepath):
+        key = (filepath, context_cls)
+        with cls._shared_lock:
+            context = cls._shared.get(key)
+            if context is not None:
+                cls._shared.move_to_end(key)
+        if context is not None:
+            return context
+
+        with open(filepath, "rb") as f:
+            doc = compact.loads(f.read())
+        context = context_cls.from_dict(doc, identifier_str=filepath)
+
+        with cls._shared_lock:
+            cls._shared[key] = context
+            cls._shared.move_to_end(key)
+            while len(cls._shared) > cls.MaxShared:
+                cls._shared.popitem(last=False)
+        return context
 
 
 class InstalledPackages(object):
@@ -983,12 +1708,15 @@ class InstalledPackages(object):
                 location=location,
             )
 
-    def iter_versions(self, name, location=None):
+    def iter_versions(self, name, location=None, lazy=True):
         """Iter package versions
 
         :param name: Package name
         :param location: One single package path to look for. Loop over all
             paths (`packages_path`) if not given.
+        :param bool lazy: If False, all fields are read from the package in
+            hand, instead of being read on first access. E.g. for recording
+            all of them.
         :type name: str
         :type location: str or None
         :return: An iterator that yields `PkgVersion` objects
@@ -1000,25 +1728,641 @@ class InstalledPackages(object):
         for p in iter_packages(name, paths=paths):
             _l = p.resource.location
             if _l in _cache:
-                norm_location = _cache[_l]
+                norm_location, repository = _cache[_l]
             else:
                 norm_location = util.normpath(_l)
-                _cache[_l] = norm_location
+                repository = "%s@%s" % (p.repository.name(),
+                                        p.repository.location)
+                _cache[_l] = norm_location, repository
 
             is_nonlocal = norm_location in self._non_local
 
-            yield PkgVersion(
+            pkg = PkgVersion(
                 name=name,
                 version=p.version,
                 qualified=p.qualified_name,
-                requires=[str(r) for r in p.requires or []],
-                variants=[[str(r) for r in var] for var in p.variants or []],
-                tools=p.tools or [],
                 uri=p.uri,
                 timestamp=p.timestamp,
                 location=norm_location,
                 is_nonlocal=is_nonlocal,
+                tools=list(p.tools or []),
+                repository=repository,
             )
+            if not lazy:
+                pkg._requires = [str(r) for r in p.requires or []]
+                pkg._variants = [[str(r) for r in var]
+                                 for var in p.variants or []]
+            yield pkg
+
+    def iter_versions_concurrently(self, batches, workers=None, lazy=True):
+        """Iter package versions of many families, read in a thread pool
+
+        Versions of families in the same batch are yielded together, e.g.
+        a family that exists in multiple locations.
+
+        :param batches: Batches of families to read versions from
+        :param workers: Max number of threads. Use `scan_workers` in sweet's
+            rezconfig if not given. Read one by one if less than 2.
+        :param bool lazy: Read lazy fields on first access, see
+            `iter_versions`.
+        :type batches: list[list[PkgFamily]]
+        :type workers: int or None
+        :return: An iterator that yields batch index and the `PkgVersion`
+            objects of that batch, in the order of completion
+        :rtype: collections.Iterator[tuple[int, list[PkgVersion]]]
+        """
+        def read(families):
+            versions = []
+            for family in families:
+                versions += self.iter_versions(family.name, family.location,
+                                               lazy=lazy)
+            return versions
+
+        if workers is None:
+            workers = sweetconfig.scan_workers
+
+        if workers < 2 or len(batches) < 2:
+            for i, families in enumerate(batches):
+                yield i, read(families)
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(read, families): i
+                for i, families in enumerate(batches)
+            }
+            try:
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+            finally:
+                for future in futures:
+                    future.cancel()  # e.g. consumer stopped early
+
+    def iter_catalog(self, catalog=None):
+        """Iter package families with their versions, from package catalog
+
+        For filesystem repositories, only families that have their directory
+        modified since last cataloged will be read, and the catalog will be
+        updated. Other repositories (e.g. 'memory') are read in full.
+
+        :param catalog: Package catalog. Use the one in `cache_root` of
+            sweet's rezconfig if not given.
+        :type catalog: PackageCatalog or None
+        :return: An iterator that yields `PkgFamily` object and a list of its
+            `PkgVersion` objects
+        :rtype: collections.Iterator[tuple[PkgFamily, list[PkgVersion]]]
+        """
+        catalog = catalog or PackageCatalog()
+
+        for path in self._paths:
+            if not os.path.isdir(path):
+                self.clear_caches(path)
+                for family in self.iter_families(path):
+                    versions = list(self.iter_versions(family.name, path))
+                    yield family, versions
+                continue
+
+            repo = package_repository_manager.get_repository(path)
+            location = "{}@{}".format(repo.name(), repo.location)
+            stats = dict(_stat_families(path))
+            root_mtime = stats.pop("")
+
+            data = catalog.load(location)
+            cached = data["families"]
+            changed = data["mtime"] != root_mtime
+            if changed:  # families added or removed
+                repo.clear_caches()
+                names = [f.name for f in self.iter_families(path)]
+            else:
+                names = list(cached)
+
+            stale = [
+                PkgFamily(name=name, location=location) for name in names
+                if cached.get(name, {}).get("mtime", -1) != stats.get(name)
+            ]
+            if stale and not changed:
+                repo.clear_caches()
+            changed = changed or bool(stale)
+
+            families = dict()
+            for name in names:
+                entry = cached.get(name)
+                if entry is None or entry["mtime"] != stats.get(name):
+                    continue
+                versions = [self._from_record(r) for r in entry["versions"]]
+                families[name] = entry
+                yield PkgFamily(name=name, location=location), versions
+
+            # note: read in full, so records are made from packages in hand
+            #   instead of being read again.
+            batches = [[family] for family in stale]
+            for i, versions in self.iter_versions_concurrently(batches,
+                                                               lazy=False):
+                family = stale[i]
+                families[family.name] = {
+                    "mtime": stats.get(family.name),
+                    "versions": [self._to_record(v) for v in versions],
+                }
+                yield family, versions
+
+            if changed:
+                data["mtime"] = root_mtime
+                data["families"] = families
+                catalog.save(location, data)
+
+    @staticmethod
+    def _to_record(pkg):
+        return {
+            "name": pkg.name,
+            "version": str(pkg.version),
+            "qualified": pkg.qualified,
+            "requires": pkg.requires,
+            "variants": pkg.variants,
+            "tools": pkg.tools,
+            "uri": pkg.uri,
+            "timestamp": pkg.timestamp,
+            "location": pkg.location,
+        }
+
+    def _from_record(self, record):
+        return PkgVersion(
+            name=record["name"],
+            version=Version(record["version"]),
+            qualified=record["qualified"],
+            requires=record["requires"],
+            variants=record["variants"],
+            tools=record["tools"],
+            uri=record["uri"],
+            timestamp=record["timestamp"],
+            location=record["location"],
+            is_nonlocal=record["location"] in self._non_local,
+        )
+
+
+def _resolve_settings(package_paths):
+    """Settings that worker process needs to resolve like current process
+
+    Worker processes are spawned, so they don't have config overrides nor
+    in-memory package repositories of current process. All config overrides
+    are passed, so they must be picklable.
+
+    :param package_paths: Package paths that contexts will resolve with
+    :type package_paths: list[str]
+    :return: Settings for `_re_resolve_rxt_dict`, or None if config
+        overrides can not be passed to worker process (e.g. a lambda).
+    :rtype: dict or None
+    """
+    overrides = dict(rezconfig.overrides)
+    try:
+        pickle.dumps(overrides)
+    except Exception:  # e.g. PicklingError, AttributeError, TypeError
+        return None
+
+    memory = dict()
+    for path in package_paths:
+        if path.startswith("memory@"):
+            repo = package_repository_manager.get_repository(path)
+            memory[path] = repo.data
+    return {
+        "overrides": overrides,
+        "packages_path": list(rezconfig.packages_path),
+        "implicit_packages": list(rezconfig.implicit_packages),
+        "memory_repositories": memory,
+    }
+
+
+def _apply_resolve_settings(settings):
+    for key, value in settings["overrides"].items():
+        rezconfig.override(key, value)
+    for key in ("packages_path", "implicit_packages"):
+        rezconfig.override(key, settings[key])
+    for path, data in settings["memory_repositories"].items():
+        repo = package_repository_manager.get_repository(path)
+        repo.data = data
+        repo.clear_caches()
+
+
+def _re_resolve_rxt_dict(d, package_paths=None, settings=None):
+    """Re-resolve context dict in worker process
+
+    :param dict d: Context dict, as `ResolvedContext.to_dict()` returns
+    :param package_paths: Package paths to resolve with, default None
+    :param settings: Resolve settings of parent process, see
+        `_resolve_settings`
+    :type package_paths: list[str] or None
+    :type settings: dict or None
+    :return: Re-resolved context dict, or None if the context is broken.
+    :rtype: dict or None
+    """
+    if settings is not None:
+        _apply_resolve_settings(settings)
+    context = ResolvedContext.from_dict(d)
+    resolved = re_resolve_rxt(context, package_paths=package_paths)
+    return None if resolved.broken else resolved.to_dict()
+
+
+# Context entries that may differ between resolves of the same result
+_VolatileRxtKeys = (
+    "timestamp",
+    "created",
+    "from_cache",
+    "solve_time",
+    "load_time",
+    "num_loaded_packages",
+    "user",
+    "host",
+)
+
+
+# Context entries that differ between suites
+_SuiteRxtKeys = (
+    "parent_suite_path",
+    "suite_context_name",
+)
+
+
+def _read_text(filepath):
+    try:
+        with open(filepath, "r") as f:
+            return f.read()
+    except (IOError, OSError):
+        return None
+
+
+def _update_file(filepath, content):
+    """Write content into file, only if file content is different
+
+    :param str filepath: File path
+    :param str content: File content
+    :return: True if file is written
+    :rtype: bool
+    """
+    existing = _read_text(filepath)
+    if existing == content:
+        return False
+    _write_file(filepath, content)
+    return True
+
+
+def _write_file(filepath, content):
+    """Write content into a new file, replacing the existing one
+
+    Existing file is removed instead of being written over, in case it is
+    read-only or hard-linked.
+
+    :param str filepath: File path
+    :param content: File content
+    :type content: str or bytes
+    :return: None
+    """
+    if os.path.lexists(filepath):
+        os.remove(filepath)
+    else:
+        _dir_path = os.path.dirname(filepath)
+        if not os.path.isdir(_dir_path):
+            os.makedirs(_dir_path, exist_ok=True)
+    mode = "wb" if isinstance(content, bytes) else "w"
+    with open(filepath, mode) as f:
+        f.write(content)
+
+
+_SuiteDicts = OrderedDict()  # filepath: (stat key, suite dict)
+_SuiteDictsLock = threading.Lock()  # shared by scan and GUI threads
+_MaxSuiteDicts = 1024
+
+
+def _load_suite_dict(filepath):
+    """Parse suite.yaml into dict, or get the parsed one from memory
+
+    File is parsed with libyaml's safe loader if PyYAML is built with it,
+    and the result is kept in memory until the file changed (by mtime, size
+    and inode), so going through many suites again costs only a stat call.
+
+    :param str filepath: suite.yaml file path
+    :return: A copy of parsed suite dict
+    :rtype: dict
+    """
+    st = os.stat(filepath)
+    key = (st.st_mtime_ns, st.st_size, st.st_ino)
+    with _SuiteDictsLock:
+        cached = _SuiteDicts.get(filepath)
+        if cached is not None and cached[0] == key:
+            _SuiteDicts.move_to_end(filepath)
+    if cached is not None and cached[0] == key:
+        return copy.deepcopy(cached[1])
+
+    with open(filepath, "rb") as f:
+        content = f.read()
+    suite_dict = None
+    if _CSafeLoader is not None:
+        loader = _CSafeLoader(content)
+        try:
+            suite_dict = loader.get_single_data()
+        except _CYAMLError:
+            pass  # e.g. python tags that safe loader can't construct
+        finally:
+            loader.dispose()
+    if suite_dict is None:
+        suite_dict = yaml.load(content, Loader=yaml.FullLoader)  # noqa
+
+    with _SuiteDictsLock:
+        _SuiteDicts[filepath] = (key, suite_dict)
+        while len(_SuiteDicts) > _MaxSuiteDicts:
+            _SuiteDicts.popitem(last=False)
+    return copy.deepcopy(suite_dict)
+
+
+def _suite_index(filepath=None, roots=None):
+    from .index import SuiteIndex
+    if filepath is None:
+        filepath = os.path.join(sweetconfig.cache_root, SuiteIndex.FileName)
+    return SuiteIndex(filepath, roots=roots or sweetconfig.suite_roots)
+
+
+def _update_index(update):
+    # Suite index is only a cache of saved suites, failing to update it
+    # should never fail suite saving or archiving.
+    try:
+        update(_suite_index())
+    except Exception as e:
+        log.warning(f"Failed to update suite index: {str(e)}")
+
+
+def _same_rxt(saved, content):
+    if saved == content:
+        return True
+    try:
+        saved, content = json.loads(saved), json.loads(content)
+    except ValueError:
+        try:  # rxt_as_yaml
+            saved = yaml.load(saved, Loader=yaml.FullLoader)  # noqa
+            content = yaml.load(content, Loader=yaml.FullLoader)  # noqa
+        except yaml.YAMLError:  # noqa
+            return False
+    if not isinstance(saved, dict):
+        return False
+    for key in _VolatileRxtKeys:
+        saved.pop(key, None)
+        content.pop(key, None)
+    return saved == content
+
+
+def _forwarding_script_path(filepath):
+    # see `rez.utils.execution.create_forwarding_script`
+    if platform_.name == "windows" \
+            and os.path.splitext(filepath)[-1].lower() != ".cmd":
+        filepath += ".cmd"
+    return filepath
+
+
+def _update_forwarding_script(filepath, module, func_name, **kwargs):
+    """Create forwarding script, only if it differs from the existing one
+
+    :param str filepath: Script file path
+    :param module: Module (or rez plugin) that the function is in
+    :param str func_name: Function name to forward to
+    :param kwargs: Keyword arguments to pass to the function
+    :type module: str or tuple
+    :return: True if the script is written
+    :rtype: bool
+    """
+    existing = _read_text(filepath)
+    if existing is not None:
+        doc = dict(module=module, func_name=func_name)
+        if kwargs:
+            doc["kwargs"] = kwargs
+        body = dump_yaml(doc)
+        # skip shebang or Windows batch header
+        if platform_.name == "windows":
+            _, _, existing = existing.partition(":: YAML\n")
+        else:
+            _, _, existing = existing.partition("\n")
+        if existing.rstrip("\n") == body.rstrip("\n"):
+            return False
+        os.remove(filepath)  # forwarding script is read-only
+
+    create_forwarding_script(filepath, module, func_name, **kwargs)
+    return True
+
+
+def _staging_path(path, purpose):
+    # hidden, so won't be listed as saved suite. Named with host and pid, as
+    # suite roots may be shared between hosts.
+    dir_path, name = os.path.split(path)
+    return os.path.join(dir_path, ".%s.%s-%s-%d"
+                        % (name, purpose, socket.gethostname(), os.getpid()))
+
+
+_StagingName = re.compile(r"^\.(?P<name>.+)\.(?P<purpose>saving|replaced)"
+                          r"-(?P<host>.+)-(?P<pid>\d+)$")
+_StagingMaxAge = 24 * 60 * 60  # seconds, for those can't be probed
+
+
+def _is_stale(match, path):
+    """True if the process that owns a staging directory has gone
+
+    Process can only be probed on this host. Staging directories of other
+    hosts (or on Windows) are considered stale once not modified for
+    `_StagingMaxAge`.
+    """
+    pid = int(match.group("pid"))
+    if match.group("host") != socket.gethostname() \
+            or platform_.name == "windows":  # os.kill() can't probe there
+        try:
+            return time.time() - os.stat(path).st_mtime > _StagingMaxAge
+        except OSError:
+            return False  # e.g. removed by its owner
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass  # e.g. EPERM, it exists
+    return False
+
+
+def _recover_suite_dir(path):
+    """Restore or remove directories that an interrupted save left behind
+
+    If a save was interrupted in between renaming the previous suite away
+    (`.name.replaced-<host>-<pid>`) and renaming the new one into place, the
+    suite is restored from the former. Other leftovers, including the
+    staging directory (`.name.saving-<host>-<pid>`), are removed. Those that
+    may still belong to a running save are left as is, see `_is_stale`.
+
+    This is only done on save or on explicit repair (`SweetSuite.recover`),
+    never while only reading suites.
+
+    :param str path: Suite directory path
+    :return: True if the suite directory was restored
+    :rtype: bool
+    """
+    dir_path, name = os.path.split(path)
+    try:
+        names = os.listdir(dir_path)
+    except OSError:
+        return False
+
+    leftovers = []
+    for entry_name in names:
+        match = _StagingName.match(entry_name)
+        leftover = os.path.join(dir_path, entry_name)
+        if match and match.group("name") == name \
+                and _is_stale(match, leftover):
+            leftovers.append((match.group("purpose"), leftover))
+
+    restored = False
+    # backups first, so the suite is restored before staging gets removed
+    leftovers.sort(key=lambda x: x[0] != "replaced")
+    for purpose, leftover in leftovers:
+        if purpose == "replaced" and not os.path.exists(path):
+            log.warning(f"Restoring suite {path!r} from {leftover!r}, which "
+                        f"was left by an interrupted save.")
+            os.rename(leftover, path)
+            restored = True
+        else:
+            log.debug(f"Removing {leftover!r}, left by an interrupted save.")
+            forceful_rmtree(leftover)
+    return restored
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)  # e.g. filesystem doesn't support hard link
+
+
+def _link_tree(src, dst):
+    """Copy directory tree with hard links
+
+    Files in `dst` must be removed before being rewritten, or the change
+    will be seen in `src` as well.
+
+    :param str src: Source directory
+    :param str dst: Destination directory, must not exist
+    :return: None
+    """
+    shutil.copytree(src, dst, symlinks=True, copy_function=_link_or_copy)
+
+
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+_renameat2 = None
+
+
+def _exchange_dirs(src, dst):
+    """Atomically swap two directories with renameat2(RENAME_EXCHANGE)
+
+    :param str src: Directory path
+    :param str dst: Directory path
+    :return: False if not supported by the platform or filesystem
+    :rtype: bool
+    """
+    global _renameat2
+    if _renameat2 is None:
+        _renameat2 = False
+        if sys.platform.startswith("linux"):
+            try:
+                _renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+            except (OSError, AttributeError):
+                pass  # e.g. glibc < 2.28
+            else:
+                _renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p,
+                                       ctypes.c_int, ctypes.c_char_p,
+                                       ctypes.c_uint]
+    if not _renameat2:
+        return False
+
+    ret = _renameat2(_AT_FDCWD, os.fsencode(src),
+                     _AT_FDCWD, os.fsencode(dst), _RENAME_EXCHANGE)
+    if ret == 0:
+        return True
+    err = ctypes.get_errno()
+    if err in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+        return False  # e.g. not supported by filesystem
+    raise OSError(err, os.strerror(err), dst)
+
+
+def _replace_dir(src, dst):
+    """Rename directory `src` to `dst`, replacing the existing one
+
+    Both are swapped atomically where supported, and the previous one is
+    then removed from `src`. Otherwise the previous one is renamed away
+    first, see `_recover_suite_dir` for recovering from an interruption in
+    between.
+
+    :param str src: Directory to rename
+    :param str dst: Destination path
+    :return: None
+    """
+    if not os.path.exists(dst):
+        os.rename(src, dst)
+        return
+
+    if _exchange_dirs(src, dst):
+        forceful_rmtree(src)
+        return
+
+    backup = _staging_path(dst, "replaced")
+    os.rename(dst, backup)
+    try:
+        os.rename(src, dst)
+    except OSError:
+        os.rename(backup, dst)
+        raise
+    forceful_rmtree(backup)
+
+
+def _run_jobs(jobs, workers=None, progress=None):
+    """Run jobs in a thread pool, raise the first error if any
+
+    :param jobs: Callables that take no argument
+    :param workers: Max number of threads. Use `save_workers` in sweet's
+        rezconfig if not given. Jobs run in current thread if less than 2.
+    :param progress: Callback that receives (done, total) jobs count
+    :type jobs: list[callable]
+    :type workers: int or None
+    :type progress: callable or None
+    :return: None
+    """
+    total = len(jobs)
+    if workers is None:
+        workers = sweetconfig.save_workers
+
+    if workers < 2 or total < 2:
+        for i, job in enumerate(jobs):
+            job()
+            if progress is not None:
+                progress(i + 1, total)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(job) for job in jobs]
+        try:
+            for i, future in enumerate(as_completed(futures)):
+                future.result()
+                if progress is not None:
+                    progress(i + 1, total)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def _remove_unlisted(dir_path, filepaths):
+    """Remove files in `dir_path` that are not in `filepaths`"""
+    if not os.path.isdir(dir_path):
+        return
+    for entry in os.scandir(dir_path):
+        if entry.path in filepaths:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            forceful_rmtree(entry.path)
+        else:
+            os.remove(entry.path)
 
 
 def re_resolve_rxt(context, package_paths=None):
@@ -1064,6 +2408,46 @@ class _Suite(Suite):
         return s
 
 
+_ParentEnvMarker = "__SWEET_PARENT_ENV__"
+
+
+def _baked_environ(context):
+    """Compute context environment for baking, see `_save_context_env`
+
+    :param context: a resolved context object
+    :type context: ResolvedContext
+    :return: Environment that has `_ParentEnvMarker` in place of parent
+        values, without saving host's system paths.
+    :rtype: dict
+    """
+    # variables that are prepended/appended onto parent value, instead of
+    # being (re)set on first reference
+    inherited = set()
+    touched = set()
+    for action in context.get_actions(parent_environ={}):
+        key = getattr(action, "key", None)
+        if key is None or key in touched:
+            continue
+        touched.add(key)
+        if action.name in ("prependenv", "appendenv"):
+            inherited.add(key)
+
+    append_sys_path = context.append_sys_path
+    context.append_sys_path = False
+    try:
+        environ = context.get_environ(
+            parent_environ={k: _ParentEnvMarker for k in inherited})
+    finally:
+        context.append_sys_path = append_sys_path
+
+    if append_sys_path and "PATH" not in inherited:
+        # in place of system paths, which are appended after context's
+        path = environ.get("PATH")
+        environ["PATH"] = os.pathsep.join([path, _ParentEnvMarker]) \
+            if path else _ParentEnvMarker
+    return environ
+
+
 class SweetSuite(_Suite):
     """A collection of contexts. (run tools in live resolved context)
 
@@ -1088,11 +2472,15 @@ class SweetSuite(_Suite):
     Additional entries SweetSuite's suite.yaml:
         - description
         - is_live
+        - is_frozen
     """
+    ManifestName = "tools.json"
+
     def __init__(self):
         super(SweetSuite, self).__init__()
         self._description = ""
         self._is_live = True
+        self._is_frozen = False
 
     def context(self, name):
         """Get a context.
@@ -1102,7 +2490,8 @@ class SweetSuite(_Suite):
         with RollingContext.patch_rolling_context():
             return super(SweetSuite, self).context(name)
 
-    def save(self, path, as_archived=False, verbose=False):
+    def save(self, path, as_archived=False, verbose=False, workers=None,
+             progress=None):
         """Save the suite to disk.
 
         Args:
@@ -1111,49 +2500,131 @@ class SweetSuite(_Suite):
                 exists, an error is raised.
             as_archived (bool): Save suite as archived
             verbose (bool): Show more messages.
+            workers (int): Number of threads for writing contexts and tool
+                wrappers. Use `save_workers` in sweet's rezconfig if not
+                given.
+            progress (callable): Callback that receives the number of done
+                and total write jobs, called as each job completes.
         """
-        if verbose and self._is_live:
+        if verbose and self._is_frozen:
+            print("saving frozen suite...")
+        elif verbose and self._is_live:
             print("saving live suite...")
 
-        # todo:
-        #   1. instead of wiping it all out, cherry-pick tools to update/remove
-        #       by requests.
-        #   2. make a copy of current suite (in timestamp dir)
+        # todo: make a copy of current suite (in timestamp dir)
 
         path = os.path.realpath(path)
         if os.path.exists(path):
             if self.load_path and self.load_path == path:
                 if verbose:
                     print("saving over previous suite...")
-                for context_name in self.context_names:
-                    self.context(context_name)  # load before dir deleted
-
-                forceful_rmtree(path)
             else:
                 raise SuiteError("Cannot save, path exists: %r" % path)
 
-        os.makedirs(path)
-        if as_archived:
-            Storage.set_archived(path, archive=True)
+        # note: suite is written into a staging directory next to `path`
+        #   and then renamed into place, so the previous suite stays intact
+        #   if saving failed, and tools never see a half-written suite.
+        #   When saving over previous suite, the staging directory starts
+        #   as a hard-linked copy of it, and only what has changed will be
+        #   written.
+        _recover_suite_dir(path)
+        staging = _staging_path(path, "saving")
+        if os.path.exists(staging):
+            forceful_rmtree(staging)  # left by a crashed save
+        previous = ContextStore.references(path)
+        try:
+            if os.path.exists(path):
+                _link_tree(path, staging)
+            else:
+                os.makedirs(staging)
+            self._save_into(staging, path, as_archived, verbose,
+                            workers=workers, progress=progress)
+            _replace_dir(staging, path)
+        except BaseException:
+            if os.path.exists(staging):
+                forceful_rmtree(staging)
+            raise
+
+        # stored contexts that this suite no longer references
+        dropped = previous - ContextStore.references(path)
+        if dropped:
+            try:
+                ContextStore.of_suite(path).prune(dropped)
+            except OSError as e:
+                log.debug(f"Failed to prune context store: {str(e)}")
+
+    def _save_into(self, staging, path, as_archived=False, verbose=False,
+                   workers=None, progress=None):
+        """Write suite into staging directory
+
+        Only files that have changed will be written, and contexts/tools that
+        are no longer in suite will be removed.
+
+        :param str staging: Staging directory to write into
+        :param str path: Path that suite will be saved to
+        :param bool as_archived: Save suite as archived
+        :param bool verbose: Show more messages.
+        :param workers: Number of threads for writing contexts and wrappers.
+        :param progress: Callback that receives (done, total) write jobs.
+        :type workers: int or None
+        :type progress: callable or None
+        :return: None
+        """
+        Storage.set_archived(staging, archive=as_archived)
+
+        self._update_fingerprints()
 
         # write suite data
-        data = self.to_dict()
-        filepath = os.path.join(path, "suite.yaml")
-        with open(filepath, "w") as f:
-            f.write(dump_yaml(data))
+        filepath = os.path.join(staging, "suite.yaml")
+        suite_changed = _update_file(filepath, dump_yaml(self.to_dict()))
+
+        # note: contexts and wrappers are collected as write jobs first, so
+        #   they can be written concurrently. Loading contexts and getting
+        #   tools are done here, not in worker threads.
+        jobs = []
 
         # write contexts
+        contexts_path = os.path.join(staging, "contexts")
+        if not os.path.isdir(contexts_path):
+            os.makedirs(contexts_path)
+
+        context_files = set()
         for context_name in self.context_names:
             context = self.context(context_name)
             context._set_parent_suite(path, context_name)  # noqa
-            self._save_context_rxt(context_name, context, path)
+            context_files.add(self._context_path(context_name, staging))
+            if sweetconfig.compact_context:
+                context_files.add(compact.compact_path(
+                    self._context_path(context_name, staging)
+                ))
+            if sweetconfig.context_store:
+                context_files.add(ContextStore.ref_path(
+                    self._context_path(context_name, staging)
+                ))
+            if self._is_frozen:
+                context_files.add(
+                    self._context_env_path(context_name, staging)
+                )
+            if self._context(context_name).get("fingerprint"):
+                context_files.add(
+                    self._context_fingerprint_path(context_name, staging)
+                )
+            jobs.append(functools.partial(
+                self._save_context, context_name, context, staging, verbose,
+                store=ContextStore.of_suite(path)
+                if sweetconfig.context_store else None,
+            ))
+
+        _remove_unlisted(contexts_path, context_files)
 
         # create alias wrappers
-        tools_path = os.path.join(path, "bin")
-        os.makedirs(tools_path)
+        tools_path = os.path.join(staging, "bin")
+        if not os.path.isdir(tools_path):
+            os.makedirs(tools_path)
         if verbose:
             print("creating alias wrappers in %r..." % tools_path)
 
+        tool_files = set()
         tools = self.get_tools()
         for tool_alias, d in tools.items():
             tool_name = d["tool_name"]
@@ -1162,16 +2633,20 @@ class SweetSuite(_Suite):
             data = self._context(context_name)
             prefix_char = data.get("prefix_char")
 
-            if verbose:
-                print("creating %r -> %r (%s context)..."
-                      % (tool_alias, tool_name, context_name))
             filepath = os.path.join(tools_path, tool_alias)
 
-            if self._is_live:
+            if self._is_frozen:
+                kwargs = {
+                    "module": ("command", "sweet"),  # rez plugin
+                    "func_name": "_FWD__invoke_suite_tool_alias_frozen",
+                    "context_name": context_name,
+                    "tool_name": tool_name,
+                }
+            elif self._is_live:
                 context = data["context"]
                 requests = [str(r) for r in context.requested_packages()]
-                # todo: instead of parsing requests, load the rxt and re-resolve
-                #   again.
+                # note: requests are for resolving in current config, or as
+                #   a fallback when launching from the .rxt is not possible.
                 kwargs = {
                     "module": ("command", "sweet"),  # rez plugin
                     "func_name": "_FWD__invoke_suite_tool_alias_in_live",
@@ -1189,7 +2664,117 @@ class SweetSuite(_Suite):
                     "prefix_char": prefix_char,
                 }
 
-            create_forwarding_script(filepath, **kwargs)
+            filepath = _forwarding_script_path(filepath)
+            tool_files.add(filepath)
+            jobs.append(functools.partial(
+                self._save_tool, filepath, tool_alias, kwargs, verbose
+            ))
+
+        _remove_unlisted(tools_path, tool_files)
+
+        # write tool manifest, for browsing suite without loading contexts.
+        #   must not be older than suite.yaml, or it's considered outdated.
+        filepath = os.path.join(staging, self.ManifestName)
+        content = json.dumps(self._tool_manifest(), indent=4, sort_keys=True)
+        if suite_changed:
+            _write_file(filepath, content)
+        else:
+            _update_file(filepath, content)
+
+        _run_jobs(jobs, workers=workers, progress=progress)
+
+    def _tool_manifest(self):
+        sop = SuiteOp()
+        sop._working_suite = self
+        return {
+            "version": 1,
+            "contexts": [
+                {
+                    "name": ctx.name,
+                    "priority": ctx.priority,
+                    "usable": ctx.context.usable,
+                }
+                for ctx in sop.iter_contexts()
+            ],
+            "tools": [
+                {
+                    "name": tool.name,
+                    "alias": tool.alias,
+                    "status": tool.status,
+                    "context": tool.ctx_name,
+                    "variant": {
+                        "qualified_name": tool.variant.qualified_name,
+                        "uri": tool.uri,
+                        "location": tool.location,
+                    },
+                    "ambiguous": tool.ambiguous,
+                }
+                for tool in sop.iter_tools()
+            ],
+        }
+
+    @classmethod
+    def read_manifest(cls, path):
+        """Read tool manifest of a saved suite
+
+        :param str path: Suite directory path
+        :return: Manifest data, or None if not exists or older than
+            suite.yaml (e.g. suite saved by previous version).
+        :rtype: dict or None
+        """
+        filepath = os.path.join(path, cls.ManifestName)
+        try:
+            suite_mtime = os.stat(os.path.join(path, "suite.yaml")).st_mtime_ns
+            if os.stat(filepath).st_mtime_ns < suite_mtime:
+                return None
+            with open(filepath, "r") as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _save_context(self, name, context, path, verbose=False, store=None):
+        """Save context .rxt, and compact context or baked environment
+
+        :param name: context name
+        :param context: a resolved context object
+        :param path: path to save the context
+        :param verbose: Show more messages.
+        :param store: Context store to put context into and reference from.
+        :type name: str
+        :type context: ResolvedContext
+        :type path: str
+        :type verbose: bool
+        :type store: ContextStore or None
+        :return: None
+        """
+        changed = self._save_context_rxt(name, context, path)
+        if store is not None:
+            ref_path = ContextStore.ref_path(self._context_path(name, path))
+            if changed or not os.path.isfile(ref_path):
+                stored = store.put(context)
+                relpath = os.path.relpath(stored, os.path.dirname(ref_path))
+                _write_file(ref_path, relpath)
+        if sweetconfig.compact_context:
+            filepath = compact.compact_path(self._context_path(name, path))
+            if changed or not os.path.isfile(filepath):
+                _write_file(filepath, compact.dumps(context))
+        if self._is_frozen:
+            env_path = self._context_env_path(name, path)
+            if changed or not os.path.isfile(env_path):
+                self._save_context_env(name, context, path)
+        fingerprint = self._context(name).get("fingerprint")
+        if fingerprint:
+            # for live tool launch, so suite.yaml doesn't need to be parsed
+            _update_file(self._context_fingerprint_path(name, path),
+                         json.dumps({"fingerprint": fingerprint}))
+        if verbose and not changed:
+            print("context %r unchanged." % name)
+
+    @staticmethod
+    def _save_tool(filepath, tool_alias, kwargs, verbose=False):
+        if _update_forwarding_script(filepath, **kwargs) and verbose:
+            print("creating %r -> %r (%s context)..."
+                  % (tool_alias, kwargs["tool_name"], kwargs["context_name"]))
 
     def to_dict(self):
         """Parse suite into dict
@@ -1199,6 +2784,7 @@ class SweetSuite(_Suite):
         data = super(SweetSuite, self).to_dict()
         data["description"] = self._description
         data["live_resolve"] = self._is_live
+        data["frozen"] = self._is_frozen
         return data
 
     @classmethod
@@ -1210,6 +2796,41 @@ class SweetSuite(_Suite):
         s = super(SweetSuite, cls).from_dict(d)
         s._description = d.get("description", "")
         s._is_live = d.get("live_resolve", False)
+        s._is_frozen = d.get("frozen", False)
+        return s
+
+    @classmethod
+    def recover(cls, path):
+        """Restore suite from what an interrupted save left behind
+
+        Leftovers that may still belong to a running save, on this or other
+        host, are left as is. This is also done on save.
+
+        :param str path: Suite directory path
+        :return: True if the suite directory was restored
+        :rtype: bool
+        """
+        return _recover_suite_dir(os.path.realpath(path))
+
+    @classmethod
+    def load(cls, path):
+        """Load suite from path, without loading contexts
+        :return:
+        :rtype: SweetSuite
+        """
+        if not os.path.exists(path):
+            open(path)  # raise IOError
+        filepath = os.path.join(path, "suite.yaml")
+        if not os.path.isfile(filepath):
+            raise SuiteError("Not a suite: %r" % path)
+
+        try:
+            data = _load_suite_dict(filepath)
+        except (yaml.YAMLError, _CYAMLError) as e:  # noqa
+            raise SuiteError("Failed loading suite: %s" % str(e))
+
+        s = cls.from_dict(data)
+        s.load_path = os.path.realpath(path)
         return s
 
     def add_context(self, name, context, prefix_char=None):
@@ -1224,7 +2845,10 @@ class SweetSuite(_Suite):
     #
 
     def _save_context_rxt(self, name, context, path):
-        """Save context .rxt
+        """Save context .rxt, if it's not the same as the saved one
+
+        The context is considered unchanged if only the volatile entries
+        (e.g. creation time, solve time) differ from the saved one.
 
         :param name: context name
         :param context: a resolved context object
@@ -1232,13 +2856,57 @@ class SweetSuite(_Suite):
         :type name: str
         :type context: ResolvedContext
         :type path: str
-        :return:
+        :return: True if the .rxt file is written
+        :rtype: bool
         """
         filepath = self._context_path(name, path)
-        _dir_path = os.path.dirname(filepath)
-        if not os.path.isdir(_dir_path):
-            os.makedirs(_dir_path)
-        context.save(filepath)
+        buf = StringIO()
+        context.write_to_buffer(buf)
+        content = buf.getvalue()
+
+        saved = _read_text(filepath)
+        if saved is not None and _same_rxt(saved, content):
+            return False
+
+        _update_file(filepath, content)
+        return True
+
+    def _save_context_env(self, name, context, path):
+        """Save context's baked environment and shell code
+
+        The environment is computed without parent environment nor system
+        paths, so it can be applied on top of the environment where suite
+        tool is launched. Where the launching environment should be kept,
+        i.e. the system paths in `PATH` and the parent variables that are
+        prepended/appended, the value holds `parent_marker` instead, which
+        is replaced by the launching environment's value on launch.
+
+        :param name: context name
+        :param context: a resolved context object
+        :param path: path to save the context
+        :type name: str
+        :type context: ResolvedContext
+        :type path: str
+        :return:
+        """
+        shell = rezconfig.default_shell or system.shell
+        data = {
+            "environ": _baked_environ(context),
+            "parent_marker": _ParentEnvMarker,
+            "shell": shell,
+            "shell_code": context.get_shell_code(shell=shell,
+                                                 parent_environ={}),
+        }
+        filepath = self._context_env_path(name, path)
+        _update_file(filepath, json.dumps(data, indent=4, sort_keys=True))
+
+    @classmethod
+    def _context_env_path(cls, name, path):
+        return os.path.join(path, "contexts", "%s.env.json" % name)
+
+    @classmethod
+    def _context_fingerprint_path(cls, name, path):
+        return os.path.join(path, "contexts", "%s.fingerprint.json" % name)
 
     def set_live(self, value):
         self._is_live = value
@@ -1246,6 +2914,12 @@ class SweetSuite(_Suite):
     def is_live(self):
         return self._is_live
 
+    def set_frozen(self, value):
+        self._is_frozen = value
+
+    def is_frozen(self):
+        return self._is_frozen
+
     @property
     def description(self):
         return self._description
@@ -1317,6 +2991,7 @@ class SweetSuite(_Suite):
         data["context"] = context.copy()
         data["tool_aliases"] = aliases
         data["hidden_tools"] = hidden
+        data.pop("fingerprint", None)  # recorded on save
         if context.load_path:
             data["loaded"] = True
         else:
@@ -1324,17 +2999,127 @@ class SweetSuite(_Suite):
 
         self._flush_tools()
 
-    def re_resolve_rxt_contexts(self, package_paths=None):
+    def _update_fingerprints(self):
+        """Record package repositories fingerprint of each context
+
+        Fingerprint is recorded only if nothing changed in context's package
+        paths since it's resolved, so it can be used to tell whether context
+        is still current after saved.
+        """
+        fingerprints = dict()
+        newest = dict()
+        for name in self.context_names:
+            context = self.context(name)
+            data = self._context(name)
+            paths = tuple(context.package_paths)
+            if paths not in fingerprints:
+                fingerprints[paths] = repository_fingerprint(paths)
+                # note: check after computing fingerprint, so packages
+                #   released in between won't be missed.
+                newest[paths] = repository_newest(paths)
+            if context.success and context_is_current(context,
+                                                      newest=newest[paths]):
+                data["fingerprint"] = fingerprints[paths]
+            else:
+                data.pop("fingerprint", None)
+
+    def re_resolve_rxt_contexts(self, package_paths=None, workers=None,
+                                callback=None):
         """Re-resolve all contexts that loaded from .rxt files
-        :return:
+
+        Contexts are re-resolved concurrently in a process pool, and updated
+        into suite in the order they are resolved. Contexts will not be
+        re-resolved if nothing changed in their package paths since saved,
+        but are updated into suite as if they were, i.e. no longer marked as
+        loaded from .rxt.
+
+        :param package_paths: Package paths to resolve with, default None
+        :param workers: Max number of processes. Use `resolve_workers` in
+            sweet's rezconfig if not given. Resolve in current process if
+            less than 2.
+        :param callback: Called with context name and the updated context,
+            as each context is re-resolved.
+        :type package_paths: list[str] or None
+        :type workers: int or None
+        :type callback: callable or None
+        :return: None
         """
+        def _update(name_, context_):
+            self.update_context(name_, context_)
+            if callback is not None:
+                callback(name_, self.context(name_))
+
+        loaded = []
+        fingerprints = dict()
         for name in list(self.contexts.keys()):
             context = self.context(name)
-            if context.load_path:
-                self.update_context(
-                    name,
-                    re_resolve_rxt(context, package_paths=package_paths),
-                )
+            if not context.load_path:
+                continue
+
+            paths = tuple(context.package_paths)
+            saved = self._context(name).get("fingerprint")
+            if saved and (package_paths is None
+                          or tuple(package_paths) == paths):
+                if paths not in fingerprints:
+                    fingerprints[paths] = repository_fingerprint(paths)
+                if saved == fingerprints[paths]:
+                    log.debug(f"Context {name!r} is current, "
+                              f"skip re-resolve.")
+                    # would be resolved the same
+                    current = context.copy()
+                    current.set_load_path(None)
+                    _update(name, current)
+                    continue
+
+            loaded.append((name, context))
+
+        if workers is None:
+            workers = sweetconfig.resolve_workers
+
+        settings = None
+        if workers > 1 and len(loaded) > 1:
+            paths = set(package_paths or [])
+            for _, context in loaded:
+                paths.update(context.package_paths)
+            settings = _resolve_settings(sorted(paths))
+            if settings is None:
+                log.debug("Config overrides can not be passed to worker "
+                          "processes, re-resolve in current process.")
+
+        if settings is None:
+            for name, context in loaded:
+                _update(name, re_resolve_rxt(context, package_paths))
+            return
+
+        # note: workers are spawned, not forked, since this may run in a
+        #   thread of a multithreaded (GUI) process.
+        mp_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers,
+                                 mp_context=mp_context) as executor:
+            futures = {
+                executor.submit(
+                    _re_resolve_rxt_dict, context.to_dict(), package_paths,
+                    settings
+                ): (name, context)
+                for name, context in loaded
+            }
+            for future in as_completed(futures):
+                name, context = futures[future]
+                try:
+                    d = future.result()
+                except Exception as e:
+                    log.debug(f"Failed to re-resolve {name!r} in process "
+                              f"pool: {str(e)}")
+                    d = None
+
+                if d is None:
+                    # re-resolve in current process for the broken context
+                    resolved = re_resolve_rxt(context, package_paths)
+                else:
+                    with RollingContext.patch_rolling_context():
+                        resolved = RollingContext.from_dict(d)
+
+                _update(name, resolved)
 
     def _update_tools(self, suppress_err=False):
         report_err = self.tools is None  # only after tools were flushed
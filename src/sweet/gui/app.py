@@ -111,6 +111,7 @@ class Session(object):
         ctrl.pkg_scan_started.connect(installed_pkg_model.reset)
         ctrl.pkg_families_scanned.connect(installed_pkg_model.add_families)
         ctrl.pkg_versions_scanned.connect(installed_pkg_model.add_versions)
+        ctrl.pkg_scan_ended.connect(installed_pkg_model.flush_families)
         ctrl.context_added.connect(tool_stack_model.on_context_added)
         ctrl.context_renamed.connect(tool_stack_model.on_context_renamed)
         ctrl.context_dropped.connect(tool_stack_model.on_context_dropped)
@@ -132,6 +133,7 @@ class Session(object):
         ctrl.suite_loaded.connect(suite_head.on_suite_loaded)
         ctrl.suite_loaded.connect(lambda *_: view_.switch_tab(1))  # editor
         ctrl.suite_archived.connect(storage_view.on_suite_archived)
+        ctrl.storage_changed.connect(storage_view.on_storage_changed)
         ctrl.suite_viewed.connect(storage_suite.on_suite_viewed)
         ctrl.context_added.connect(context_list.on_context_added)
         ctrl.context_added.connect(stacked_request.on_context_added)
@@ -1,4 +1,5 @@
 
+import time
 import logging
 import inspect
 import traceback
@@ -12,11 +13,13 @@ from ..core import (
     RollingContext,
     InstalledPackages,
     Storage,
+    StorageMonitor,
     SuiteCtx,
     SavedSuite,
     PkgFamily,
     PkgVersion,
     re_resolve_rxt,
+    sweetconfig,
 )
 from ._vendor.Qt5 import QtCore, QtWidgets
 from .widgets import BusyWidget, YesNoDialog, MessageDialog, ComboBox
@@ -136,13 +139,18 @@ class Controller(QtCore.QObject):
     tools_updated = QtCore.Signal(list)
     pkg_scan_started = QtCore.Signal()
     pkg_families_scanned = QtCore.Signal(list)
-    pkg_versions_scanned = QtCore.Signal(list)
+    pkg_versions_scanned = QtCore.Signal(list)  # versions of each family
     pkg_scan_ended = QtCore.Signal()
     storage_scan_started = QtCore.Signal()
     storage_scanned = QtCore.Signal(list)
     storage_scan_ended = QtCore.Signal()
+    storage_changed = QtCore.Signal(list)
+    storage_watched = QtCore.Signal(list)
     status_message = QtCore.Signal(str, int)
 
+    PkgBatchSize = 500  # max families in one `pkg_versions_scanned` batch
+    PkgBatchInterval = 0.2  # max seconds to collect one batch
+
     def __init__(self):
         super(Controller, self).__init__(parent=None)
 
@@ -156,6 +164,8 @@ class Controller(QtCore.QObject):
 
         self._sop = SuiteOp()
         self._sto = Storage()
+        self._monitor = StorageMonitor(self._sto)
+        self._watcher = QtCore.QFileSystemWatcher(self)
         self._pkg = InstalledPackages()
         self._dirty = False
         self._edited = set()
@@ -164,12 +174,24 @@ class Controller(QtCore.QObject):
         self._timers = dict()
         self._sender = dict()
         self._thread = dict()  # type: dict[str, Thread]
+        self._storage_changes = set()  # changed paths, None for all
 
         self._resolve_param = {
             # exclude local packages by default
             "package_paths": rezconfig.nonlocal_packages_path,
         }
 
+        if sweetconfig.storage_watch:
+            # note: file system notification may not cover changes made
+            #   from other hosts (e.g. network shares), hence the optional
+            #   polling, which rescans whole storage.
+            self._watcher.directoryChanged.connect(self.on_storage_changed)
+            self.storage_watched.connect(self._set_watched_paths)
+            if sweetconfig.storage_poll_interval > 0:
+                poll_timer = QtCore.QTimer(self)
+                poll_timer.timeout.connect(self.on_storage_polled)
+                poll_timer.start(sweetconfig.storage_poll_interval * 1000)
+
         _defer(on_time=500)(Controller.scan_suite_storage)(self)
         _defer(on_time=500)(Controller.scan_installed_packages)(self)
         _defer(on_time=600)(Controller.new_suite)(self)
@@ -268,6 +290,38 @@ class Controller(QtCore.QObject):
     def on_suite_storage_scan_clicked(self, archived):
         self.scan_suite_storage(archived)
 
+    @QtCore.Slot(str)  # noqa
+    def on_storage_changed(self, path):
+        self._storage_changes.add(path)
+        self._check_storage_changes()
+
+    @QtCore.Slot()  # noqa
+    def on_storage_polled(self):
+        self._storage_changes.add(None)
+        self._check_storage_changes()
+
+    @_defer(on_time=1000)  # changes usually come in bursts, e.g. on save
+    def _check_storage_changes(self):
+        busy = [self._thread.get(n) for n in ("scanSuite", "watchSuite")]
+        if any(t is not None and t.isRunning() for t in busy):
+            self._check_storage_changes()  # try again later
+            return
+        changes = self._storage_changes
+        self._storage_changes = set()
+        paths = None if None in changes else sorted(changes)
+        self.watch_suite_storage(paths)
+
+    @QtCore.Slot(list)  # noqa
+    def _set_watched_paths(self, paths):
+        watched = set(self._watcher.directories())
+        paths = set(paths)
+        removed = watched - paths
+        added = paths - watched
+        if removed:
+            self._watcher.removePaths(sorted(removed))
+        if added:
+            self._watcher.addPaths(sorted(added))
+
     @QtCore.Slot(list, bool)  # noqa
     def on_suites_archived(self, saved_suites, archive):
         self.set_suites_archived(saved_suites, archive)
@@ -426,8 +480,13 @@ class Controller(QtCore.QObject):
         path = self._sto.suite_path(branch, name)
         self._sop.set_description(description)
 
+        def progress(done, total):
+            self.status_message.emit(
+                f"Saving suite {name!r} ... {done}/{total}", 5000
+            )
+
         try:
-            self._sop.save(path)
+            self._sop.save(path, progress=progress)
 
         except SuiteReleaseError as e:
             message = f"{str(e)}\n" \
@@ -476,10 +535,18 @@ class Controller(QtCore.QObject):
             self.context_added.emit(ctx)
             self.context_stashed.emit(ctx.name, ctx.context)
 
-        # re-resolve contexts
-        self._sop.re_resolve_rxt_contexts(**self._resolve_param)
+        # re-resolve contexts, each one gets emitted once it's resolved
+        resolved = set()
+
+        def on_resolved(ctx_name, context):
+            resolved.add(ctx_name)
+            self.context_resolved.emit(ctx_name, context)
+
+        self._sop.re_resolve_rxt_contexts(callback=on_resolved,
+                                          **self._resolve_param)
         for ctx in self._sop.iter_contexts(ascending=True):
-            self.context_resolved.emit(ctx.name, ctx.context)
+            if ctx.name not in resolved:
+                self.context_resolved.emit(ctx.name, ctx.context)
 
         self._tools_updated()
         self._dirty = False
@@ -487,8 +554,8 @@ class Controller(QtCore.QObject):
 
     @_thread(name="suiteOp", blocks=("SuitePage", "StoragePage"))
     def view_suite(self, saved_suite):
-        # read contexts into suite
-        _ = list(saved_suite.iter_contexts())
+        # read contexts into suite, or from tool manifest if suite has one
+        _ = list(saved_suite.iter_saved_contexts())
         #   shouldn't raise any error while iterating contexts, because
         #   SweetSuite.contexts() already handled all exceptions with
         #   RollingContext yielded.
@@ -613,43 +680,67 @@ class Controller(QtCore.QObject):
         ct = QtCore.QThread.currentThread()
         log.info("Start scanning installed packages...")
         self.pkg_scan_started.emit()
-        self._pkg.clear_caches()
+
+        if sweetconfig.package_catalog:
+            # only families modified since last scan will be read
+            cataloged = {
+                (family.name, family.location): (family, versions)
+                for family, versions in self._pkg.iter_catalog()
+            }
+            families = [family for family, _ in cataloged.values()]
+
+            def iter_batches(batches_):
+                for i_, families_ in enumerate(batches_):
+                    yield i_, [v for f in families_
+                               for v in cataloged[(f.name, f.location)][1]]
+        else:
+            self._pkg.clear_caches()
+            families = self._pkg.iter_families()
+            iter_batches = self._pkg.iter_versions_concurrently
 
         # it's also important to sort before `groupby`
         family_key = (lambda f: f.name.lower())
         all_families = sorted(
-            self._pkg.iter_families(), key=family_key
+            families, key=family_key
         )  # type: list[PkgFamily]
 
         self.pkg_families_scanned.emit(all_families)
 
+        # ensure versions that belongs to same family get emitted in one
+        # batch.
         grouped_families = [
-            (k, list(ls)) for k, ls in groupby(all_families, key=family_key)
+            list(ls) for _, ls in groupby(all_families, key=family_key)
         ]
 
         _fm_count = len(grouped_families)
         _path_count = len(self._pkg.packages_path)
         log.info(f"Found {_fm_count} families from {_path_count} locations.")
         log.info("Scanning versions...")
-        _current = None
-        for i, (key, same_families) in enumerate(grouped_families):
-            # ensure versions that belongs to same family get emitted in one
-            # batch.
-            versions = []
-
-            for family in same_families:
-                if ct.isInterruptionRequested():  # could be long running proc
-                    break
-                name, location = family.name, family.location
-                versions += list(
-                    self._pkg.iter_versions(name, location)
-                )  # type: list[PkgVersion]
-
-            self.pkg_versions_scanned.emit(versions)
+        # families are emitted in batches, bounded by size and time, so the
+        # GUI won't be flooded by signals while still seeing progress.
+        scanned = iter_batches(grouped_families)
+        batch = []
+        since = time.monotonic()
+        for i, (_, versions) in enumerate(scanned):
+            if ct.isInterruptionRequested():  # could be long running proc
+                scanned.close()
+                break
+
+            batch.append(versions)
+            if len(batch) < self.PkgBatchSize and \
+                    time.monotonic() - since < self.PkgBatchInterval:
+                continue
+
+            self.pkg_versions_scanned.emit(batch)
             self.status_message.emit(
                 f"Finding versions for {_fm_count} families from {_path_count} "
                 f"locations {'.' * (int(i / 50) % 5)}", 5000
             )  # animated dots that also reflects the speed of the process.
+            batch = []
+            since = time.monotonic()
+
+        if batch:
+            self.pkg_versions_scanned.emit(batch)
 
         self.pkg_scan_ended.emit()
         log.info("All installed packages scanned.")
@@ -660,16 +751,33 @@ class Controller(QtCore.QObject):
         log.info("Start scanning saved suites...")
         self.storage_scan_started.emit()
 
-        for branch in self._sto.branches():
+        for batch in self._sto.scan_saved_suites(archived=archived):
             if ct.isInterruptionRequested():  # could be long running proc
                 break
-            self.storage_scanned.emit(
-                list(self._sto.iter_saved_suites(branch, archived=archived)),
-            )
+            self.storage_scanned.emit(batch)
 
         self.storage_scan_ended.emit()
         log.info("All saved suites scanned.")
 
+        if sweetconfig.storage_watch:
+            self._monitor.reset()
+            self.storage_watched.emit(self._monitor.watched_paths())
+
+    @_thread(name="watchSuite")
+    def watch_suite_storage(self, paths=None):
+        """Find what has changed in storage since last scan or watch
+
+        :param paths: Only rescan these storage roots or suite directories,
+            rescan whole storage if None.
+        :type paths: list[str] or None
+        :return: None
+        """
+        changes = self._monitor.poll(paths)
+        if changes:
+            log.debug(f"{len(changes)} saved suites changed in storage.")
+            self.storage_changed.emit(changes)
+        self.storage_watched.emit(self._monitor.watched_paths())
+
 
 class Thread(QtCore.QThread):
     
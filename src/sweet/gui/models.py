@@ -1,6 +1,7 @@
 
 import os
 import logging
+from array import array
 from datetime import datetime
 from itertools import zip_longest
 
@@ -580,8 +581,8 @@ class SuiteCtxToolTreeModel(ToolTreeModel):
         key = self.suite_key(saved_suite)
         self._suite_namespace = key
 
-        for ctx in saved_suite.iter_contexts():
-            icon = self._icon_ctx if ctx.context.usable else self._icon_ctx_f
+        for ctx in saved_suite.iter_saved_contexts():
+            icon = self._icon_ctx if ctx.usable else self._icon_ctx_f
             c = QtGui.QStandardItem(ctx.name)
             c.setIcon(icon)
             c.setData(ctx.name, self.ContextNameRole)
@@ -1017,9 +1018,78 @@ class ContextDataModel(BaseItemModel):
         return base_flags
 
 
-class InstalledPackagesModel(BaseItemModel, metaclass=QSingleton):
+class _FamilyRows(object):
+    """Columnar storage of one package family and its version rows
+
+    Version rows are kept in parallel lists (and a timestamp array), one
+    entry per qualified version, instead of a pair of items per row. Filter
+    keys are made once when rows are added, not on every filtering.
+
+    """
+    __slots__ = ("name", "families", "latest", "qualified", "versions",
+                 "timestamps", "packages", "filters", "rows")
+
+    def __init__(self, name, family):
+        self.name = name
+        self.families = [family]  # type: list[PkgFamily]
+        self.latest = -1
+        self.qualified = []  # type: list[str]
+        self.versions = []  # type: list[str]
+        self.timestamps = array("q")
+        self.packages = []  # type: list[list[PkgVersion]]
+        self.filters = []  # type: list[str]
+        self.rows = dict()  # type: dict[str, int]
+
+
+def _merge_versions(family, versions):
+    """Merge versions into family, returns those not yet have rows
+
+    :param _FamilyRows family: Family rows
+    :param versions: Versions of the family
+    :type versions: list[PkgVersion]
+    :return: New versions' packages, by qualified name in version order
+    :rtype: dict[str, list[PkgVersion]]
+    """
+    added = dict()  # type: dict[str, list[PkgVersion]]
+    for pkg in sorted(versions, key=lambda v: v.version):
+        qualified = pkg.qualified
+        if qualified in family.rows:
+            family.packages[family.rows[qualified]].append(pkg)
+        elif qualified in added:
+            added[qualified].append(pkg)
+        else:
+            added[qualified] = [pkg]
+    return added
+
+
+def _append_versions(family, added):
+    """Append version rows into family, and update its latest timestamp
+
+    :param _FamilyRows family: Family rows
+    :param added: New versions' packages, from `_merge_versions`
+    :type added: dict[str, list[PkgVersion]]
+    :return:
+    """
+    for qualified, packages in added.items():
+        pkg = packages[0]
+        family.rows[qualified] = len(family.qualified)
+        family.qualified.append(qualified)
+        family.versions.append(str(pkg.version))
+        family.timestamps.append(pkg.timestamp or -1)
+        family.packages.append(packages)
+        family.filters.append("%s,%s" % (qualified, ",".join(pkg.tools)))
+    if family.timestamps:
+        family.latest = max(family.latest, max(family.timestamps))
+
+
+class InstalledPackagesModel(QtCore.QAbstractItemModel, metaclass=QSingleton):
     """
     Note: This is a singleton.
+
+    Family rows are top-level rows, and version rows are their children.
+    Rows are served from `_FamilyRows` columnar storage, child indexes
+    carry their `_FamilyRows` as internal pointer.
+
     """
     family_updated = QtCore.Signal()
 
@@ -1034,93 +1104,196 @@ class InstalledPackagesModel(BaseItemModel, metaclass=QSingleton):
 
     def __init__(self, *args, **kwargs):
         super(InstalledPackagesModel, self).__init__(*args, **kwargs)
-        self._initials = dict()  # type: dict[str, QtGui.QStandardItem]
-        self._families = dict()  # type: dict[str, QtGui.QStandardItem]
+        self._initials = dict()  # type: dict[str, int]
+        self._families = []  # type: list[_FamilyRows]
+        self._rows = dict()  # type: dict[str, int]
+        self._pending = dict()  # type: dict[str, _FamilyRows]
 
     def reset(self):
+        self.beginResetModel()
         self._initials.clear()
         self._families.clear()
-        super(InstalledPackagesModel, self).reset()
+        self._rows.clear()
+        self._pending.clear()
+        self.endResetModel()
 
     def initials(self):
         return sorted(self._initials.keys())
 
-    def first_item_in_initial(self, letter):
-        return self._initials.get(letter)
+    def first_index_in_initial(self, letter):
+        """Returns index of the first family of given initial letter
 
-    def add_families(self, families):
+        :param str letter: Initial letter in upper case
+        :return: Family index, invalid if no family found
+        :rtype: QtCore.QModelIndex
         """
+        row = self._initials.get(letter)
+        if row is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(row, 0)
+
+    def add_families(self, families):
+        """Add families, which are held until their versions are added
+
+        Families are inserted into model along with their versions, see
+        `add_versions`, and `flush_families` for those have no version.
+
         :param families:
         :type families: list[PkgFamily]
         :return:
         """
-        _families = self._families
         for family in families:
             name = family.name
-            if name in _families:
-                name_item = _families[family.name]
-                name_item.data(self.PackageObjectRole).append(family)
-
+            if name in self._rows:
+                self._families[self._rows[name]].families.append(family)
+            elif name in self._pending:
+                self._pending[name].families.append(family)
             else:
-                name_item = QtGui.QStandardItem(name)
-                _families[name] = name_item
+                self._pending[name] = _FamilyRows(name, family)
 
-                name_item.setData([family], self.PackageObjectRole)
-                name_item.setData(name, self.CompletionRole)
+    def flush_families(self):
+        """Insert held families that have no version added, e.g. on scan end
 
-                date_item = QtGui.QStandardItem()  # for latest version
+        :return:
+        """
+        families = list(self._pending.values())
+        self._pending.clear()
+        self._insert_families(families)
 
-                self.appendRow([name_item, date_item])
+    def add_versions(self, batch):
+        """Add versions of a batch of families
 
-                initial = name[0].upper()
-                if initial not in self._initials:
-                    self._initials[initial] = name_item
+        Held families of the batch are filled with their versions first,
+        then inserted all at once, so views and proxies get one rows-inserted
+        signal per batch. Versions of an already inserted family (rare) are
+        inserted under it.
+
+        :param batch: Versions of each family
+        :type batch: list[list[PkgVersion]]
+        :return:
+        """
+        filled = []
+        for versions in batch:
+            by_name = dict()  # family names may differ in case only
+            for pkg in versions:
+                by_name.setdefault(pkg.name, []).append(pkg)
+
+            for name, versions_ in by_name.items():
+                family = self._pending.pop(name, None)
+                if family is not None:
+                    _append_versions(family,
+                                     _merge_versions(family, versions_))
+                    filled.append(family)
+                elif name in self._rows:
+                    self._add_family_versions(self._rows[name], versions_)
+
+        self._insert_families(filled)
+
+    def _insert_families(self, families):
+        """
+        :param families: Families to insert, with versions filled
+        :type families: list[_FamilyRows]
+        :return:
+        """
+        if not families:
+            return
+        first = len(self._families)
+        self.beginInsertRows(QtCore.QModelIndex(),
+                             first, first + len(families) - 1)
+        self._families.extend(families)
+        for row, family in enumerate(families, first):
+            self._rows[family.name] = row
+            # batches may come in out of order
+            initial = family.name[0].upper()
+            current = self._initials.get(initial)
+            if current is None or family.name.lower() \
+                    < self._families[current].name.lower():
+                self._initials[initial] = row
+        self.endInsertRows()
 
         self.family_updated.emit()
 
-    def add_versions(self, versions):
+    def _add_family_versions(self, row, versions):
         """
-
-        :param versions:
+        :param int row: Row of an inserted family
+        :param versions: Versions of the family
         :type versions: list[PkgVersion]
         :return:
         """
-        if not versions:
-            return
-        _sample = versions[0]
-        family = self._families.get(_sample.name)
-        if not family:
+        family = self._families[row]
+        added = _merge_versions(family, versions)
+        if not added:
             return
 
-        _versions = dict()  # type: dict[str, QtGui.QStandardItem]
-        _times = set()
-        for pkg in sorted(versions, key=lambda v: v.version):
-            qualified = pkg.qualified
+        latest = family.latest
+        first = len(family.qualified)
+        parent = self.createIndex(row, 0)
+        self.beginInsertRows(parent, first, first + len(added) - 1)
+        _append_versions(family, added)
+        self.endInsertRows()
 
-            if qualified in _versions:
-                name_item = _versions[qualified]
-                name_item.data(self.PackageObjectRole).append(pkg)
+        if family.latest != latest:
+            index = self.createIndex(row, 1)
+            self.dataChanged.emit(index, index, [QtCore.Qt.DisplayRole])
 
-            else:
-                keys = "%s,%s" % (qualified, ",".join(pkg.tools))
-                _times.add(pkg.timestamp or -1)
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        """
+        :param int row:
+        :param int column:
+        :param parent:
+        :type parent: QtCore.QModelIndex
+        :rtype: QtCore.QModelIndex
+        """
+        if column < 0 or column >= len(self.Headers) or row < 0:
+            return QtCore.QModelIndex()
 
-                name_item = QtGui.QStandardItem(qualified)
-                _versions[qualified] = name_item
+        if not parent.isValid():
+            if row < len(self._families):
+                return self.createIndex(row, column)
 
-                name_item.setData([pkg], self.PackageObjectRole)
-                name_item.setData(keys, self.FilterRole)
-                name_item.setData(str(pkg.version), self.CompletionRole)
+        elif parent.internalPointer() is None:  # a family
+            family = self._families[parent.row()]
+            if row < len(family.qualified):
+                return self.createIndex(row, column, family)
 
-                date_item = QtGui.QStandardItem()
-                date_item.setData(pkg.timestamp, QtCore.Qt.DisplayRole)
+        return QtCore.QModelIndex()
 
-                family.appendRow([name_item, date_item])
+    def parent(self, index=None):
+        """
+        :param index:
+        :type index: QtCore.QModelIndex
+        :rtype: QtCore.QModelIndex
+        """
+        if index is None:  # QObject.parent()
+            return super(InstalledPackagesModel, self).parent()
+
+        family = index.internalPointer() if index.isValid() else None
+        if family is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(self._rows[family.name], 0)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if not parent.isValid():
+            return len(self._families)
+        if parent.column() == 0 and parent.internalPointer() is None:
+            return len(self._families[parent.row()].qualified)
+        return 0
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(self.Headers)
 
-        latest = next(iter(sorted(_times, reverse=True)), -1)
-        if latest >= 0:
-            date_item = self.itemFromIndex(self.index(family.row(), 1))
-            date_item.setData(latest, QtCore.Qt.DisplayRole)
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole \
+                and orientation == QtCore.Qt.Horizontal \
+                and section < len(self.Headers):
+            return self.Headers[section]
+        return super(InstalledPackagesModel, self).headerData(
+            section, orientation, role)
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
 
     def data(self, index, role=QtCore.Qt.DisplayRole):
         """
@@ -1135,11 +1308,35 @@ class InstalledPackagesModel(BaseItemModel, metaclass=QSingleton):
         if not index.isValid():
             return
 
-        if role == self.PackageObjectRole:
-            item = self.itemFromIndex(self.index(index.row(), 0))
-            return item.data(self.PackageObjectRole)
+        row = index.row()
+        column = index.column()
+        family = index.internalPointer()
+
+        if family is None:  # a family row
+            family = self._families[row]
+            if role == self.PackageObjectRole:
+                return family.families
+            if role == QtCore.Qt.DisplayRole:
+                if column == 0:
+                    return family.name
+                return family.latest if family.latest >= 0 else None
+            if role == self.CompletionRole and column == 0:
+                return family.name
+            return
 
-        return super(InstalledPackagesModel, self).data(index, role)
+        if role == self.PackageObjectRole:
+            return family.packages[row]
+        if role == QtCore.Qt.DisplayRole:
+            if column == 0:
+                return family.qualified[row]
+            timestamp = family.timestamps[row]
+            return timestamp if timestamp >= 0 else None
+        if column != 0:
+            return
+        if role == self.FilterRole:
+            return family.filters[row]
+        if role == self.CompletionRole:
+            return family.versions[row]
 
 
 class InstalledPackagesProxyModel(QtCore.QSortFilterProxyModel):
@@ -1205,6 +1402,18 @@ class SuiteStorageModel(BaseItemModel):
         suite_item.setData(False, self.ViewedRole)
         self.ensure_branch_item(suite.branch).appendRow(suite_item)
 
+    def update_saved_suite(self, suite):
+        """Replace saved suite of an item, e.g. suite has been saved over
+
+        :param SavedSuite suite:
+        :return:
+        """
+        suite_item = self.find_suite(suite)
+        if suite_item is None:
+            return
+        suite_item.setData(suite, self.SavedSuiteRole)
+        suite_item.setData(False, self.ViewedRole)  # view again on select
+
     def remove_one_saved_suite(self, suite):
         suite_item = self.find_suite(suite)
         if suite_item is None:
@@ -2187,9 +2187,8 @@ class InstalledPackagesWidget(QtWidgets.QWidget):
     @QtCore.Slot(int)  # noqa
     def on_tab_clicked(self, index):
         group = self._tabs.tabText(index)
-        item = self._model.first_item_in_initial(group)
-        if item is not None:
-            index = item.index()
+        index = self._model.first_index_in_initial(group)
+        if index.isValid():
             index = self._proxy.mapFromSource(index)
             self._view.scroll_at_top(index)
 
@@ -2329,6 +2328,28 @@ class SuiteBranchWidget(QtWidgets.QWidget):
             self._view.selectionModel().clearCurrentIndex()
             self._model.remove_one_saved_suite(saved_suite)
 
+    @QtCore.Slot(list)  # noqa
+    def on_storage_changed(self, changes):
+        as_archived = self._archive.isChecked()
+        for change, saved_suite in changes:
+            listed = self._model.find_suite(saved_suite) is not None
+            shown = saved_suite.archived == as_archived
+
+            if change == core.StorageMonitor.Removed or not shown:
+                if listed:
+                    self._remove_suite(saved_suite)
+            elif change == core.StorageMonitor.Modified and listed:
+                self._model.update_saved_suite(saved_suite)
+            else:
+                self._model.add_one_saved_suite(saved_suite)
+
+    def _remove_suite(self, saved_suite):
+        current = self._view.currentIndex().data(self._model.SavedSuiteRole)
+        if current is not None and current.path == saved_suite.path:
+            self._view.clearSelection()
+            self._view.selectionModel().clearCurrentIndex()
+        self._model.remove_one_saved_suite(saved_suite)
+
     def model(self):
         return self._model
 
@@ -2598,22 +2619,29 @@ class SuiteContextsView(QtWidgets.QWidget):
         layout.addWidget(ctx_view)
 
         self._view = ctx_view
+        self._suite = None
         self._contexts = dict()
 
     def load(self, saved_suite: core.SavedSuite):
+        # note: contexts are loaded lazily, when being selected.
+        self._suite = saved_suite
         self._contexts.clear()
         self._view.reset()
 
-        for ctx in saved_suite.iter_contexts():
-            self._contexts[ctx.name] = ctx.context
+        for ctx in saved_suite.iter_saved_contexts():
+            self._contexts[ctx.name] = None
 
     def on_context_selected(self, ctx_name: str):
         if ctx_name not in self._contexts:
             log.critical(f"Context {ctx_name} not loaded.")
             self._view.reset()
-        else:
-            context = self._contexts[ctx_name]
-            self._view.load(context)
+            return
+
+        context = self._contexts[ctx_name]
+        if context is None:
+            context = self._suite.get_context(ctx_name)
+            self._contexts[ctx_name] = context
+        self._view.load(context)
 
 
 class RequestCompleter(QtWidgets.QCompleter):
@@ -0,0 +1,451 @@
+"""
+A local SQLite index of saved suites, for listing and searching suites
+without reading suite files
+
+Each suite's name, branch, description, flags, contexts, requests, resolved
+variants and tools are indexed. The index is updated on suite save and
+archive (if `suite_index` is enabled in sweet's rezconfig), and can be
+brought up to date with storage roots by `SuiteIndex.refresh`, which only
+re-reads suites that have changed since indexed.
+"""
+import os
+import json
+import sqlite3
+import logging
+from typing import List
+from dataclasses import dataclass
+from contextlib import closing
+
+from rez.config import config as rezconfig
+from rez.utils.formatting import PackageRequest
+from rez.vendor.version.version import Version
+
+from . import util
+
+log = logging.getLogger("sweet")
+
+
+__all__ = (
+    "SuiteIndex",
+    "IndexedSuite",
+    "PackageUser",
+)
+
+
+_Schema = """
+CREATE TABLE IF NOT EXISTS suites (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    branch TEXT NOT NULL,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    archived INTEGER NOT NULL,
+    live INTEGER NOT NULL,
+    frozen INTEGER NOT NULL,
+    stamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contexts (
+    suite_id INTEGER NOT NULL REFERENCES suites(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    requests TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS variants (
+    suite_id INTEGER NOT NULL REFERENCES suites(id) ON DELETE CASCADE,
+    context TEXT NOT NULL,
+    family TEXT NOT NULL,
+    version TEXT NOT NULL,
+    qualified_name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tools (
+    suite_id INTEGER NOT NULL REFERENCES suites(id) ON DELETE CASCADE,
+    context TEXT NOT NULL,
+    name TEXT NOT NULL,
+    alias TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contexts_suite ON contexts(suite_id);
+CREATE INDEX IF NOT EXISTS variants_suite ON variants(suite_id);
+CREATE INDEX IF NOT EXISTS variants_package ON variants(family, version);
+CREATE INDEX IF NOT EXISTS tools_suite ON tools(suite_id);
+CREATE INDEX IF NOT EXISTS tools_alias ON tools(alias);
+"""
+_SchemaVersion = 1
+
+
+@dataclass
+class IndexedSuite:
+    __slots__ = "name", "branch", "path", "archived", "description", \
+        "live", "frozen", "contexts"
+    name: str
+    branch: str
+    path: str
+    archived: bool
+    description: str
+    live: bool
+    frozen: bool
+    contexts: List[str]
+
+    def saved_suite(self):
+        """Get the saved suite of this entry
+
+        :return: A SavedSuite object, suite not yet loaded
+        :rtype: sweet.core.SavedSuite
+        """
+        from .core import SavedSuite
+        return SavedSuite(
+            name=self.name,
+            branch=self.branch,
+            path=self.path,
+            archived=self.archived,
+            suite=None,  # lazy load
+        )
+
+
+@dataclass
+class PackageUser:
+    __slots__ = "branch", "suite", "context", "variant", "path", "archived"
+    branch: str
+    suite: str
+    context: str
+    variant: str
+    path: str
+    archived: bool
+
+
+def _suite_stamp(path):
+    # Suite is saved into a new directory and renamed into place, so the
+    # directory's inode changes on every save. Its mtime changes on archive.
+    st = os.stat(path)
+    return "%d:%d" % (st.st_ino, st.st_mtime_ns)
+
+
+class SuiteIndex(object):
+    """SQLite index of saved suites in storage roots
+    """
+    FileName = "suites.db"
+
+    def __init__(self, filepath=None, roots=None):
+        """
+        :param filepath: Index database file path. Use `suites.db` under
+            `cache_root` in sweet's rezconfig if not given.
+        :param roots: Storage roots, branch name as key and path as value.
+            Use `suite_roots` in sweet's rezconfig if not given.
+        :type filepath: str or None
+        :type roots: dict or None
+        """
+        sweetconfig = rezconfig.plugins.command.sweet
+        if filepath is None:
+            filepath = os.path.join(sweetconfig.cache_root, self.FileName)
+        self._filepath = filepath
+        self._roots = roots or sweetconfig.suite_roots
+        self._ready = False
+
+    @property
+    def filepath(self):
+        return self._filepath
+
+    def _connect(self):
+        if not self._ready:
+            dir_path = os.path.dirname(self._filepath)
+            if dir_path and not os.path.isdir(dir_path):
+                os.makedirs(dir_path, exist_ok=True)
+
+        conn = sqlite3.connect(self._filepath, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+
+        if not self._ready:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != _SchemaVersion:
+                with conn:
+                    for table in ("tools", "variants", "contexts", "suites"):
+                        conn.execute("DROP TABLE IF EXISTS %s" % table)
+                    conn.executescript(_Schema)
+                    conn.execute("PRAGMA user_version = %d" % _SchemaVersion)
+            self._ready = True
+
+        return conn
+
+    def branch_of(self, path):
+        """Find which storage branch the suite path is in
+
+        :param str path: Suite directory path
+        :return: Branch name, or None if not in any storage root
+        :rtype: str or None
+        """
+        dir_path = util.normpath(os.path.dirname(path))
+        for branch, root in self._roots.items():
+            if util.normpath(root) == dir_path:
+                return branch
+        return None
+
+    def update(self, path, suite=None):
+        """Index one suite, or remove it from index if no longer exists
+
+        :param str path: Suite directory path
+        :param suite: The suite saved in `path`, load from `path` if not
+            given.
+        :type suite: sweet.core.SweetSuite or None
+        :return: True if suite is indexed
+        :rtype: bool
+        """
+        from .core import SweetSuite, Storage
+
+        name = os.path.basename(os.path.normpath(path))
+        path = util.normpath(path)
+        branch = self.branch_of(path)
+        if branch is None or not os.path.isfile(
+                os.path.join(path, "suite.yaml")):
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM suites WHERE path = ?", (path,))
+            return False
+
+        stamp = _suite_stamp(path)
+        archived = os.path.isfile(os.path.join(path, Storage.ArchivedFlag))
+        if suite is None:
+            suite = SweetSuite.load(path)
+
+        contexts, variants, tools = self._collect(suite)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM suites WHERE path = ?", (path,))
+            suite_id = conn.execute(
+                "INSERT INTO suites (path, branch, name, description,"
+                " archived, live, frozen, stamp)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, branch, name, suite.description,
+                 archived, suite.is_live(), suite.is_frozen(), stamp)
+            ).lastrowid
+            conn.executemany(
+                "INSERT INTO contexts VALUES (?, ?, ?, ?)",
+                [(suite_id,) + row for row in contexts]
+            )
+            conn.executemany(
+                "INSERT INTO variants VALUES (?, ?, ?, ?, ?)",
+                [(suite_id,) + row for row in variants]
+            )
+            conn.executemany(
+                "INSERT INTO tools VALUES (?, ?, ?, ?)",
+                [(suite_id,) + row for row in tools]
+            )
+        return True
+
+    @staticmethod
+    def _collect(suite):
+        contexts = []
+        variants = []
+        for name, data in suite.contexts.items():
+            context = suite.context(name)
+            requests = [str(r) for r in context.requested_packages()]
+            contexts.append((name, data["priority"], json.dumps(requests)))
+            for variant in context.resolved_packages or []:
+                variants.append((name, variant.name, str(variant.version),
+                                 variant.qualified_name))
+
+        tools = [
+            (t["context"], t["name"], t["alias"])
+            for t in suite._tool_manifest()["tools"]
+        ]
+        return contexts, variants, tools
+
+    def set_archived(self, path, archived):
+        """Update archive state of an indexed suite
+
+        :param str path: Suite directory path
+        :param bool archived: Archive state
+        :return: None
+        """
+        path = util.normpath(path)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE suites SET archived = ?, stamp = ? WHERE path = ?",
+                (archived, _suite_stamp(path), path)
+            )
+
+    def refresh(self, branch=None):
+        """Bring index up to date with suites in storage roots
+
+        Only suites that are new or changed since indexed will be read.
+
+        :param branch: Suite storage branch. Refresh all branches if not
+            given.
+        :type branch: str or None
+        :return: Number of suites (re)indexed
+        :rtype: int
+        """
+        with closing(self._connect()) as conn:
+            indexed = dict(conn.execute(
+                "SELECT path, stamp FROM suites"
+                + (" WHERE branch = ?" if branch else ""),
+                (branch,) if branch else ()
+            ).fetchall())
+
+        count = 0
+        scanned = set()
+        for b, root in self._roots.items():
+            if branch and b != branch:
+                continue
+            scanned.add(util.normpath(root))
+            if not os.path.isdir(root):
+                continue
+
+            with os.scandir(root) as it:
+                entries = [e for e in it if not e.name.startswith(".")]
+
+            for entry in entries:
+                path = util.normpath(entry.path)
+                if not os.path.isfile(os.path.join(path, "suite.yaml")):
+                    continue
+                stamp = indexed.pop(path, None)
+                try:
+                    if stamp == _suite_stamp(path):
+                        continue
+                    if self.update(entry.path):
+                        count += 1
+                except Exception as e:
+                    log.warning(f"Failed to index suite {path!r}: {str(e)}")
+
+        # suites removed from scanned roots, the index may also have suites
+        # from other roots, e.g. indexed with a different storage.
+        removed = [p for p in indexed if os.path.dirname(p) in scanned]
+        if removed:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany("DELETE FROM suites WHERE path = ?",
+                                 [(p,) for p in removed])
+        return count
+
+    def search(self, text=None, package=None, tool=None, branch=None,
+               archived=False):
+        """Search indexed suites
+
+        All given criteria must be met.
+
+        :param text: Text that suite name or description contains
+        :param package: Package family name that suite resolves
+        :param tool: Tool name (alias) that suite provides
+        :param branch: Suite storage branch. Search all branches if not
+            given.
+        :param archived: Search archived or not archived suites, or both
+            if None. Default False.
+        :type text: str or None
+        :type package: str or None
+        :type tool: str or None
+        :type branch: str or None
+        :type archived: bool or None
+        :return: Matched suites, ordered by branch and name
+        :rtype: list[IndexedSuite]
+        """
+        where = []
+        args = []
+        if text:
+            where.append("(s.name LIKE ? OR s.description LIKE ?)")
+            args += ["%" + text + "%"] * 2
+        if package:
+            where.append("s.id IN (SELECT suite_id FROM variants"
+                         " WHERE family = ?)")
+            args.append(package)
+        if tool:
+            where.append("s.id IN (SELECT suite_id FROM tools"
+                         " WHERE alias = ?)")
+            args.append(tool)
+        if branch:
+            where.append("s.branch = ?")
+            args.append(branch)
+        if archived is not None:
+            where.append("s.archived = ?")
+            args.append(bool(archived))
+
+        return self._select(where, args)
+
+    def find_users(self, request, branch=None, archived=None):
+        """Find suite contexts that resolve packages in the request
+
+        E.g. `foo` matches all versions of family 'foo', `foo-1.2` matches
+        version 1.2 and 1.2.*, and `foo==1.2` matches 1.2 only.
+
+        :param str request: Package request string
+        :param branch: Suite storage branch. Search all branches if not
+            given.
+        :param archived: Search archived or not archived suites, or both
+            if None. Default None.
+        :type branch: str or None
+        :type archived: bool or None
+        :return: Suite contexts and the variants they resolved, ordered by
+            branch, suite and context name
+        :rtype: list[PackageUser]
+        """
+        request = PackageRequest(request)
+        if request.conflict:
+            raise ValueError("Conflict request is not supported: %r"
+                             % str(request))
+
+        query = (
+            "SELECT s.branch, s.name, v.context, v.qualified_name, s.path,"
+            " s.archived, v.version"
+            " FROM variants v JOIN suites s ON v.suite_id = s.id"
+            " WHERE v.family = ?"
+        )
+        args = [request.name]
+        if branch:
+            query += " AND s.branch = ?"
+            args.append(branch)
+        if archived is not None:
+            query += " AND s.archived = ?"
+            args.append(bool(archived))
+        query += " ORDER BY s.branch, s.name, v.context"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, args).fetchall()
+
+        return [
+            PackageUser(
+                branch=branch,
+                suite=name,
+                context=context,
+                variant=variant,
+                path=path,
+                archived=bool(archived),
+            )
+            for branch, name, context, variant, path, archived, version
+            in rows if Version(version) in request.range
+        ]
+
+    def iter_suites(self, branch=None, archived=False):
+        """Iterate indexed suites
+
+        :param branch: Suite storage branch. Iter all branches if not given.
+        :param bool archived: Iter archived suite. Default False.
+        :type branch: str or None
+        :return: An IndexedSuite object iterator
+        :rtype: collections.Iterator[IndexedSuite]
+        """
+        return iter(self.search(branch=branch, archived=archived))
+
+    def _select(self, where, args):
+        query = (
+            "SELECT s.id, s.name, s.branch, s.path, s.archived,"
+            " s.description, s.live, s.frozen,"
+            " group_concat(c.name, char(0))"
+            " FROM suites s LEFT JOIN"
+            " (SELECT * FROM contexts ORDER BY priority DESC) c"
+            " ON c.suite_id = s.id"
+        )
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += " GROUP BY s.id ORDER BY s.branch, s.name"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, args).fetchall()
+
+        return [
+            IndexedSuite(
+                name=name,
+                branch=branch,
+                path=path,
+                archived=bool(archived),
+                description=description,
+                live=bool(live),
+                frozen=bool(frozen),
+                contexts=contexts.split("\0") if contexts else [],
+            )
+            for _, name, branch, path, archived, description, live, frozen,
+            contexts in rows
+        ]
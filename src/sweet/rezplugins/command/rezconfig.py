@@ -11,6 +11,29 @@ def suite_roots():
     ])
 
 
+def cache_root():
+    """Return the path for caching things that speed up suite tool launch
+    """
+    from sweet import util
+    return util.normpath("~/rez/sweet/.cache")
+
+
+def server_socket():
+    """Return the per-user socket path of resolve daemon
+
+    The socket is put in user's runtime directory ($XDG_RUNTIME_DIR) if set,
+    or a per-host file in a private directory under `cache_root`, which the
+    daemon creates with mode 0700.
+    """
+    import os
+    import socket
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "rez-sweet.sock")
+    return os.path.join(cache_root(), "server",
+                        "%s.sock" % socket.gethostname())
+
+
 def on_suite_saved_callback(suite, suite_dir):
     """A callback that runs after suite saved
 
@@ -39,6 +62,87 @@ sweet = {
     # callback
     "on_suite_saved_callback": on_suite_saved_callback,
 
+    # number of threads for writing contexts and tool wrappers on suite
+    # save, which helps on high latency filesystem. Write one by one if
+    # less than 2.
+    "save_workers": 8,
+
+    # number of processes for re-resolving contexts on suite load. Resolve
+    # one by one if less than 2.
+    "resolve_workers": 4,
+
+    # number of threads for reading package versions of different families
+    # while listing installed packages in GUI. Read one by one if less than 2.
+    "scan_workers": 8,
+
+    # if True, a compressed copy of each context (.rxz) will be saved next
+    # to suite's .rxt, which is smaller and faster to load. Sweet loads the
+    # compact one if it's up to date, rez and other tools still use .rxt.
+    "compact_context": False,
+
+    # if True, suite contexts will also be put into a content-addressed
+    # store in the storage root (`.contexts`), which suites reference. So
+    # identical contexts from different suites are loaded once. Suites still
+    # keep their own .rxt for rez. Stored contexts that a suite no longer
+    # references are pruned on save, `rez sweet prune` prunes whole store.
+    "context_store": False,
+
+    # if True, saved suites will be recorded into a local SQLite index
+    # (`suites.db` under `cache_root`) on save and archive, for listing and
+    # searching suites without reading suite files.
+    "suite_index": False,
+
+    # if True, GUI watches suite storage roots and suites for changes, and
+    # updates saved suite list incrementally, only rescanning directories
+    # that changed. Every suite directory is watched, which may exhaust the
+    # inotify watch limit on large storage. For filesystems that don't
+    # notify changes made from other hosts, set `storage_poll_interval` to
+    # rescan whole storage every that many seconds (disabled if 0, mind the
+    # load on network shares).
+    "storage_watch": False,
+    "storage_poll_interval": 0,
+
+    # directory for caching things that speed up suite tool launch
+    "cache_root": cache_root(),
+
+    # if True, GUI lists installed packages from an on-disk catalog in
+    # `cache_root`, and only re-reads package families that have their
+    # directory modified since last listed (filesystem repository only).
+    "package_catalog": False,
+
+    # if True, live suite tools will reuse previously resolved context from
+    # cache, as long as the package repositories remain unchanged.
+    "resolve_cache": False,
+
+    # if True, live suite tools will be launched from suite's saved .rxt
+    # context, and only re-resolve when packages have changed in context's
+    # package paths since it's saved. Note that config overrides like
+    # `packages_path` will not be applied in this mode.
+    "launch_from_rxt": False,
+
+    # if True, parsed overrides of `.rezconfig.py` files that found from
+    # current working directory and its parents on suite tool launch, will be
+    # cached by those files and their mtime, so they are not executed again.
+    "config_cache": False,
+
+    # if True, live suite tools will ask resolve daemon (`rez-sweet serve`)
+    # for context, and resolve in-process if the daemon is not running.
+    "use_server": False,
+
+    # socket path that resolve daemon listens on, its directory must be
+    # only accessible by current user.
+    "server_socket": server_socket(),
+
+    # seconds that live suite tools wait for resolve daemon to connect and
+    # respond, before resolving in-process instead. Wait forever if 0.
+    "server_timeout": 10,
+
+    # if not empty, live suite tools will append a timing record of each
+    # launch into this JSON-lines file, e.g. config discovery and resolve
+    # time. The file will be rotated when exceeding `telemetry_max_bytes`.
+    "telemetry_path": "",
+    "telemetry_max_bytes": 10 * 1024 * 1024,
+
     # wip:
     #   If not empty, internal package version will be omitted
     #   in package versions' auto completion list.
@@ -3,6 +3,7 @@ Rez suite composing GUI
 """
 import os
 import sys
+import time
 import types
 import argparse
 try:
@@ -39,6 +40,37 @@ def setup_parser(parser, completions=False):
                         help="Print out version of this plugin command.")
     parser.add_argument("--gui", action="store_true")
 
+    subparsers = parser.add_subparsers(dest="subcommand", metavar="COMMAND")
+    serve = subparsers.add_parser(
+        "serve", help="Run a daemon that resolves contexts for live suite "
+                      "tools.")
+    serve.add_argument("--socket", type=str, default=None,
+                       help="Socket path to listen on, default is the "
+                            "'server_socket' in sweet's rezconfig.")
+    repair = subparsers.add_parser(
+        "repair", help="Restore a suite that an interrupted save left "
+                       "renamed away, and remove its stale leftovers.")
+    repair.add_argument("path", type=str, help="Suite directory path.")
+    prune = subparsers.add_parser(
+        "prune", help="Remove contexts in context store that no saved suite "
+                      "references.")
+    prune.add_argument("--branch", type=str, default=None,
+                       help="Only prune the store of this suite storage "
+                            "branch.")
+    users = subparsers.add_parser(
+        "users", help="List saved suite contexts that resolve given "
+                      "package, e.g. 'foo-1.2'.")
+    users.add_argument("package", type=str,
+                       help="Package request, e.g. 'foo', 'foo-1.2' or "
+                            "'foo==1.2'.")
+    users.add_argument("--branch", type=str, default=None,
+                       help="Only search in this suite storage branch.")
+    users.add_argument("--archived", action="store_true",
+                       help="Include archived suites.")
+    users.add_argument("--no-refresh", action="store_true",
+                       help="Search suite index as is, without checking "
+                            "suites changed since last indexed.")
+
 
 def command(opts, parser=None, extra_arg_groups=None):
     import logging
@@ -58,6 +90,22 @@ def command(opts, parser=None, extra_arg_groups=None):
         from sweet.gui import app
         sys.exit(app.launch())
 
+    if opts.subcommand == "serve":
+        from sweet import server
+        sys.exit(server.serve(opts.socket))
+
+    if opts.subcommand == "repair":
+        sys.exit(cli.repair_suite(opts.path))
+
+    if opts.subcommand == "prune":
+        sys.exit(cli.prune_contexts(branch=opts.branch))
+
+    if opts.subcommand == "users":
+        sys.exit(cli.package_users(opts.package,
+                                   branch=opts.branch,
+                                   archived=None if opts.archived else False,
+                                   refresh=not opts.no_refresh))
+
     return cli.main()
 
 
@@ -67,7 +115,25 @@ class CommandSweet(Command):
         "default_root": str,
         "release_root": str,
         "on_suite_saved_callback": types.FunctionType,
+        "save_workers": int,
+        "resolve_workers": int,
+        "scan_workers": int,
+        "compact_context": bool,
+        "context_store": bool,
         "omit_internal_version": str,
+        "cache_root": str,
+        "suite_index": bool,
+        "storage_watch": bool,
+        "storage_poll_interval": int,
+        "resolve_cache": bool,
+        "package_catalog": bool,
+        "launch_from_rxt": bool,
+        "config_cache": bool,
+        "use_server": bool,
+        "server_socket": str,
+        "server_timeout": int,
+        "telemetry_path": str,
+        "telemetry_max_bytes": int,
     }
 
     @classmethod
@@ -98,20 +164,60 @@ def _FWD__invoke_suite_tool_alias_in_live(package_requests,
                                           prefix_char=None,
                                           _script=None,
                                           _cli_args=None):
+    start = time.perf_counter()
     # Load configs
     from rez.resolved_context import ResolvedContext
     from rez.config import _load_config_from_filepaths, config
     # todo: config override should be handled by the Application
     #   launcher, not sweet.
-    configs = find_configs(os.getcwd())
-    overrides, _ = _load_config_from_filepaths(configs)
+    config_start = time.perf_counter()
+    if config.plugins.command.sweet.config_cache:
+        from sweet.cache import ConfigCache
+        overrides, _ = ConfigCache().load(os.getcwd())
+    else:
+        configs = find_configs(os.getcwd())
+        overrides, _ = _load_config_from_filepaths(configs)
     for key, value in overrides.items():
         config.override(key, value)
 
-    # todo: instead of parsing requests, load the rxt and re-resolve
-    #   again.
     suite_path = os.path.dirname(os.path.dirname(_script))
-    context = ResolvedContext(package_requests)
+    sweetconfig = config.plugins.command.sweet
+    context = None
+    source = None
+
+    resolve_start = time.perf_counter()
+    if sweetconfig.launch_from_rxt:
+        context = _load_rxt_context(suite_path, context_name)
+        source = "rxt"
+
+    if context is None and sweetconfig.use_server:
+        from sweet.server import request_context
+        context = request_context(package_requests)
+        source = "server"
+
+    if context is None and sweetconfig.resolve_cache:
+        from sweet.cache import ResolveCache
+        context = ResolveCache().resolve(package_requests, overrides=overrides)
+        source = "cache"
+
+    if context is None:
+        context = ResolvedContext(package_requests)
+        source = "resolve"
+    resolve_end = time.perf_counter()
+
+    if sweetconfig.telemetry_path:
+        from sweet import telemetry
+        record = telemetry.launch_record(
+            suite_path, context_name, tool_name, source,
+            timings={
+                "config_time": resolve_start - config_start,
+                "resolve_time": resolve_end - resolve_start,
+                "overhead": time.perf_counter() - start,
+            },
+            context=context,
+        )
+        telemetry.write_record(sweetconfig.telemetry_path, record,
+                               max_bytes=sweetconfig.telemetry_max_bytes)
 
     from rez.wrapper import Wrapper
     w = Wrapper.__new__(Wrapper)
@@ -120,5 +226,122 @@ def _FWD__invoke_suite_tool_alias_in_live(package_requests,
     sys.exit(retcode)
 
 
+def _FWD__invoke_suite_tool_alias_frozen(context_name,
+                                         tool_name,
+                                         _script=None,
+                                         _cli_args=None):
+    # Apply baked environment and execute the tool directly, so no rez
+    # resolve nor context is involved.
+    import json
+    import shutil
+    import subprocess
+
+    suite_path = os.path.dirname(os.path.dirname(_script))
+    filepath = os.path.join(suite_path, "contexts",
+                            "%s.env.json" % context_name)
+    with open(filepath, "r") as f:
+        baked = json.load(f)
+
+    env = _apply_baked_environ(baked, os.environ)
+
+    executable = shutil.which(tool_name, path=env.get("PATH"))
+    if executable is None:
+        print("Tool %r not found in context %r." % (tool_name, context_name),
+              file=sys.stderr)
+        sys.exit(1)
+
+    args = [executable] + list(_cli_args or [])
+    if os.name == "nt":
+        sys.exit(subprocess.call(args, env=env))
+    os.execve(executable, args, env)
+
+
+def _apply_baked_environ(baked, environ):
+    """Apply baked context environment onto launching environment
+
+    Where baked value has the parent marker, e.g. in place of system paths
+    in `PATH`, it's replaced by launching environment's value, so the paths
+    of the host that launches the tool are used, not the host saved suite.
+
+    :param dict baked: Baked context data, from suite's `.env.json`
+    :param environ: Launching environment
+    :type environ: os._Environ or dict
+    :return: Tool environment
+    :rtype: dict
+    """
+    env = dict(environ)
+    marker = baked.get("parent_marker")
+    for key, value in baked["environ"].items():
+        if marker and marker in value:
+            parent = environ.get(key)
+            parts = [parent if part == marker else part
+                     for part in value.split(os.pathsep)]
+            value = os.pathsep.join(p for p in parts if p)
+            if not value:
+                env.pop(key, None)
+                continue
+        env[key] = value
+    return env
+
+
+def _saved_fingerprint(suite_path, context_name):
+    """Returns context's package repositories fingerprint recorded on save
+
+    It's read from the small JSON file next to the context, which has the
+    same fingerprint as in suite.yaml, so suite.yaml doesn't need to be
+    parsed on launch.
+
+    :param str suite_path: Suite directory path
+    :param str context_name: Context name
+    :return: Fingerprint recorded on suite save, or None if not recorded.
+    :rtype: str or None
+    """
+    import json
+    filepath = os.path.join(suite_path, "contexts",
+                            "%s.fingerprint.json" % context_name)
+    try:
+        with open(filepath, "r") as f:
+            return json.load(f)["fingerprint"]
+    except Exception:
+        return None
+
+
+def _load_rxt_context(suite_path, context_name):
+    """Load suite context from .rxt, re-resolve only if it's outdated
+
+    The context is up to date if the package repositories fingerprint that
+    recorded on save still matches. The .rxt is not rewritten
+    on save if only its volatile keys (e.g. `created`) changed, so its time
+    can't tell. The time is only used for suites saved without fingerprint.
+
+    :param str suite_path: Suite directory path
+    :param str context_name: Context name
+    :return: Resolved context, or None if the .rxt can not be loaded.
+    :rtype: rez.resolved_context.ResolvedContext or None
+    """
+    from rez.resolved_context import ResolvedContext
+    from sweet.cache import context_is_current, repository_fingerprint
+    from sweet import compact
+
+    filepath = os.path.join(suite_path, "contexts", "%s.rxt" % context_name)
+    try:
+        context = compact.load(ResolvedContext, filepath) \
+            or ResolvedContext.load(filepath)
+        saved_time = os.path.getmtime(filepath)
+    except Exception:
+        return None  # fallback to resolve from requests
+
+    fingerprint = _saved_fingerprint(suite_path, context_name)
+    if fingerprint is not None:
+        current = fingerprint == repository_fingerprint(context.package_paths)
+    else:
+        current = context_is_current(context, saved_time=saved_time)
+    if current:
+        return context
+
+    from sweet.core import re_resolve_rxt
+    return re_resolve_rxt(context)
+
+
 def register_plugin():
     return CommandSweet
@@ -0,0 +1,384 @@
+"""
+A resolve daemon that serves contexts to live suite tools
+
+Live suite tools (wrappers) ask the daemon for contexts over a Unix domain
+socket, so package repository caches and resolved contexts can be kept warm
+in one process instead of being rebuilt by every tool launch.
+
+Wrappers fall back to resolve in-process if the daemon is not running, not
+answering in time, or not owned by current user.
+"""
+import os
+import json
+import stat
+import struct
+import socket
+import logging
+import threading
+import socketserver
+from contextlib import contextmanager
+from collections import OrderedDict
+
+from rez.config import config as rezconfig
+from rez.package_filter import PackageFilterList
+from rez.package_order import PackageOrderList
+from rez.resolved_context import ResolvedContext
+from rez.utils.formatting import PackageRequest
+from rez.package_repository import package_repository_manager
+
+from .cache import _hexdigest, _repository_digest
+
+log = logging.getLogger("sweet")
+
+
+__all__ = (
+    "ResolveServer",
+    "request_context",
+    "serve",
+)
+
+
+def _socket_path(path=None):
+    return path or rezconfig.plugins.command.sweet.server_socket
+
+
+def _private_dir(dirpath, create=False):
+    """Ensure given directory is owned and only accessible by current user
+
+    :param str dirpath: Directory path
+    :param bool create: Create the directory with mode 0700 if not exists
+    :raises OSError: If the directory is not private
+    """
+    if create:
+        os.makedirs(dirpath, mode=0o700, exist_ok=True)
+    st = os.stat(dirpath)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise OSError(f"Socket directory {dirpath!r} is not private to "
+                      f"current user (requires mode 0700).")
+
+
+def _owned_socket(socket_path):
+    try:
+        st = os.stat(socket_path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def _peer_uid(sock):
+    # Uid of the process on the other end, or None if not supported
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    fmt = "3i"  # pid, uid, gid
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED,
+                            struct.calcsize(fmt))
+    return struct.unpack(fmt, creds)[1]
+
+
+def _current_settings():
+    # Settings that affect resolve, as in current config (which may have been
+    # overridden by `.rezconfig.py`). Daemon resolves with these instead of
+    # its own config.
+    return {
+        "packages_path": list(rezconfig.packages_path),
+        "package_filter": PackageFilterList.singleton.to_pod(),
+        "package_orderers": PackageOrderList.singleton.to_pod(),
+        "implicit_packages": list(rezconfig.implicit_packages),
+    }
+
+
+def _send(sock, data):
+    sock.sendall(json.dumps(data).encode("utf-8") + b"\n")
+
+
+def _recv(rfile):
+    line = rfile.readline()
+    if not line:
+        raise EOFError("Connection closed.")
+    return json.loads(line.decode("utf-8"))
+
+
+def request_context(package_requests, socket_path=None, timeout=None):
+    """Get a resolved context from the resolve daemon
+
+    :param package_requests: List of package request strings
+    :param socket_path: Daemon socket path. Use `server_socket` in sweet's
+        rezconfig if not given.
+    :param timeout: Seconds to wait for connecting and each response read
+        from the daemon, use `server_timeout` in sweet's rezconfig if not
+        given. Wait forever if it's 0.
+    :type package_requests: list[str]
+    :type socket_path: str or None
+    :type timeout: float or None
+    :return: A resolved context, or None if daemon is not available, not
+        answering in time, not owned by current user, or the resolve failed
+        in daemon.
+    :rtype: ResolvedContext or None
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+
+    socket_path = _socket_path(socket_path)
+    if not _owned_socket(socket_path):
+        if os.path.exists(socket_path):
+            log.warning(f"Ignored resolve daemon socket {socket_path!r}, "
+                        f"which is not owned by current user.")
+        return None
+
+    if timeout is None:
+        timeout = rezconfig.plugins.command.sweet.server_timeout
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout or None)
+            sock.connect(socket_path)
+            peer_uid = _peer_uid(sock)
+            if peer_uid is not None and peer_uid != os.getuid():
+                log.warning(f"Ignored resolve daemon on {socket_path!r}, "
+                            f"which is run by another user.")
+                return None
+            _send(sock, {
+                "requests": [str(r) for r in package_requests],
+                "settings": _current_settings(),
+            })
+            with sock.makefile("rb") as rfile:
+                response = _recv(rfile)
+    except (OSError, EOFError, ValueError) as e:
+        log.debug(f"Resolve daemon not available: {str(e)}")
+        return None
+
+    if "context" not in response:
+        log.debug(f"Resolve daemon failed: {response.get('error')}")
+        return None  # let caller resolve in-process for the real error
+
+    return ResolvedContext.from_dict(response["context"], socket_path)
+
+
+class _ReadWriteLock(object):
+    """A readers-writer lock that prefers writer
+
+    Once a writer is waiting, new readers wait until it's done, so a steady
+    flow of readers can not starve the writer.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writers = 0  # waiting or writing
+        self._writing = False
+
+    @contextmanager
+    def reading(self):
+        with self._cond:
+            while self._writers:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._cond:
+            self._writers += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._writers -= 1
+                self._cond.notify_all()
+
+
+class ResolveServer(socketserver.ThreadingMixIn,
+                    socketserver.UnixStreamServer):
+    """Resolve daemon that keeps resolved contexts warm in memory
+
+    Requests are served concurrently, each in its own thread. Resolve
+    settings from client are passed into each resolve instead of being
+    applied to the global rez config.
+
+    Cached contexts and rez repository caches are invalidated when the
+    repository fingerprint of their package paths changed. Fingerprints are
+    computed without holding any lock, and repository caches are only
+    cleared once no resolve is running. At most `MaxContexts` contexts are
+    kept, least recently used ones are dropped.
+
+    The socket is created in a directory that only current user could
+    access, and is only connectable by current user.
+
+    """
+    daemon_threads = True
+    MaxContexts = 256
+
+    def __init__(self, socket_path=None):
+        """
+        :param socket_path: Socket path to listen on. Use `server_socket` in
+            sweet's rezconfig if not given.
+        :type socket_path: str or None
+        """
+        socket_path = _socket_path(socket_path)
+        self._lock = threading.Lock()
+        self._repos = _ReadWriteLock()  # resolving / clearing repo caches
+        self._contexts = OrderedDict()  # key: (fingerprint, context)
+        self._digests = dict()  # package path: digest
+        _private_dir(os.path.dirname(socket_path), create=True)
+        self._remove_stale_socket(socket_path)
+        super(ResolveServer, self).__init__(socket_path, _ResolveHandler)
+
+    def server_bind(self):
+        # create socket file with mode 0600, so there's no window that other
+        # users could connect before it's chmod-ed.
+        umask = os.umask(0o177)
+        try:
+            super(ResolveServer, self).server_bind()
+        finally:
+            os.umask(umask)
+
+    @staticmethod
+    def _remove_stale_socket(socket_path):
+        if not os.path.lexists(socket_path):
+            return
+        if not _owned_socket(socket_path):
+            raise OSError(f"{socket_path!r} exists and is not a socket "
+                          f"owned by current user.")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            try:
+                sock.connect(socket_path)
+            except OSError:
+                os.remove(socket_path)  # left by a dead daemon
+            else:
+                raise OSError(f"Daemon already running on {socket_path!r}")
+
+    def server_close(self):
+        super(ResolveServer, self).server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+    def resolve(self, package_requests, settings):
+        """Resolve context in given settings, or get it from memory
+
+        :param package_requests: List of package request strings
+        :param dict settings: Resolve settings from client's config
+        :return: A resolved context
+        :rtype: sweet.core.RollingContext
+        """
+        key = _hexdigest({"requests": package_requests, "settings": settings})
+        fingerprint = self._refresh(settings["packages_path"])
+        with self._lock:
+            cached = self._contexts.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self._contexts.move_to_end(key)
+                return cached[1]
+
+        from .core import RollingContext
+        # Client's implicit packages are requested along with the others,
+        # and recorded back as implicit afterward. So no global config
+        # override is needed, which would leak into concurrent resolves.
+        implicits = settings["implicit_packages"]
+        with self._repos.reading():
+            context = RollingContext(
+                list(package_requests) + list(implicits),
+                package_paths=settings["packages_path"],
+                package_filter=PackageFilterList.from_pod(
+                    settings["package_filter"]),
+                package_orderers=PackageOrderList.from_pod(
+                    settings["package_orderers"]),
+                add_implicit_packages=False,
+            )
+        context._package_requests = \
+            context._package_requests[:len(package_requests)]
+        context.implicit_packages = [PackageRequest(r) for r in implicits]
+
+        if context.success:
+            with self._lock:
+                self._contexts[key] = (fingerprint, context)
+                self._contexts.move_to_end(key)
+                while len(self._contexts) > self.MaxContexts:
+                    self._contexts.popitem(last=False)
+        return context
+
+    def _refresh(self, package_paths):
+        """Clear repository caches of those changed, returns fingerprint
+
+        Digests are computed without lock. Only if any of them changed, the
+        repository caches are cleared after running resolves are done.
+        """
+        digests = [_repository_digest(path) for path in package_paths]
+        with self._lock:
+            changed = self._changed(package_paths, digests)
+
+        if changed:
+            with self._repos.writing():
+                # re-check, may have been done by another request
+                with self._lock:
+                    changed = self._changed(package_paths, digests)
+                    for path, digest in zip(package_paths, digests):
+                        self._digests[path] = digest
+                for path in changed:
+                    log.info(f"Packages changed in {path!r}, clearing caches.")
+                    repo = package_repository_manager.get_repository(path)
+                    repo.clear_caches()
+
+        return _hexdigest(digests)
+
+    def _changed(self, package_paths, digests):
+        """Returns paths that digest changed, records new paths' digest
+
+        Must be called with `_lock` held.
+        """
+        changed = []
+        for path, digest in zip(package_paths, digests):
+            previous = self._digests.setdefault(path, digest)
+            if previous != digest:
+                changed.append(path)
+        return changed
+
+
+class _ResolveHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            request = _recv(self.rfile)
+            context = self.server.resolve(request["requests"],
+                                          request["settings"])
+            if context.success:
+                response = {"context": context.to_dict()}
+            else:
+                response = {"error": context.failure_description}
+        except Exception as e:
+            log.error(f"Failed to serve resolve request: {str(e)}")
+            response = {"error": str(e)}
+
+        try:
+            _send(self.connection, response)
+        except OSError:
+            pass  # client has gone
+
+
+def serve(socket_path=None):
+    """Run resolve daemon until interrupted
+
+    :param socket_path: Socket path to listen on. Use `server_socket` in
+        sweet's rezconfig if not given.
+    :type socket_path: str or None
+    :return: Exit code
+    :rtype: int
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        log.error("Resolve daemon requires Unix domain socket support.")
+        return 1
+
+    with ResolveServer(socket_path) as server:
+        log.info(f"Resolve daemon listening on {server.server_address!r}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
@@ -0,0 +1,89 @@
+"""
+Suite tool launch telemetry
+"""
+import os
+import json
+import time
+import socket
+import getpass
+import logging
+
+log = logging.getLogger("sweet")
+
+# context sources that are solved for the launch
+_SolvedSources = ("resolve", "server")
+
+
+__all__ = (
+    "launch_record",
+    "write_record",
+)
+
+
+def launch_record(suite_path, context_name, tool_name, source, timings,
+                  context=None):
+    """Compose a timing record of one suite tool launch
+
+    Context's load and solve statistics are only recorded when `source` is
+    'resolve' or 'server', since contexts from other sources (e.g. '.rxt')
+    were not solved in this launch. They are null otherwise.
+
+    :param str suite_path: Suite directory path
+    :param str context_name: Context name
+    :param str tool_name: Tool name
+    :param str source: Where the context came from, e.g. 'resolve', 'rxt'
+    :param dict timings: Seconds spent in each launch stage
+    :param context: The context that tool is going to run in
+    :type context: rez.resolved_context.ResolvedContext or None
+    :return: Launch record
+    :rtype: dict
+    """
+    record = {
+        "time": time.time(),
+        "user": getpass.getuser(),
+        "host": socket.gethostname(),
+        "pid": os.getpid(),
+        "suite": suite_path,
+        "context": context_name,
+        "tool": tool_name,
+        "source": source,
+    }
+    record.update(timings)
+    if context is not None:
+        solved = source in _SolvedSources
+        record.update({
+            "load_time": context.load_time if solved else None,
+            "solve_time": context.solve_time if solved else None,
+            "num_loaded_packages":
+                context.num_loaded_packages if solved else None,
+        })
+    return record
+
+
+def write_record(filepath, record, max_bytes=0):
+    """Append one record into a JSON-lines file
+
+    The file will be rotated (renamed with '.1' suffix, replacing previous
+    one) before writing if its size exceeds `max_bytes`. Errors are logged
+    but never raised, so tool launch won't be affected.
+
+    :param str filepath: The JSON-lines file path
+    :param dict record: The record to write
+    :param int max_bytes: Rotate file when exceeded, never rotate if 0.
+    :return: None
+    """
+    try:
+        dir_path = os.path.dirname(filepath)
+        if dir_path and not os.path.isdir(dir_path):
+            os.makedirs(dir_path, exist_ok=True)
+
+        if max_bytes and os.path.isfile(filepath) \
+                and os.path.getsize(filepath) >= max_bytes:
+            os.replace(filepath, filepath + ".1")
+
+        line = json.dumps(record, sort_keys=True, default=str) + "\n"
+        with open(filepath, "a") as f:
+            f.write(line)
+
+    except Exception as e:
+        log.debug(f"Failed to write launch telemetry {filepath!r}: {str(e)}")
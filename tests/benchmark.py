@@ -0,0 +1,380 @@
+"""
+Suite tool launch latency benchmark
+
+Builds a synthetic suite over a generated package repository, then launches
+its tool wrappers with sweet's launch telemetry (`telemetry_path`) enabled,
+and breaks each launch down by its telemetry record into stages:
+
+    - interpreter: Python interpreter start (measured separately)
+    - rez_import: Importing rez modules that are imported before entering
+      the wrapper function (measured separately, see `RezModules`)
+    - startup: From process start until the wrapper function is entered and
+      its record is written, minus interpreter start, rez import and the
+      wrapper stages below. E.g. rez's forward command and plugin loading
+    - config: Loading `.rezconfig.py` overrides
+    - resolve: Getting the context, either resolved, loaded from cache or
+      `.rxt`, or served by daemon. See 'sources' for which one was used
+    - wrapper: The rest of the wrapper function overhead before the tool
+    - exec: Spawning the tool and the remaining process lifetime
+
+So the stages are timed in the real wrapper code path, with features like
+`resolve_cache` or `launch_from_rxt` enabled by `--enable`.
+
+Usage:
+    python -m tests.benchmark --repo filesystem --families 200 \\
+        --versions 10 --contexts 5 --enable resolve_cache --output launch.json
+
+The 'memory' repository only exists in-process, so the wrapper function is
+called in-process with the tool run skipped, and only config, resolve and
+wrapper stages are measured.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from rez import __version__ as rez_version
+from rez.config import config
+from sweet._version import __version__ as sweet_version
+from .util import MemPkgRepo
+
+
+def _tool_script():
+    if os.name == "nt":
+        return "@echo off\n"
+    return "#!/bin/sh\nexit 0\n"
+
+
+def _package_py(name, version, requires=None, tools=None):
+    lines = [
+        "name = %r" % name,
+        "version = %r" % version,
+        "requires = %r" % (requires or []),
+    ]
+    if tools:
+        lines += [
+            "tools = %r" % tools,
+            "",
+            "def commands():",
+            "    env.PATH.prepend('{root}/bin')",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def _synthetic_packages(families, versions, contexts, seed=0):
+    """Generate package definitions as (name, version, requires, tools)
+
+    Each context gets an 'app_<n>' package that provides tool 'tool_<n>' and
+    requires a few random 'lib_<n>' families.
+    """
+    rand = random.Random(seed)
+    packages = []
+    for i in range(families):
+        for v in range(versions):
+            packages.append(("lib_%d" % i, "1.%d" % v, [], []))
+    for c in range(contexts):
+        requires = ["lib_%d" % i
+                    for i in rand.sample(range(families), min(families, 5))]
+        packages.append(("app_%d" % c, "1.0", requires, ["tool_%d" % c]))
+    return packages
+
+
+def make_filesystem_repo(root, packages):
+    for name, version, requires, tools in packages:
+        pkg_dir = os.path.join(root, name, version)
+        os.makedirs(pkg_dir)
+        with open(os.path.join(pkg_dir, "package.py"), "w") as f:
+            f.write(_package_py(name, version, requires, tools))
+        if tools:
+            bin_dir = os.path.join(pkg_dir, "bin")
+            os.makedirs(bin_dir)
+            for tool in tools:
+                tool_path = os.path.join(bin_dir, tool)
+                with open(tool_path, "w") as f:
+                    f.write(_tool_script())
+                os.chmod(tool_path, 0o755)
+    return root
+
+
+def make_memory_repo(packages):
+    repo = MemPkgRepo("memory@sweet_benchmark")
+    repo.flush()
+    for name, version, requires, tools in packages:
+        repo.add(name, version=version, requires=requires, tools=tools)
+    return repo
+
+
+def make_suite(path, contexts, flavor="live"):
+    from sweet.core import SuiteOp
+
+    sop = SuiteOp()
+    sop._suite.set_live(flavor == "live")
+    sop._suite.set_frozen(flavor == "frozen")
+    for c in range(contexts):
+        name = "ctx_%d" % c
+        sop.add_context(name, sop.resolve_context(["app_%d" % c]))
+    sop._suite.save(path)
+    return path
+
+
+def _timeit(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _summary(samples):
+    if not samples:
+        return None
+    return {
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+
+# Modules that a live suite tool imports for rez's forward command, before
+# its wrapper function is entered.
+RezModules = (
+    "rez.cli._main",
+    "rez.cli.forward",
+)
+
+
+Features = (
+    "resolve_cache",
+    "config_cache",
+    "launch_from_rxt",
+    "use_server",
+)
+
+
+def _write_rezconfig(filepath, packages_path, sweet_settings):
+    with open(filepath, "w") as f:
+        f.write("packages_path = %r\n" % [packages_path])
+        f.write("plugins = %r\n" % {"command": {"sweet": sweet_settings}})
+    return filepath
+
+
+def _read_records(filepath, offset):
+    """Read telemetry records appended after given offset"""
+    if not os.path.isfile(filepath):
+        return [], offset
+    with open(filepath, "r") as f:
+        f.seek(offset)
+        lines = f.readlines()
+        offset = f.tell()
+    return [json.loads(line) for line in lines if line.strip()], offset
+
+
+def _launch_in_process(suite_path, context_name, tool_name, requests):
+    from unittest import mock
+    from sweet.rezplugins.command.sweet import \
+        _FWD__invoke_suite_tool_alias_in_live as invoke
+
+    script = os.path.join(suite_path, "bin", tool_name)
+    with mock.patch("rez.wrapper.Wrapper.run", return_value=0):
+        try:
+            invoke(requests, context_name, tool_name, _script=script)
+        except SystemExit:
+            pass
+
+
+def run(repo_type="filesystem",
+        families=50,
+        versions=5,
+        contexts=3,
+        flavor="live",
+        repeat=5,
+        seed=0,
+        enable=None):
+    """Run benchmark and returns results in dict
+
+    :param str repo_type: Package repository type, 'filesystem' or 'memory'
+    :param int families: Number of generated library families
+    :param int versions: Number of versions per library family
+    :param int contexts: Number of contexts (and tools) in suite
+    :param str flavor: Suite flavor, 'live', 'frozen' or 'non-live'
+    :param int repeat: Times to repeat each measurement
+    :param int seed: Random seed for generating package requirements
+    :param enable: Sweet launch features to enable, see `Features`
+    :type enable: list[str] or None
+    :return: Benchmark results
+    :rtype: dict
+    """
+    from unittest import mock
+
+    tempdir = tempfile.mkdtemp(prefix="sweet_benchmark_")
+    packages = _synthetic_packages(families, versions, contexts, seed=seed)
+    requests = [["app_%d" % c] for c in range(contexts)]
+    telemetry_path = os.path.join(tempdir, "launch.jsonl")
+    sweet_settings = {key: True for key in (enable or [])}
+    sweet_settings.update({
+        "telemetry_path": telemetry_path,
+        "cache_root": os.path.join(tempdir, "cache"),
+    })
+
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join(p for p in sys.path if p)
+    env["PATH"] = os.pathsep.join([os.path.dirname(sys.executable),
+                                   env.get("PATH", "")])
+    env.pop("REZ_QUIET", None)
+
+    stages = {k: [] for k in ("interpreter", "rez_import", "startup",
+                              "config", "resolve", "wrapper", "exec",
+                              "end_to_end")}
+    sources = dict()
+    try:
+        if repo_type == "filesystem":
+            repo_path = make_filesystem_repo(
+                os.path.join(tempdir, "packages"), packages)
+            rezconfig_file = _write_rezconfig(
+                os.path.join(tempdir, "rezconfig.py"), repo_path,
+                sweet_settings)
+            env["REZ_CONFIG_FILE"] = os.pathsep.join(
+                p for p in [env.get("REZ_CONFIG_FILE"), rezconfig_file] if p)
+        else:
+            repo_path = make_memory_repo(packages).path
+
+        config.override("packages_path", [repo_path])
+        suite_path = make_suite(os.path.join(tempdir, "suite"), contexts,
+                                flavor=flavor)
+
+        def _run(args):
+            subprocess.check_call(args, env=env, cwd=tempdir,
+                                  stdout=subprocess.DEVNULL)
+
+        offset = 0
+        if repo_type == "filesystem":
+            stages["interpreter"] = _timeit(
+                lambda: _run([sys.executable, "-c", "pass"]), repeat)
+            # timed in the child, so its exit is not counted in
+            import_rez = "import time; s = time.perf_counter(); " \
+                         "import %s; print(time.perf_counter() - s)" \
+                         % ", ".join(RezModules)
+            stages["rez_import"] = [
+                float(subprocess.check_output(
+                    [sys.executable, "-c", import_rez], env=env, cwd=tempdir,
+                    universal_newlines=True))
+                for _ in range(repeat)
+            ]
+            preload = statistics.median(stages["interpreter"]) \
+                + statistics.median(stages["rez_import"])
+
+            for c in range(contexts):
+                wrapper = os.path.join(suite_path, "bin", "tool_%d" % c)
+                for _ in range(repeat):
+                    launched = time.time()
+                    start = time.perf_counter()
+                    _run([wrapper])
+                    elapsed = time.perf_counter() - start
+                    stages["end_to_end"].append(elapsed)
+
+                    records, offset = _read_records(telemetry_path, offset)
+                    if not records:
+                        continue  # not a live suite, or telemetry failed
+                    record = records[-1]
+                    entered = record["time"] - launched
+                    stages["startup"].append(
+                        entered - record["overhead"] - preload)
+                    stages["exec"].append(elapsed - entered)
+                    _add_record(stages, sources, record)
+
+        else:
+            patcher = mock.patch.dict(config.plugins.command.sweet,
+                                      sweet_settings)
+            with patcher:
+                for c in range(contexts):
+                    for _ in range(repeat):
+                        _launch_in_process(suite_path, "ctx_%d" % c,
+                                           "tool_%d" % c, requests[c])
+                        records, offset = _read_records(telemetry_path,
+                                                        offset)
+                        for record in records:
+                            _add_record(stages, sources, record)
+    finally:
+        config.remove_override("packages_path")
+        shutil.rmtree(tempdir, ignore_errors=True)
+
+    results = {k: _summary(v) for k, v in stages.items()}
+    results["sources"] = sources
+
+    return {
+        "sweet_version": sweet_version,
+        "rez_version": rez_version,
+        "python": "%d.%d.%d" % sys.version_info[:3],
+        "platform": sys.platform,
+        "created": int(time.time()),
+        "params": {
+            "repo": repo_type,
+            "families": families,
+            "versions": versions,
+            "contexts": contexts,
+            "flavor": flavor,
+            "repeat": repeat,
+            "seed": seed,
+            "enable": sorted(enable or []),
+        },
+        "results": results,
+    }
+
+
+def _add_record(stages, sources, record):
+    config_time = record["config_time"]
+    resolve_time = record["resolve_time"]
+    stages["config"].append(config_time)
+    stages["resolve"].append(resolve_time)
+    stages["wrapper"].append(record["overhead"] - config_time - resolve_time)
+    sources[record["source"]] = sources.get(record["source"], 0) + 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser("sweet-benchmark")
+    parser.add_argument("--repo", choices=("filesystem", "memory"),
+                        default="filesystem")
+    parser.add_argument("--families", type=int, default=50)
+    parser.add_argument("--versions", type=int, default=5)
+    parser.add_argument("--contexts", type=int, default=3)
+    parser.add_argument("--flavor", choices=("live", "frozen", "non-live"),
+                        default="live")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--enable", action="append", choices=Features,
+                        default=[],
+                        help="Enable sweet launch feature, can be given "
+                             "multiple times.")
+    parser.add_argument("--output", type=str, default=None,
+                        help="JSON file to write results to, print to stdout "
+                             "if not given.")
+    opts = parser.parse_args(argv)
+
+    result = run(
+        repo_type=opts.repo,
+        families=opts.families,
+        versions=opts.versions,
+        contexts=opts.contexts,
+        flavor=opts.flavor,
+        repeat=opts.repeat,
+        seed=opts.seed,
+        enable=opts.enable,
+    )
+    content = json.dumps(result, indent=4, sort_keys=True)
+    if opts.output:
+        with open(opts.output, "w") as f:
+            f.write(content)
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Context file load benchmark
+
+Resolves a large synthetic context, saves it as `.rxt` and in compact
+format (`.rxz`), then compares their file sizes and load times.
+
+Usage:
+    python -m tests.benchmark_context --families 500 --versions 5 \\
+        --requires 300 --output context.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+from rez import __version__ as rez_version
+from rez.config import config
+from rez.resolved_context import ResolvedContext
+from sweet import compact
+from sweet._version import __version__ as sweet_version
+from .benchmark import make_filesystem_repo, _timeit, _summary
+
+
+def _synthetic_packages(families, versions, requires, seed=0):
+    """Generate package definitions as (name, version, requires, tools)
+
+    An 'app' package requires `requires` random 'lib_<n>' families, and each
+    library requires a few libraries that come after it.
+    """
+    rand = random.Random(seed)
+    packages = []
+    for i in range(families):
+        deps = ["lib_%d" % d for d in
+                rand.sample(range(i + 1, families), min(families - i - 1, 2))]
+        for v in range(versions):
+            packages.append(("lib_%d" % i, "1.%d" % v, deps, []))
+    app_requires = ["lib_%d" % i for i in
+                    rand.sample(range(families), min(families, requires))]
+    packages.append(("app", "1.0", app_requires, ["app"]))
+    return packages
+
+
+def run(families=500, versions=5, requires=300, repeat=10, seed=0):
+    """Run benchmark and returns results in dict
+
+    :param int families: Number of generated library families
+    :param int versions: Number of versions per library family
+    :param int requires: Number of libraries that 'app' requires
+    :param int repeat: Times to repeat each measurement
+    :param int seed: Random seed for generating package requirements
+    :return: Benchmark results
+    :rtype: dict
+    """
+    tempdir = tempfile.mkdtemp(prefix="sweet_benchmark_")
+    packages = _synthetic_packages(families, versions, requires, seed=seed)
+    try:
+        repo_path = make_filesystem_repo(
+            os.path.join(tempdir, "packages"), packages)
+        config.override("packages_path", [repo_path])
+
+        context = ResolvedContext(["app"])
+        if not context.success:
+            raise RuntimeError(context.failure_description)
+
+        rxt = os.path.join(tempdir, "app.rxt")
+        rxz = compact.compact_path(rxt)
+        context.save(rxt)
+        time.sleep(0.01)  # compact one must not be older than .rxt
+        with open(rxz, "wb") as f:
+            f.write(compact.dumps(context))
+
+        rxt_load = _timeit(lambda: ResolvedContext.load(rxt), repeat)
+        rxz_load = _timeit(lambda: compact.load(ResolvedContext, rxt), repeat)
+        sizes = {"rxt": os.path.getsize(rxt), "rxz": os.path.getsize(rxz)}
+        num_resolved = len(context.resolved_packages)
+
+    finally:
+        config.remove_override("packages_path")
+        shutil.rmtree(tempdir, ignore_errors=True)
+
+    rxt_load, rxz_load = _summary(rxt_load), _summary(rxz_load)
+    return {
+        "sweet_version": sweet_version,
+        "rez_version": rez_version,
+        "python": "%d.%d.%d" % sys.version_info[:3],
+        "platform": sys.platform,
+        "created": int(time.time()),
+        "params": {
+            "families": families,
+            "versions": versions,
+            "requires": requires,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": {
+            "resolved_packages": num_resolved,
+            "size": dict(sizes, ratio=sizes["rxz"] / sizes["rxt"]),
+            "load": {
+                "rxt": rxt_load,
+                "rxz": rxz_load,
+                "ratio": rxz_load["median"] / rxt_load["median"],
+            },
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser("sweet-benchmark-context")
+    parser.add_argument("--families", type=int, default=500)
+    parser.add_argument("--versions", type=int, default=5)
+    parser.add_argument("--requires", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=None,
+                        help="JSON file to write results to, print to stdout "
+                             "if not given.")
+    opts = parser.parse_args(argv)
+
+    result = run(
+        families=opts.families,
+        versions=opts.versions,
+        requires=opts.requires,
+        repeat=opts.repeat,
+        seed=opts.seed,
+    )
+    content = json.dumps(result, indent=4, sort_keys=True)
+    if opts.output:
+        with open(opts.output, "w") as f:
+            f.write(content)
+    else:
+        print(content)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+
+import os
+import time
+from unittest import mock
+from rez.config import _load_config_py
+from rez.resolved_context import ResolvedContext
+from sweet.cache import (
+    ResolveCache,
+    ConfigCache,
+    PackageCatalog,
+    repository_fingerprint,
+    context_is_current,
+)
+from sweet.core import InstalledPackages
+from .util import TestBase, MemPkgRepo
+
+
+class TestResolveCache(TestBase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestResolveCache, self).__init__(*args, **kwargs)
+        self.repo = MemPkgRepo("memory@any")
+
+    def setUp(self):
+        self.settings = {
+            "packages_path": [self.repo.path],
+        }
+        super(TestResolveCache, self).setUp()
+
+    def tearDown(self):
+        self.repo.flush()
+        super(TestResolveCache, self).tearDown()
+
+    def test_fingerprint_changed(self):
+        self.repo.add("foo", version=1)
+        fingerprint = repository_fingerprint([self.repo.path])
+        self.assertEqual(fingerprint, repository_fingerprint([self.repo.path]))
+
+        self.repo.add("foo", version=2)
+        self.assertNotEqual(
+            fingerprint, repository_fingerprint([self.repo.path])
+        )
+
+    def test_cache_hit(self):
+        self.repo.add("foo", version=1)
+        cache = ResolveCache(root=self.make_tempdir())
+
+        context = cache.resolve(["foo"])
+        key = cache.key(["foo"])
+        fingerprint = repository_fingerprint([self.repo.path])
+
+        cached = cache.get(key, fingerprint)
+        self.assertIsNotNone(cached)
+        self.assertEqual(
+            [v.qualified_name for v in context.resolved_packages],
+            [v.qualified_name for v in cached.resolved_packages],
+        )
+
+    def test_cache_key(self):
+        cache = ResolveCache(root=self.make_tempdir())
+        self.assertEqual(cache.key(["foo"]), cache.key(["foo"]))
+        self.assertNotEqual(cache.key(["foo"]), cache.key(["foo-1"]))
+        self.assertNotEqual(
+            cache.key(["foo"]),
+            cache.key(["foo"], overrides={"packages_path": ["/foo"]}),
+        )
+
+    def test_cache_invalidated(self):
+        self.repo.add("foo", version=1)
+        cache = ResolveCache(root=self.make_tempdir())
+
+        context = cache.resolve(["foo"])
+        self.assertEqual("1", str(context.resolved_packages[0].version))
+
+        self.repo.add("foo", version=2)
+        context = cache.resolve(["foo"])
+        self.assertEqual("2", str(context.resolved_packages[0].version))
+
+    def test_failed_resolve_not_cached(self):
+        self.repo.add("foo", version=1)
+        cache = ResolveCache(root=self.make_tempdir())
+        context = cache.resolve(["foo", "!foo"])
+        self.assertFalse(context.success)
+
+        key = cache.key(["foo", "!foo"])
+        fingerprint = repository_fingerprint([self.repo.path])
+        self.assertIsNone(cache.get(key, fingerprint))
+
+    def test_context_is_current(self):
+        self.repo.add("foo", version=1, timestamp=int(time.time()) - 10)
+        context = ResolvedContext(["foo"])
+        self.assertTrue(context_is_current(context))
+
+        self.repo.add("foo", version=2, timestamp=int(time.time()) + 10)
+        self.assertFalse(context_is_current(context))
+
+    def test_timestamped_context_is_current(self):
+        self.repo.add("foo", version=1, timestamp=int(time.time()) - 10)
+        context = ResolvedContext(["foo"], timestamp=int(time.time()))
+
+        self.repo.add("foo", version=2, timestamp=int(time.time()) + 10)
+        self.assertTrue(context_is_current(context))
+
+
+class TestConfigCache(TestBase):
+
+    def setUp(self):
+        super(TestConfigCache, self).setUp()
+        _load_config_py.cache_clear()  # config files are lru-cached in rez
+
+    def _make_cache(self, tempdir):
+        root = os.path.join(tempdir, "cache")
+        os.makedirs(root)  # so creating entries won't touch tempdir's mtime
+        return ConfigCache(root=root)
+
+    def _write_config(self, dir_path, content, mtime=None):
+        filepath = os.path.join(dir_path, ".rezconfig.py")
+        with open(filepath, "w") as f:
+            f.write(content)
+        if mtime is not None:
+            os.utime(filepath, (mtime, mtime))
+        return filepath
+
+    def test_config_cached(self):
+        tempdir = self.make_tempdir()
+        cache = self._make_cache(tempdir)
+        project = os.path.join(tempdir, "project")
+        shot = os.path.join(project, "shot")
+        os.makedirs(shot)
+        config_file = self._write_config(project, "quiet = True\n")
+
+        overrides, configs = cache.load(shot)
+        self.assertEqual({"quiet": True}, overrides)
+        self.assertIn(config_file, configs)
+
+        entry = cache._read(cache._filepath(cache._search(shot)))
+        self.assertEqual({"quiet": True}, entry["overrides"])
+
+        overrides, _ = cache.load(shot)
+        self.assertEqual({"quiet": True}, overrides)
+
+    def test_config_entry_shared(self):
+        tempdir = self.make_tempdir()
+        cache = self._make_cache(tempdir)
+        project = os.path.join(tempdir, "project")
+        shot = os.path.join(project, "shot")
+        os.makedirs(shot)
+        self._write_config(project, "quiet = True\n")
+
+        cache.load(project)
+        cache.load(shot)
+        os.utime(shot, (1, 1))  # unrelated change in searched directory
+        overrides, _ = cache.load(shot)
+        self.assertEqual({"quiet": True}, overrides)
+        self.assertEqual(1, len(os.listdir(cache.root)))
+
+    def test_config_entries_evicted(self):
+        tempdir = self.make_tempdir()
+        cache = self._make_cache(tempdir)
+        cache.MaxEntries = 2
+        for i in range(4):
+            project = os.path.join(tempdir, "project%d" % i)
+            os.makedirs(project)
+            self._write_config(project, "quiet = True\n", mtime=i + 1)
+            cache.load(project)
+        self.assertEqual(2, len(os.listdir(cache.root)))
+
+    def test_config_modified(self):
+        tempdir = self.make_tempdir()
+        cache = self._make_cache(tempdir)
+        project = os.path.join(tempdir, "project")
+        os.makedirs(project)
+        self._write_config(project, "quiet = True\n", mtime=1)
+
+        overrides, _ = cache.load(project)
+        self.assertEqual({"quiet": True}, overrides)
+
+        self._write_config(project, "quiet = False\n", mtime=2)
+        _load_config_py.cache_clear()
+        overrides, _ = cache.load(project)
+        self.assertEqual({"quiet": False}, overrides)
+
+    def test_config_added(self):
+        tempdir = self.make_tempdir()
+        cache = self._make_cache(tempdir)
+        project = os.path.join(tempdir, "project")
+        os.makedirs(project)
+
+        overrides, configs = cache.load(project)
+        self.assertNotIn(os.path.join(project, ".rezconfig.py"), configs)
+
+        config_file = self._write_config(project, "quiet = True\n")
+        overrides, configs = cache.load(project)
+        self.assertEqual({"quiet": True}, overrides)
+        self.assertIn(config_file, configs)
+
+    def test_function_not_cached(self):
+        tempdir = self.make_tempdir()
+        cache = self._make_cache(tempdir)
+        project = os.path.join(tempdir, "project")
+        os.makedirs(project)
+        self._write_config(project, "def callback():\n    pass\n")
+
+        overrides, _ = cache.load(project)
+        self.assertTrue(callable(overrides["callback"]))
+
+        self.assertEqual([], os.listdir(cache.root))
+
+        overrides, _ = cache.load(project)
+        self.assertTrue(callable(overrides["callback"]))
+
+
+class TestPackageCatalog(TestBase):
+
+    def _add_package(self, root, name, version, mtime=None):
+        pkg_dir = os.path.join(root, name, version)
+        os.makedirs(pkg_dir)
+        with open(os.path.join(pkg_dir, "package.py"), "w") as f:
+            f.write("name = %r\nversion = %r\n" % (name, version))
+        if mtime is not None:
+            os.utime(os.path.join(root, name), (mtime, mtime))
+
+    def _scan(self, packages, catalog):
+        # records are made from scanned packages, not fetched again
+        iter_versions = mock.patch.object(packages, "iter_versions",
+                                          wraps=packages.iter_versions)
+        fetch = mock.patch("sweet.core.get_package",
+                           side_effect=AssertionError("Fetched again"))
+        with iter_versions as iter_versions, fetch:
+            scanned = {
+                f.name: sorted(str(v.version) for v in versions)
+                for f, versions in packages.iter_catalog(catalog)
+            }
+        read = sorted(c.args[0] for c in iter_versions.call_args_list)
+        return scanned, read
+
+    def test_catalog(self):
+        tempdir = self.make_tempdir()
+        root = os.path.join(tempdir, "packages")
+        self._add_package(root, "foo", "1.0", mtime=1)
+        self._add_package(root, "bar", "1.0", mtime=1)
+        catalog = PackageCatalog(root=os.path.join(tempdir, "catalog"))
+        packages = InstalledPackages(packages_path=[root])
+
+        scanned, read = self._scan(packages, catalog)
+        self.assertEqual({"foo": ["1.0"], "bar": ["1.0"]}, scanned)
+        self.assertEqual(["bar", "foo"], read)
+
+        scanned, read = self._scan(packages, catalog)
+        self.assertEqual({"foo": ["1.0"], "bar": ["1.0"]}, scanned)
+        self.assertEqual([], read)
+
+        self._add_package(root, "foo", "2.0", mtime=2)
+        scanned, read = self._scan(packages, catalog)
+        self.assertEqual({"foo": ["1.0", "2.0"], "bar": ["1.0"]}, scanned)
+        self.assertEqual(["foo"], read)
@@ -0,0 +1,82 @@
+
+import os
+from unittest import mock
+from rez.resolved_context import ResolvedContext
+from sweet import compact
+from sweet.core import SuiteOp, Storage, RollingContext, sweetconfig
+from .util import TestBase, MemPkgRepo
+
+
+class TestCompact(TestBase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestCompact, self).__init__(*args, **kwargs)
+        self.repo = MemPkgRepo("memory@any")
+
+    def setUp(self):
+        self.settings = {
+            "packages_path": [self.repo.path],
+        }
+        super(TestCompact, self).setUp()
+
+    def tearDown(self):
+        self.repo.flush()
+        super(TestCompact, self).tearDown()
+
+    def test_roundtrip(self):
+        self.repo.add("foo", version=1, requires=["bar"])
+        self.repo.add("bar", version=1)
+        context = ResolvedContext(["foo"])
+
+        data = compact.dumps(context)
+        self.assertTrue(data.startswith(compact.Header))
+        self.assertEqual(context.to_dict(), compact.loads(data))
+
+    def test_load_compact_sibling(self):
+        self.repo.add("foo", version=1)
+        context = ResolvedContext(["foo"])
+        rxt = os.path.join(self.make_tempdir(), "foo.rxt")
+        context.save(rxt)
+        self.assertIsNone(compact.load(RollingContext, rxt))
+
+        with open(compact.compact_path(rxt), "wb") as f:
+            f.write(compact.dumps(context))
+        loaded = RollingContext.load(rxt)
+        self.assertEqual(rxt, loaded.load_path)
+        self.assertEqual("1", str(loaded.resolved_packages[0].version))
+
+        # compact one is outdated
+        os.utime(compact.compact_path(rxt), (1, 1))
+        self.assertIsNone(compact.load(RollingContext, rxt))
+
+    def test_load_compact_file(self):
+        self.repo.add("foo", version=1)
+        filepath = os.path.join(self.make_tempdir(), "foo.ctx")
+        with open(filepath, "wb") as f:
+            f.write(compact.dumps(ResolvedContext(["foo"])))
+
+        with RollingContext.patch_rolling_context():
+            loaded = RollingContext.load(filepath)
+        self.assertFalse(loaded.broken)
+        self.assertEqual("1", str(loaded.resolved_packages[0].version))
+
+    def test_suite_saved_compact(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        path = storage.suite_path("test", "my-foo")
+        with mock.patch.dict(sweetconfig, {"compact_context": True}):
+            sop.save(path)
+
+        rxt = sop._suite._context_path("FOO", path)
+        self.assertTrue(compact.is_compact(compact.compact_path(rxt)))
+
+        sop.load(path, re_resolve=False)
+        context = sop.get_context("FOO")
+        self.assertEqual("1", str(context.resolved_packages[0].version))
+
+        sop.save(path)  # compact context removed when not enabled
+        self.assertFalse(os.path.exists(compact.compact_path(rxt)))
@@ -1,7 +1,27 @@
 
 import os
+import sys
+import json
+import time
+import shutil
+import socket
+import subprocess
+from unittest import mock
 from rez.packages import Variant
-from sweet.core import SuiteOp, Storage, RollingContext, Constants
+from sweet.core import (
+    SuiteOp,
+    Storage,
+    StorageMonitor,
+    InstalledPackages,
+    PkgVersion,
+    RollingContext,
+    Constants,
+    ContextStore,
+    SweetSuite,
+    _SuiteDicts,
+    sweetconfig,
+)
+from sweet.cache import repository_newest
 from sweet.exceptions import SuiteOpError, ResolvedContextError
 from .util import TestBase, MemPkgRepo
 
@@ -30,6 +50,7 @@ class TestCore(TestBase):
             "contexts": {},
             "description": "",
             "live_resolve": True,
+            "frozen": False,
         }
         self.assertEqual(s_dict, expected)
 
@@ -268,3 +289,672 @@ class TestCore(TestBase):
 
         self.assertEqual("3", str(tool.variant.version))
         self.assertEqual(Constants.TOOL_VALID, tool.status)
+
+    def test_frozen_suite(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+
+        self.repo.add("foo", tools=["fruit"], commands="env.FOO = 'bar'")
+
+        sop = SuiteOp()
+        sop.set_frozen(True)
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+
+        path = storage.suite_path("test", "my-foo")
+        sop.save(path)
+
+        saved = next(storage.iter_saved_suites())
+        self.assertTrue(saved.is_frozen)
+
+        env_file = sop._suite._context_env_path("FOO", path)
+        with open(env_file, "r") as f:
+            baked = json.load(f)
+        self.assertEqual("bar", baked["environ"]["FOO"])
+        self.assertIn("FOO", baked["shell_code"])
+
+        # saving host's system paths are not baked, launching host's are
+        # put back in on launch
+        from sweet.rezplugins.command.sweet import _apply_baked_environ
+        marker = baked["parent_marker"]
+        self.assertEqual(marker,
+                         baked["environ"]["PATH"].split(os.pathsep)[-1])
+        env = _apply_baked_environ(baked, {"PATH": "/node/bin"})
+        self.assertEqual("/node/bin", env["PATH"].split(os.pathsep)[-1])
+        self.assertNotIn(marker, env["PATH"])
+        self.assertEqual("bar", env["FOO"])
+
+        with open(os.path.join(path, "bin", "fruit"), "r") as f:
+            self.assertIn("_FWD__invoke_suite_tool_alias_frozen", f.read())
+
+    def test_frozen_suite_tool_launch(self):
+        if os.name == "nt":
+            self.skipTest("POSIX only")
+
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+
+        tool_dir = os.path.join(tempdir, "tools")
+        os.makedirs(tool_dir)
+        tool_path = os.path.join(tool_dir, "fruit")
+        with open(tool_path, "w") as f:
+            f.write("#!/bin/sh\necho $FOO $1\n")
+        os.chmod(tool_path, 0o755)
+
+        commands = "env.FOO = 'bar'\nenv.PATH.prepend(%r)" % tool_dir
+        self.repo.add("foo", tools=["fruit"], commands=commands)
+
+        sop = SuiteOp()
+        sop.set_frozen(True)
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        path = storage.suite_path("test", "my-foo")
+        sop.save(path)
+
+        script = (
+            "from sweet.rezplugins.command.sweet import "
+            "_FWD__invoke_suite_tool_alias_frozen as fwd;"
+            "fwd('FOO', 'fruit', _script=%r, _cli_args=['baz'])"
+            % os.path.join(path, "bin", "fruit")
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.check_output([sys.executable, "-c", script],
+                                         env=env)
+        self.assertEqual("bar baz", output.decode().strip())
+
+    def test_save_incremental(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+
+        self.repo.add("foo", version=1, tools=["fruit"])
+        self.repo.add("bee", version=1, tools=["honey"])
+        self.repo.add("cat", version=1, tools=["meow"])
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        sop.add_context("BEE", sop.resolve_context(["bee"]))
+        sop.add_context("CAT", sop.resolve_context(["cat"]))
+        path = storage.suite_path("test", "my-suite")
+        sop.save(path)
+
+        def _file(*parts):
+            return os.path.join(path, *parts)
+
+        unchanged = [_file("contexts", "FOO.rxt"), _file("bin", "fruit")]
+        for filepath in unchanged + [_file("contexts", "BEE.rxt")]:
+            os.utime(filepath, (1, 1))
+
+        self.repo.add("bee", version=2, tools=["honey"])
+        sop.load(path)  # re-resolved
+        sop.drop_context("CAT")
+        sop.save(path)
+
+        for filepath in unchanged:
+            self.assertEqual(1, os.path.getmtime(filepath))
+        self.assertNotEqual(1, os.path.getmtime(_file("contexts", "BEE.rxt")))
+        self.assertFalse(os.path.exists(_file("contexts", "CAT.rxt")))
+        self.assertFalse(os.path.exists(_file("bin", "meow")))
+
+        sop.load(path)
+        ctx = sop.get_context("BEE")
+        self.assertEqual("2", str(ctx.resolved_packages[0].version))
+
+    def test_save_failed_suite_intact(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+
+        self.repo.add("foo", version=1, tools=["fruit"])
+        self.repo.add("bee", version=1, tools=["honey"])
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        path = storage.suite_path("test", "my-suite")
+        sop.save(path)
+        rxt = sop._suite._context_path("FOO", path)
+        with open(rxt, "r") as f:
+            saved_rxt = f.read()
+
+        self.repo.add("foo", version=2, tools=["fruit"])
+        sop.load(path)
+        sop.add_context("BEE", sop.resolve_context(["bee"]))
+        with mock.patch("sweet.core._update_forwarding_script",
+                        side_effect=OSError("Disk full")):
+            self.assertRaises(OSError, sop.save, path)
+
+        with open(rxt, "r") as f:
+            self.assertEqual(saved_rxt, f.read())
+        self.assertFalse(os.path.exists(os.path.join(path, "bin", "honey")))
+        self.assertEqual(["my-suite"], os.listdir(tempdir))
+
+        sop.save(path)
+        self.assertTrue(os.path.exists(os.path.join(path, "bin", "honey")))
+        self.assertEqual(["my-suite"], os.listdir(tempdir))
+
+    def test_save_progress(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+
+        sop = SuiteOp()
+        for i in range(5):
+            name = "foo%d" % i
+            self.repo.add(name, tools=["fruit%d" % i])
+            sop.add_context(name.upper(), sop.resolve_context([name]))
+
+        reported = []
+        path = storage.suite_path("test", "my-suite")
+        sop.save(path, progress=lambda done, total: reported.append(
+            (done, total)))
+
+        # 5 contexts and 5 tool wrappers
+        self.assertEqual([(i, 10) for i in range(1, 11)], reported)
+        self.assertEqual(5, len(os.listdir(os.path.join(path, "bin"))))
+
+    def test_context_store(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        paths = [storage.suite_path("test", "suite-a"),
+                 storage.suite_path("test", "suite-b")]
+        with mock.patch.dict(sweetconfig, {"context_store": True}):
+            for path in paths:
+                sop = SuiteOp()
+                sop.add_context("FOO", sop.resolve_context(["foo"]))
+                sop.save(path)
+
+        store = storage.context_store("test")
+        stored = [os.path.join(d, f) for d, _, files in os.walk(store.root)
+                  for f in files]
+        self.assertEqual(1, len(stored))
+
+        contexts = [
+            next(saved.iter_contexts()).context
+            for saved in storage.iter_saved_suites()
+        ]
+        self.assertEqual(2, len(contexts))
+        self.assertEqual(
+            sorted(paths), sorted(c.parent_suite_path for c in contexts)
+        )
+        # parsed once and shared
+        self.assertIs(contexts[0].resolved_packages,
+                      contexts[1].resolved_packages)
+        self.assertEqual(
+            os.path.join(paths[0], "contexts", "FOO.rxt"),
+            ContextStore.load(RollingContext, os.path.join(
+                paths[0], "contexts", "FOO.rxt")).load_path,
+        )
+
+    def test_context_store_pruned(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        self.repo.add("foo", version=1, tools=["fruit"])
+        store = storage.context_store("test")
+
+        def stored():
+            return sorted(os.path.join(d, f)
+                          for d, _, files in os.walk(store.root)
+                          for f in files)
+
+        paths = [storage.suite_path("test", "suite-a"),
+                 storage.suite_path("test", "suite-b")]
+        with mock.patch.dict(sweetconfig, {"context_store": True}), \
+                mock.patch.object(ContextStore, "PruneAge", -1):
+            for path in paths:
+                sop = SuiteOp()
+                sop.add_context("FOO", sop.resolve_context(["foo"]))
+                sop.save(path)
+            foo_1 = stored()
+            self.assertEqual(1, len(foo_1))
+
+            # still referenced by suite-b
+            self.repo.add("foo", version=2, tools=["fruit"])
+            sop.load(paths[0])
+            sop.save(paths[0])
+            self.assertEqual(2, len(stored()))
+
+            sop.load(paths[1])
+            sop.save(paths[1])
+            self.assertEqual(1, len(stored()))
+            self.assertNotEqual(foo_1, stored())
+
+            # no longer referenced once suite removed
+            shutil.rmtree(paths[0])
+            self.assertEqual(0, store.prune())
+            shutil.rmtree(paths[1])
+            self.assertEqual(1, store.prune())
+            self.assertEqual([], stored())
+
+    def test_context_store_recently_put_kept(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        path = storage.suite_path("test", "my-foo")
+        with mock.patch.dict(sweetconfig, {"context_store": True}):
+            sop = SuiteOp()
+            sop.add_context("FOO", sop.resolve_context(["foo"]))
+            sop.save(path)
+        shutil.rmtree(path)
+        self.assertEqual(0, storage.context_store("test").prune())
+
+    def test_re_resolve_in_process_pool(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+
+        sop = SuiteOp()
+        for name in ("foo", "bee", "cat"):
+            self.repo.add(name, version=1, tools=[name + "_tool"])
+            sop.add_context(name.upper(), sop.resolve_context([name]))
+        path = storage.suite_path("test", "my-suite")
+        sop.save(path)
+
+        for name in ("foo", "bee", "cat"):
+            self.repo.add(name, version=2, tools=[name + "_tool"])
+
+        sop.load(path, re_resolve=False)
+        resolved = dict()
+        # must be resolved in worker processes, not falling back to resolve
+        # in current process
+        with mock.patch("sweet.core.re_resolve_rxt",
+                        side_effect=AssertionError("Resolved in-process")):
+            sop._suite.re_resolve_rxt_contexts(
+                workers=2,
+                callback=lambda n, c: resolved.update({n: c}),
+            )
+        self.assertEqual({"FOO", "BEE", "CAT"}, set(resolved))
+        for name, context in resolved.items():
+            self.assertIsInstance(context, RollingContext)
+            self.assertIs(context, sop._suite.context(name))
+            self.assertEqual("2", str(context.resolved_packages[0].version))
+
+    def test_re_resolve_pool_config_overrides(self):
+        from rez.config import config
+        from sweet.core import _resolve_settings, _apply_resolve_settings
+
+        config.override("warn_untimestamped", True)
+        settings = _resolve_settings([self.repo.path])
+        self.assertTrue(settings["overrides"]["warn_untimestamped"])
+
+        config.remove_override("warn_untimestamped")
+        _apply_resolve_settings(settings)  # as in worker process
+        self.assertTrue(config.warn_untimestamped)
+
+    def test_re_resolve_serial_for_unpicklable_override(self):
+        from rez.config import config
+
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+
+        sop = SuiteOp()
+        for name in ("foo", "bee"):
+            self.repo.add(name, version=1, tools=[name + "_tool"])
+            sop.add_context(name.upper(), sop.resolve_context([name]))
+        path = storage.suite_path("test", "my-suite")
+        sop.save(path)
+
+        for name in ("foo", "bee"):
+            self.repo.add(name, version=2, tools=[name + "_tool"])
+
+        sop.load(path, re_resolve=False)
+        config.override("package_preprocess_function", lambda *_: None)
+        with mock.patch("sweet.core.ProcessPoolExecutor",
+                        side_effect=AssertionError("Pooled")):
+            sop._suite.re_resolve_rxt_contexts(workers=2)
+        for name in ("FOO", "BEE"):
+            context = sop._suite.context(name)
+            self.assertEqual("2", str(context.resolved_packages[0].version))
+
+    def test_tool_manifest(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        self.repo.add("foo", version=1, tools=["fruit", "apple"])
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        sop.update_context("FOO", tool_name="apple", set_hidden=True)
+        path = storage.suite_path("test", "my-foo")
+        sop.save(path)
+
+        saved = next(storage.iter_saved_suites())
+        with mock.patch.object(RollingContext, "load") as load:
+            tools = list(saved.iter_saved_tools())
+            contexts = list(saved.iter_saved_contexts())
+            load.assert_not_called()
+
+        self.assertEqual(["fruit"], [t.alias for t in tools])
+        self.assertEqual("foo-1[]", tools[0].variant.qualified_name)
+        self.assertEqual("any", tools[0].location)
+        self.assertEqual(["FOO"], [c.name for c in contexts])
+        self.assertTrue(contexts[0].usable)
+
+        context = saved.get_context("FOO")
+        self.assertEqual("1", str(context.resolved_packages[0].version))
+
+        # outdated manifest is ignored
+        os.utime(os.path.join(path, "tools.json"), (1, 1))
+        self.assertIsNone(saved.read_manifest())
+        self.assertEqual(["fruit"],
+                         [t.alias for t in saved.iter_saved_tools()])
+
+    def test_skip_re_resolve_if_current(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        path = storage.suite_path("test", "my-foo")
+        sop.save(path)
+
+        saved = sop.get_context("FOO")
+        with mock.patch("sweet.core.re_resolve_rxt") as re_resolve, \
+                mock.patch("sweet.core.repository_newest",
+                           wraps=repository_newest) as newest:
+            sop.load(path)
+            re_resolve.assert_not_called()
+            # marked as re-resolved, like others
+            context = sop.get_context("FOO")
+            self.assertIsNone(context.load_path)
+            self.assertEqual(saved.created, context.created)
+
+            # repositories are scanned once for contexts with same paths
+            sop.add_context("BAR", sop.resolve_context(["foo"]))
+            sop.save(path)
+            newest.assert_called_once()
+
+        self.repo.add("foo", version=2, tools=["fruit"])
+        sop.load(path)
+        context = sop.get_context("FOO")
+        self.assertIsNone(context.load_path)
+        self.assertEqual("2", str(context.resolved_packages[0].version))
+
+    def test_launch_from_kept_rxt(self):
+        from rez.resolved_context import ResolvedContext
+        from sweet.cache import context_is_current
+        from sweet.rezplugins.command.sweet import _load_rxt_context
+
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        now = int(time.time())
+        self.repo.add("foo", version=1, tools=["fruit"], timestamp=now - 200)
+
+        sop = SuiteOp()
+        with mock.patch("time.time", return_value=now - 100):
+            sop.add_context("FOO", sop.resolve_context(["foo"]))
+        path = storage.suite_path("test", "my-foo")
+        sop.save(path)
+
+        # an unrelated family released, context re-resolves the same, and
+        # .rxt is kept on save since only its volatile keys changed
+        self.repo.add("bar", version=1, timestamp=now - 50)
+        sop.load(path)
+        self.assertIsNone(sop.get_context("FOO").load_path)
+        sop.save(path)
+
+        rxt = os.path.join(path, "contexts", "FOO.rxt")
+        saved = ResolvedContext.load(rxt)
+        self.assertFalse(context_is_current(
+            saved, saved_time=os.path.getmtime(rxt)))
+
+        # suite.yaml is not parsed on launch
+        with mock.patch("sweet.core.re_resolve_rxt") as re_resolve, \
+                mock.patch("rez.vendor.yaml.load", side_effect=AssertionError):
+            context = _load_rxt_context(path, "FOO")
+            re_resolve.assert_not_called()
+        self.assertEqual("1", str(context.resolved_packages[0].version))
+
+        self.repo.add("foo", version=2, tools=["fruit"], timestamp=now - 10)
+        with mock.patch("sweet.core.re_resolve_rxt") as re_resolve:
+            _load_rxt_context(path, "FOO")
+            re_resolve.assert_called_once()
+
+    def test_recover_interrupted_save(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        path = storage.suite_path("test", "my-foo")
+        sop.save(path)
+
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        proc.wait()
+        dead = "%s-%d" % (socket.gethostname(), proc.pid)
+
+        # interrupted in between renaming previous suite away and renaming
+        # the new one into place
+        backup = os.path.join(tempdir, ".my-foo.replaced-%s" % dead)
+        staging = os.path.join(tempdir, ".my-foo.saving-%s" % dead)
+        os.rename(path, backup)
+        os.makedirs(staging)
+
+        # listing suites never touches leftovers
+        self.assertEqual([], list(storage.iter_saved_suites()))
+        self.assertEqual(2, len(os.listdir(tempdir)))
+
+        self.assertTrue(SweetSuite.recover(path))
+        self.assertTrue(os.path.isfile(os.path.join(path, "suite.yaml")))
+        self.assertEqual(["my-foo"], os.listdir(tempdir))
+
+        # interrupted before the previous one is removed
+        os.makedirs(backup)
+        with mock.patch("sweet.core._exchange_dirs", return_value=False):
+            sop.load(path)
+            sop.save(path)
+        self.assertEqual(["my-foo"], os.listdir(tempdir))
+        self.assertEqual(["my-foo"],
+                         [s.name for s in storage.iter_saved_suites()])
+
+    def test_recover_other_host_save(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        path = storage.suite_path("test", "my-foo")
+        sop.save(path)
+
+        # another host is saving, with a pid that is not running here
+        backup = os.path.join(tempdir, ".my-foo.replaced-other-host-1")
+        os.rename(path, backup)
+        self.assertFalse(SweetSuite.recover(path))
+        self.assertTrue(os.path.isdir(backup))
+
+        # that save must have been interrupted long ago
+        old = time.time() - 2 * 24 * 60 * 60
+        os.utime(backup, (old, old))
+        self.assertTrue(SweetSuite.recover(path))
+        self.assertEqual(["my-foo"], os.listdir(tempdir))
+
+    def test_suite_dict_cached(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        sop.set_description("first")
+        path = storage.suite_path("test", "my-foo")
+        sop.save(path)
+
+        filepath = os.path.join(path, "suite.yaml")
+        suite = SweetSuite.load(path)
+        self.assertIn(filepath, _SuiteDicts)
+        self.assertEqual("first", suite.description)
+
+        suite.context("FOO")  # loaded context must not leak into cache
+        cached = _SuiteDicts[filepath][1]
+        self.assertNotIn("context", cached["contexts"]["FOO"])
+
+        sop.load(path)
+        sop.set_description("second")
+        sop.save(path)
+        self.assertEqual("second", SweetSuite.load(path).description)
+
+    def test_suite_dict_safe_loaded(self):
+        from rez.vendor import yaml
+        from sweet import core
+
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        sop.update_context("FOO", tool_name="fruit", new_alias="apple")
+        sop.set_description("safe")
+        path = storage.suite_path("test", "my-foo")
+        sop.save(path)
+
+        # use pure python safe loader if PyYAML isn't built with libyaml
+        filepath = os.path.join(path, "suite.yaml")
+        loader = core._CSafeLoader or yaml.SafeLoader
+        error = core._CYAMLError if core._CSafeLoader else yaml.YAMLError
+        _SuiteDicts.clear()
+        with mock.patch.object(core, "_CSafeLoader", loader), \
+                mock.patch.object(core, "_CYAMLError", error), \
+                mock.patch.object(core.yaml, "load",
+                                  side_effect=AssertionError("Not safe")):
+            safe_loaded = core._load_suite_dict(filepath)
+
+        with open(filepath, "r") as f:
+            full_loaded = yaml.load(f, Loader=yaml.FullLoader)  # noqa
+        self.assertEqual(full_loaded, safe_loaded)
+
+    def test_storage_monitor(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        monitor = StorageMonitor(storage)
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        def changes():
+            return sorted((c, s.name, s.archived) for c, s in monitor.poll())
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        sop.save(storage.suite_path("test", "suite-a"))
+        monitor.reset()
+        self.assertEqual([], monitor.poll())
+        self.assertIn(tempdir, monitor.watched_paths())
+
+        path = storage.suite_path("test", "suite-b")
+        sop.save(path)
+        self.assertEqual([("added", "suite-b", False)], changes())
+
+        sop.load(path)
+        sop.set_description("saved over")
+        sop.save(path)
+        self.assertEqual([("modified", "suite-b", False)], changes())
+
+        storage.set_archived(path, archive=True)
+        self.assertEqual([("archived", "suite-b", True)], changes())
+
+        shutil.rmtree(storage.suite_path("test", "suite-a"))
+        self.assertEqual([("removed", "suite-a", False)], changes())
+
+    def test_storage_monitor_paths(self):
+        tempdir = self.make_tempdir()
+        storage = Storage(roots={"test": tempdir})
+        monitor = StorageMonitor(storage)
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        sop = SuiteOp()
+        sop.add_context("FOO", sop.resolve_context(["foo"]))
+        path_a = storage.suite_path("test", "suite-a")
+        sop.save(path_a)
+        monitor.reset()
+
+        def changes(paths):
+            # only given paths are rescanned, never the whole storage
+            with mock.patch("sweet.core._iter_suite_entries",
+                            side_effect=AssertionError("Full rescan")):
+                return sorted((c, s.name, s.archived)
+                              for c, s in monitor.poll(paths))
+
+        path_b = storage.suite_path("test", "suite-b")
+        sop.save(path_b)
+        self.assertEqual([], changes([path_a]))
+        self.assertEqual([("added", "suite-b", False)], changes([tempdir]))
+
+        storage.set_archived(path_b, archive=True)
+        self.assertEqual([], changes([tempdir]))  # same suite directory
+        self.assertEqual([("archived", "suite-b", True)], changes([path_b]))
+
+        shutil.rmtree(path_a)
+        self.assertEqual([("removed", "suite-a", False)], changes([tempdir]))
+        self.assertEqual([], monitor.poll())
+
+    def test_scan_saved_suites(self):
+        tempdir = self.make_tempdir()
+        roots = {"a": os.path.join(tempdir, "a"),
+                 "b": os.path.join(tempdir, "b")}
+        storage = Storage(roots=roots)
+        self.repo.add("foo", version=1, tools=["fruit"])
+
+        for branch, names in (("a", ["s1", "s2", "s3"]), ("b", ["s4"])):
+            for name in names:
+                sop = SuiteOp()
+                sop.add_context("FOO", sop.resolve_context(["foo"]))
+                sop.save(storage.suite_path(branch, name))
+        storage.set_archived(storage.suite_path("a", "s3"), archive=True)
+        os.makedirs(os.path.join(roots["a"], "not-a-suite"))
+
+        batches = list(storage.scan_saved_suites(batch_size=1))
+        self.assertEqual([1, 1, 1], [len(b) for b in batches])
+        self.assertEqual(
+            [("a", "s1"), ("a", "s2"), ("b", "s4")],
+            sorted((s.branch, s.name) for b in batches for s in b)
+        )
+        self.assertEqual(
+            [("a", "s3")],
+            [(s.branch, s.name) for b in storage.scan_saved_suites(
+                archived=True) for s in b]
+        )
+        self.assertEqual(
+            sorted(s.name for s in storage.iter_saved_suites()),
+            ["s1", "s2", "s4"]
+        )
+
+    def test_iter_versions_concurrently(self):
+        for name in ("foo", "bar", "baz"):
+            self.repo.add(name, version=1)
+            self.repo.add(name, version=2)
+        packages = InstalledPackages(packages_path=[self.repo.path])
+        families = sorted(packages.iter_families(), key=lambda f: f.name)
+        batches = [[f] for f in families] + [families[:2]]
+
+        for workers in (1, 4):
+            scanned = {
+                i: sorted(v.qualified for v in versions)
+                for i, versions in packages.iter_versions_concurrently(
+                    batches, workers=workers)
+            }
+            self.assertEqual({
+                0: ["bar-1", "bar-2"],
+                1: ["baz-1", "baz-2"],
+                2: ["foo-1", "foo-2"],
+                3: ["bar-1", "bar-2", "baz-1", "baz-2"],
+            }, scanned)
+
+    def test_pkg_version_lazy_fields(self):
+        self.repo.add("foo", version=1, requires=["bar-1"], tools=["fruit"],
+                      variants=[["baz"]])
+        packages = InstalledPackages(packages_path=[self.repo.path])
+        pkg = next(packages.iter_versions("foo"))
+
+        # package is not kept, but re-fetched on first access
+        from rez.packages import Package
+        self.assertFalse(any(isinstance(getattr(pkg, k), Package)
+                             for k in PkgVersion.__slots__))
+        self.repo._repo.clear_caches()
+
+        self.assertIsNone(pkg._requires)
+        self.assertEqual(["fruit"], pkg._tools)  # for filtering, not lazy
+        self.assertEqual(["bar-1"], pkg.requires)
+        self.assertEqual([["baz"]], pkg.variants)
+        self.assertEqual(["fruit"], pkg.tools)
+        self.assertIs(pkg.requires, pkg.requires)  # kept
+
+        pkg = next(packages.iter_versions("foo", lazy=False))
+        self.assertEqual(["bar-1"], pkg._requires)
+        self.assertEqual([["baz"]], pkg._variants)
@@ -0,0 +1,105 @@
+
+import os
+import shutil
+from unittest import mock
+from sweet.core import SuiteOp, Storage, sweetconfig
+from .util import TestBase, MemPkgRepo
+
+
+class TestSuiteIndex(TestBase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestSuiteIndex, self).__init__(*args, **kwargs)
+        self.repo = MemPkgRepo("memory@any")
+
+    def setUp(self):
+        self.settings = {
+            "packages_path": [self.repo.path],
+        }
+        super(TestSuiteIndex, self).setUp()
+        tempdir = self.make_tempdir()
+        self.roots = {"test": os.path.join(tempdir, "test"),
+                      "release": os.path.join(tempdir, "release")}
+        self.storage = Storage(roots=self.roots)
+        self.patcher = mock.patch.dict(sweetconfig, {
+            "suite_roots": self.roots,
+            "cache_root": os.path.join(tempdir, "cache"),
+            "suite_index": True,
+        })
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.repo.flush()
+        super(TestSuiteIndex, self).tearDown()
+
+    def _save(self, name, requests, description=""):
+        sop = SuiteOp()
+        sop.add_context("CTX", sop.resolve_context(requests))
+        sop.set_description(description)
+        path = self.storage.suite_path("test", name)
+        sop.save(path)
+        return path
+
+    def test_index_on_save(self):
+        self.repo.add("foo", version=1, tools=["fruit"])
+        self.repo.add("bar", version=1, tools=["nut"])
+        self._save("my-foo", ["foo"], description="juicy")
+        self._save("my-bar", ["bar"])
+
+        index = self.storage.suite_index()
+        suites = index.search()
+        self.assertEqual(["my-bar", "my-foo"], [s.name for s in suites])
+        self.assertEqual(["CTX"], suites[0].contexts)
+
+        self.assertEqual(["my-foo"], [s.name for s in index.search("juic")])
+        self.assertEqual(["my-bar"],
+                         [s.name for s in index.search(package="bar")])
+        self.assertEqual(["my-foo"],
+                         [s.name for s in index.search(tool="fruit")])
+        self.assertEqual([], index.search(package="foo", tool="nut"))
+        self.assertEqual(0, index.refresh())  # all up to date
+
+    def test_index_on_archive(self):
+        self.repo.add("foo", version=1, tools=["fruit"])
+        path = self._save("my-foo", ["foo"])
+        index = self.storage.suite_index()
+
+        self.storage.set_archived(path, archive=True)
+        self.assertEqual([], index.search())
+        self.assertEqual(["my-foo"],
+                         [s.name for s in index.search(archived=True)])
+        self.assertEqual(0, index.refresh())
+
+    def test_refresh(self):
+        self.repo.add("foo", version=1, tools=["fruit"])
+        with mock.patch.dict(sweetconfig, {"suite_index": False}):
+            path_a = self._save("suite-a", ["foo"])
+        path_b = self._save("suite-b", ["foo"])
+
+        index = self.storage.suite_index()
+        self.assertEqual(["suite-b"], [s.name for s in index.search()])
+
+        shutil.rmtree(path_b)
+        self.assertEqual(1, index.refresh())
+        suites = index.search()
+        self.assertEqual(["suite-a"], [s.name for s in suites])
+        self.assertEqual(path_a, suites[0].saved_suite().path)
+
+    def test_find_package_users(self):
+        self.repo.add("foo", version="1.2.0", tools=["fruit"])
+        self._save("suite-a", ["foo"])
+        self.repo.add("foo", version="1.3", tools=["fruit"])
+        self._save("suite-b", ["foo"])
+        with mock.patch.dict(sweetconfig, {"suite_index": False}):
+            self._save("suite-c", ["foo-1.2"])
+
+        users = self.storage.find_package_users("foo-1.2")
+        self.assertEqual([("suite-a", "CTX", "foo-1.2.0[]"),
+                          ("suite-c", "CTX", "foo-1.2.0[]")],
+                         [(u.suite, u.context, u.variant) for u in users])
+
+        users = self.storage.find_package_users("foo==1.3")
+        self.assertEqual(["suite-b"], [u.suite for u in users])
+        self.assertEqual(3, len(self.storage.find_package_users("foo")))
+        self.assertEqual([], self.storage.find_package_users("bar"))
@@ -0,0 +1,131 @@
+
+import os
+import socket
+import time
+import unittest
+import threading
+from unittest import mock
+from rez.package_repository import package_repository_manager
+from sweet.server import ResolveServer, request_context, _current_settings
+from .util import TestBase, MemPkgRepo
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Requires Unix socket.")
+class TestResolveServer(TestBase):
+
+    def __init__(self, *args, **kwargs):
+        super(TestResolveServer, self).__init__(*args, **kwargs)
+        self.repo = MemPkgRepo("memory@any")
+
+    def setUp(self):
+        self.settings = {
+            "packages_path": [self.repo.path],
+        }
+        super(TestResolveServer, self).setUp()
+        self.socket_path = os.path.join(self.make_tempdir(), "sweet.sock")
+        self.server = ResolveServer(self.socket_path)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.repo.flush()
+        super(TestResolveServer, self).tearDown()
+
+    def test_request_context(self):
+        self.repo.add("foo", version=1)
+
+        context = request_context(["foo"], socket_path=self.socket_path)
+        self.assertTrue(context.success)
+        self.assertEqual("1", str(context.resolved_packages[0].version))
+
+    def test_context_kept_in_memory(self):
+        self.repo.add("foo", version=1)
+
+        request_context(["foo"], socket_path=self.socket_path)
+        self.assertEqual(1, len(self.server._contexts))
+        request_context(["foo"], socket_path=self.socket_path)
+        self.assertEqual(1, len(self.server._contexts))
+
+    def test_packages_changed(self):
+        self.repo.add("foo", version=1)
+        request_context(["foo"], socket_path=self.socket_path)
+
+        self.repo.add("foo", version=2)
+        context = request_context(["foo"], socket_path=self.socket_path)
+        self.assertEqual("2", str(context.resolved_packages[0].version))
+
+    def test_failed_resolve(self):
+        context = request_context(["bar"], socket_path=self.socket_path)
+        self.assertIsNone(context)
+
+    def test_server_absent(self):
+        socket_path = os.path.join(self._tempdir, "absent.sock")
+        context = request_context(["foo"], socket_path=socket_path)
+        self.assertIsNone(context)
+
+    def test_socket_not_owned(self):
+        self.repo.add("foo", version=1)
+        with mock.patch("os.getuid", return_value=os.getuid() + 1):
+            context = request_context(["foo"], socket_path=self.socket_path)
+        self.assertIsNone(context)
+
+    def test_socket_dir_not_private(self):
+        dirpath = os.path.join(self._tempdir, "shared")
+        os.mkdir(dirpath)
+        os.chmod(dirpath, 0o777)
+        with self.assertRaises(OSError):
+            ResolveServer(os.path.join(dirpath, "sweet.sock"))
+
+    def test_timeout(self):
+        socket_path = os.path.join(self._tempdir, "hang.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(socket_path)
+            sock.listen(1)  # never accepts nor answers
+            start = time.perf_counter()
+            context = request_context(["foo"], socket_path=socket_path,
+                                      timeout=0.2)
+            self.assertIsNone(context)
+            self.assertLess(time.perf_counter() - start, 5)
+
+    def test_contexts_limited(self):
+        self.repo.add("foo", version=1)
+        self.repo.add("bar", version=1)
+        with mock.patch.object(ResolveServer, "MaxContexts", 1):
+            request_context(["foo"], socket_path=self.socket_path)
+            request_context(["bar"], socket_path=self.socket_path)
+        self.assertEqual(1, len(self.server._contexts))
+
+    def test_implicit_packages(self):
+        self.repo.add("foo", version=1)
+        self.repo.add("bar", version=1)
+        settings = _current_settings()
+        settings["implicit_packages"] = ["bar"]
+
+        context = self.server.resolve(["foo"], settings)
+        self.assertTrue(context.success)
+        self.assertEqual(["foo"],
+                         [str(r) for r in context.requested_packages()])
+        self.assertEqual(["bar"], [str(r) for r in context.implicit_packages])
+        self.assertEqual(["bar", "foo"],
+                         sorted(p.name for p in context.resolved_packages))
+
+    def test_caches_cleared_after_resolves(self):
+        self.repo.add("foo", version=1)
+        settings = _current_settings()
+        self.server.resolve(["foo"], settings)
+        self.repo.add("foo", version=2)
+
+        repo = package_repository_manager.get_repository(self.repo.path)
+        with mock.patch.object(repo, "clear_caches") as clear_caches:
+            with self.server._repos.reading():  # a resolve is running
+                thread = threading.Thread(target=self.server.resolve,
+                                          args=(["foo"], settings))
+                thread.start()
+                thread.join(0.2)
+                self.assertTrue(thread.is_alive())
+                clear_caches.assert_not_called()
+            thread.join()
+            clear_caches.assert_called_once()
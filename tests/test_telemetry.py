@@ -0,0 +1,49 @@
+
+import os
+import json
+from unittest import mock
+from sweet.telemetry import launch_record, write_record
+from .util import TestBase
+
+
+class TestTelemetry(TestBase):
+
+    def test_write_record(self):
+        filepath = os.path.join(self.make_tempdir(), "log", "launch.jsonl")
+        record = launch_record("/suite", "ctx", "tool", "resolve",
+                               timings={"resolve_time": 0.5})
+        write_record(filepath, record)
+        write_record(filepath, record)
+
+        with open(filepath, "r") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(2, len(lines))
+        self.assertEqual("tool", lines[0]["tool"])
+        self.assertEqual(0.5, lines[0]["resolve_time"])
+
+    def test_solve_time_of_launch_only(self):
+        context = mock.Mock(load_time=0.1, solve_time=0.2,
+                            num_loaded_packages=3)
+        record = launch_record("/suite", "ctx", "tool", "resolve",
+                               timings={}, context=context)
+        self.assertEqual(0.2, record["solve_time"])
+
+        record = launch_record("/suite", "ctx", "tool", "rxt",
+                               timings={}, context=context)
+        self.assertIsNone(record["load_time"])
+        self.assertIsNone(record["solve_time"])
+        self.assertIsNone(record["num_loaded_packages"])
+
+    def test_rotation(self):
+        filepath = os.path.join(self.make_tempdir(), "launch.jsonl")
+        write_record(filepath, {"n": 1})
+        write_record(filepath, {"n": 2}, max_bytes=1)
+
+        with open(filepath, "r") as f:
+            self.assertEqual([{"n": 2}], [json.loads(line) for line in f])
+        with open(filepath + ".1", "r") as f:
+            self.assertEqual([{"n": 1}], [json.loads(line) for line in f])
+
+    def test_write_failure_ignored(self):
+        filepath = self.make_tempdir()  # a directory can not be written
+        write_record(filepath, {"n": 1})